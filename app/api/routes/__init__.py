@@ -1,7 +1,10 @@
 from fastapi import APIRouter
 
-from app.api.routes import tokens, users
+from app.api.routes import internal, tokens, users
 
 router = APIRouter()
 router.include_router(tokens.router, prefix="/tokens", tags=["Tokens"])
 router.include_router(users.router, prefix="/users", tags=["Users"])
+router.include_router(
+    internal.router, prefix="/internal", tags=["Internal"], include_in_schema=False
+)
@@ -0,0 +1,15 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core.database import pool_stats
+from app.deps.auth import superadmin_user_dep
+from app.schemas.response import SuccessResponse
+
+router = APIRouter()
+
+
+@router.get("/pools")
+async def get_pool_stats(current_user: superadmin_user_dep) -> SuccessResponse[dict[str, Any]]:
+    """当前工作进程的数据库与 Redis 连接池状态（已借出、溢出连接数、获取连接的等待时间等）"""
+    return SuccessResponse(data=pool_stats())
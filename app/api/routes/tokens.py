@@ -1,6 +1,89 @@
-from fastapi import APIRouter
+from datetime import timedelta
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from fastapi.security import OAuth2PasswordRequestForm
 
 from app.core.config import get_settings
+from app.core.exceptions import (
+    InvalidCredentialsException,
+    UnauthorizedException,
+    UserDisabledException,
+)
+from app.core.security import (
+    async_get_password_hash,
+    async_verify_password,
+    create_refresh_token,
+    create_user_access_token,
+    revoke_refresh_token,
+    verify_refresh_token,
+)
+from app.deps.database import session_dep
+from app.deps.ratelimit import rate_limit
+from app.models.enums import PowerEnum
+from app.models.user import User
+from app.repositories.user import UserRepository
+from app.schemas.response import SuccessResponse
+from app.schemas.token import RefreshTokenRequest, TokenPair
 
 settings = get_settings()
 router = APIRouter()
+
+
+async def issue_token_pair(user: User) -> TokenPair:
+    """为用户签发 Access Token 与 Refresh Token"""
+    refresh_token = await create_refresh_token(
+        str(user.id), timedelta(seconds=settings.REFRESH_TOKEN_EXPIRE_DELTA_SECONDS)
+    )
+    return TokenPair(access_token=create_user_access_token(user), refresh_token=refresh_token)
+
+
+@router.post(
+    "",
+    dependencies=[Depends(rate_limit(settings.RATE_LIMIT_LOGIN))]
+    if settings.RATE_LIMIT_LOGIN
+    else [],
+)
+async def login(
+    session: session_dep, form: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> TokenPair:
+    """
+    用户名密码登录
+
+    响应体遵循 OAuth2 密码模式（不使用统一响应结构），可直接用于 API 文档中的认证；
+    密码哈希的算法或参数与当前策略不一致时，按当前策略重新生成
+    """
+    user = await UserRepository(session).get_by_username(form.username)
+    if user is None:
+        raise InvalidCredentialsException()
+    check = await async_verify_password(form.password, user.hashed_password)
+    if not check:
+        raise InvalidCredentialsException()
+    if user.power == PowerEnum.BANNED:
+        raise UserDisabledException()
+    if check.needs_rehash:
+        user.hashed_password = await async_get_password_hash(form.password)
+    return await issue_token_pair(user)
+
+
+@router.post("/refresh")
+async def refresh(session: session_dep, body: RefreshTokenRequest) -> TokenPair:
+    """使用 Refresh Token 换取新的令牌对，原 Refresh Token 随即作废"""
+    payload = await verify_refresh_token(body.refresh_token)
+    user = await UserRepository(session).get(int(payload["sub"]))
+    if user is None:
+        raise UnauthorizedException(message="User not found")
+    if user.power == PowerEnum.BANNED:
+        raise UserDisabledException()
+    # 撤销是原子操作，同一 Refresh Token 的并发请求只有一个能撤销成功并获得新令牌
+    if not await revoke_refresh_token(user.id, payload["jti"]):
+        raise UnauthorizedException(message="Refresh Token revoked")
+    return await issue_token_pair(user)
+
+
+@router.post("/revoke")
+async def revoke(body: RefreshTokenRequest) -> SuccessResponse[None]:
+    """注销 Refresh Token（登出）"""
+    payload = await verify_refresh_token(body.refresh_token)
+    await revoke_refresh_token(int(payload["sub"]), payload["jti"])
+    return SuccessResponse(data=None)
@@ -1,6 +1,134 @@
-from fastapi import APIRouter
+from typing import Annotated
 
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.avatars import avatar_store
+from app.core.bodylimit import body_limit
 from app.core.config import get_settings
+from app.core.database import on_commit
+from app.core.exceptions import NotFoundException
+from app.core.images import PILLOW_AVAILABLE
+from app.core.jobs import job_queue
+from app.core.pagination import TotalMode, paginate_keyset
+from app.core.response_cache import cache_response, response_cache
+from app.core.transfer import (
+    MEDIA_TYPES,
+    ConflictPolicy,
+    TransferFormat,
+    export_users,
+    import_users,
+)
+from app.deps.auth import admin_user_dep, current_user_dep, superadmin_user_dep
+from app.deps.coalesce import user_loader_dep
+from app.deps.database import read_session_dep, session_dep
+from app.models.user import User as UserModel
+from app.schemas.job import JobAccepted
+from app.schemas.response import CursorPaginatedResponse, SuccessResponse
+from app.schemas.user import User, UserAvatar, UserImportResult, UserTokensRevoke
 
 settings = get_settings()
 router = APIRouter()
+
+
+def user_tags(request: Request) -> list[str]:
+    """单个用户视图的缓存标签（用户变更时与用户列表的 users 标签一同失效）"""
+    return [f"user:{request.path_params['user_id']}"]
+
+
+@router.get("")
+@cache_response(ttl=30, tags=["users"], vary="shared")
+async def list_users(
+    session: read_session_dep,
+    current_user: admin_user_dep,
+    cursor: str | None = None,
+    size: Annotated[int, Query(ge=1, le=100)] = 20,
+    total: TotalMode = "none",
+) -> CursorPaginatedResponse[User]:
+    """用户列表（按注册时间游标分页）"""
+    items, pagination = await paginate_keyset(
+        session,
+        select(UserModel),
+        order_by=(UserModel.created_at, UserModel.id),
+        size=size,
+        cursor=cursor,
+        total=total,
+    )
+    return CursorPaginatedResponse[User](data={"items": items, "pagination": pagination})
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users_route(
+    current_user: superadmin_user_dep,
+    format: TransferFormat = "ndjson",
+    include_password_hash: bool = False,
+):
+    """流式导出全部用户（NDJSON 或 CSV）"""
+    return StreamingResponse(
+        export_users(format, include_password_hash=include_password_hash),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@router.post("/import")
+@body_limit(settings.USER_IMPORT_MAX_BYTES)
+async def import_users_route(
+    request: Request,
+    session: session_dep,
+    current_user: superadmin_user_dep,
+    format: TransferFormat = "ndjson",
+    on_conflict: ConflictPolicy = "skip",
+) -> SuccessResponse[UserImportResult]:
+    """
+    流式导入用户，请求体为 NDJSON 或带表头的 CSV
+
+    每行包含 username、email、password 或 hashed_password，可选 introduction、avatar、power；
+    on_conflict 为 skip 时跳过已存在的用户，为 update 时按用户名更新
+    """
+    result = await import_users(session, request.stream(), format, on_conflict)
+    return SuccessResponse(data=result)
+
+
+# 未安装 Pillow 时不注册，避免每次上传都在图片进程池中导入失败
+if PILLOW_AVAILABLE:
+
+    @router.put("/me/avatar")
+    @body_limit(settings.AVATAR_MAX_BYTES)
+    async def upload_avatar(
+        request: Request, session: session_dep, current_user: current_user_dep
+    ) -> SuccessResponse[UserAvatar]:
+        """
+        上传头像，请求体为图片的原始内容（JPEG、PNG、WebP 或 GIF，按内容识别）
+
+        边接收边校验大小，生成各尺寸的缩略图后更新当前用户的头像
+        """
+        digest = await avatar_store.save(request.stream())
+        urls = avatar_store.urls(digest)
+        url = urls[avatar_store.sizes[0]]
+        user = await current_user.load()
+        user.avatar = url
+        on_commit(session, lambda: response_cache.invalidate(f"user:{user.id}", "users"))
+        return SuccessResponse(data=UserAvatar(url=url, sizes=urls))
+
+
+@router.post("/tokens/revoke", status_code=202)
+async def revoke_users_tokens_route(
+    body: UserTokensRevoke, current_user: superadmin_user_dep
+) -> SuccessResponse[JobAccepted]:
+    """批量注销用户的全部令牌（后台任务）"""
+    job_id = await job_queue.enqueue("revoke_users_tokens", user_ids=body.user_ids)
+    return SuccessResponse(data=JobAccepted(job_id=job_id))
+
+
+@router.get("/{user_id}")
+@cache_response(ttl=60, tags=user_tags, vary="shared")
+async def get_user(
+    user_id: int, current_user: admin_user_dep, users: user_loader_dep
+) -> SuccessResponse[User]:
+    """用户详情（并发请求的查询合并为一次批量查询）"""
+    user = await users.load(user_id)
+    if user is None:
+        raise NotFoundException(message="User not found")
+    return SuccessResponse(data=User.model_validate(user))
@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import shutil
+import uuid
+from collections.abc import AsyncIterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from app.core.config import get_settings
+from app.core.exceptions import DataValidationException, PayloadTooLargeException
+from app.core.executors import BoundedExecutor, image_executor
+from app.core.images import InvalidImageError, make_thumbnails, thumbnail_name
+
+settings = get_settings()
+
+# 接收的数据累积到该字节数后写入磁盘一次（在线程中执行）
+WRITE_BUFFER_SIZE = 256 * 1024
+
+
+@dataclass
+class AvatarStats:
+    """头像上传统计信息"""
+
+    uploaded: int = 0  # 成功上传次数
+    deduplicated: int = 0  # 内容已存在、直接复用的次数
+    rejected_too_large: int = 0  # 超出大小限制被中止的次数
+    rejected_invalid: int = 0  # 图片无效被拒绝的次数
+    bytes_received: int = 0  # 接收的总字节数
+
+
+class AvatarStore:
+    """
+    头像存储
+
+    - 上传内容边接收边计算 sha256 并分块写入临时文件，超出大小限制立即中止，内存占用与文件大小无关
+    - 按内容哈希存放: <directory>/<哈希前 2 位>/<哈希>/<边长>.webp，相同内容的重复上传不再处理
+    - 解码与缩放在图片进程池中执行，事件循环只负责收发数据；不保存原图，只保存重新编码的缩略图
+    - 缩略图先生成到临时目录，完成后整体改名发布，不会出现只生成了一部分尺寸的目录
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        sizes: list[int],
+        max_bytes: int,
+        max_pixels: int,
+        executor: BoundedExecutor,
+    ):
+        self.directory = directory
+        self.tmp_dir = directory / ".tmp"  # 以 . 开头，不会被静态文件服务访问或索引
+        self.sizes = sizes
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.executor = executor
+        self.stats = AvatarStats()
+
+    def path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    def urls(self, digest: str) -> dict[int, str]:
+        """各尺寸缩略图的外部访问 URL"""
+        relative = self.path(digest).relative_to(settings.STATIC_DIR).as_posix()
+        base = f"{settings.PUBLIC_URL}/static/{relative}"
+        return {size: f"{base}/{thumbnail_name(size)}" for size in self.sizes}
+
+    async def save(self, chunks: AsyncIterable[bytes]) -> str:
+        """
+        接收上传内容并生成缩略图，返回内容哈希
+
+        Raises:
+            PayloadTooLargeException: 内容超出 max_bytes
+            DataValidationException: 内容为空或不是允许的图片
+            TooManyRequestsException: 图片处理队列已满
+        """
+        await asyncio.to_thread(self.tmp_dir.mkdir, parents=True, exist_ok=True)
+        upload = self.tmp_dir / uuid.uuid4().hex
+        try:
+            digest = await self._receive(chunks, upload)
+            target = self.path(digest)
+            if await asyncio.to_thread(target.is_dir):
+                self.stats.deduplicated += 1
+                return digest
+            staging = upload.with_suffix(".d")
+            try:
+                await self.executor.run(
+                    make_thumbnails, str(upload), str(staging), self.sizes, self.max_pixels
+                )
+                await asyncio.to_thread(self._publish, staging, target)
+            except InvalidImageError as e:
+                self.stats.rejected_invalid += 1
+                raise DataValidationException(message="Invalid image") from e
+            finally:
+                # 已发布时临时目录已不存在
+                await asyncio.to_thread(shutil.rmtree, staging, ignore_errors=True)
+            self.stats.uploaded += 1
+            return digest
+        finally:
+            await asyncio.to_thread(upload.unlink, missing_ok=True)
+
+    async def _receive(self, chunks: AsyncIterable[bytes], upload: Path) -> str:
+        """把上传内容写入 upload，返回 sha256 十六进制摘要"""
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        file = await asyncio.to_thread(upload.open, "wb")
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_bytes:
+                    self.stats.rejected_too_large += 1
+                    raise PayloadTooLargeException(message=f"Avatar exceeds {self.max_bytes} bytes")
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= WRITE_BUFFER_SIZE:
+                    await asyncio.to_thread(file.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(file.write, bytes(buffer))
+        finally:
+            self.stats.bytes_received += size
+            await asyncio.to_thread(file.close)
+        if size == 0:
+            raise DataValidationException(message="Empty file")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _publish(staging: Path, target: Path) -> None:
+        """发布生成完成的缩略图目录，相同内容已被并发请求发布时保留已有目录"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            staging.rename(target)
+        except OSError:
+            if not target.is_dir():
+                raise
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return asdict(self.stats)
+
+
+avatar_store = AvatarStore(
+    directory=settings.STATIC_DIR / "avatars",
+    sizes=settings.AVATAR_SIZES,
+    max_bytes=settings.AVATAR_MAX_BYTES,
+    max_pixels=settings.AVATAR_MAX_PIXELS,
+    executor=image_executor,
+)
@@ -0,0 +1,106 @@
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.exceptions import PayloadTooLargeException
+
+# 路由端点函数上记录请求体上限的属性名
+BODY_LIMIT_ATTR = "__body_limit__"
+
+
+def body_limit[F: Callable](max_bytes: int | None) -> Callable[[F], F]:
+    """
+    为单个路由设置请求体大小上限，覆盖全局默认值；None 表示不限制（端点需自行流式处理）
+
+    需写在路由装饰器下方:
+
+        @router.put("/me/avatar")
+        @body_limit(settings.AVATAR_MAX_BYTES)
+        async def upload_avatar(...): ...
+    """
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, BODY_LIMIT_ATTR, max_bytes)
+        return endpoint
+
+    return decorator
+
+
+def route_body_limit(scope: Scope, default: int | None) -> int | None:
+    """当前请求匹配到的路由的请求体上限，未匹配或未设置时为 default"""
+    return getattr(scope.get("endpoint"), BODY_LIMIT_ATTR, default)
+
+
+def payload_too_large(max_bytes: int) -> PayloadTooLargeException:
+    """构造 413 异常，响应后关闭连接，不再接收剩余的请求体"""
+    exc = PayloadTooLargeException(message=f"Request body exceeds {max_bytes} bytes")
+    exc.headers = {"Connection": "close"}
+    return exc
+
+
+@dataclass
+class BodyLimitStats:
+    """请求体大小限制统计信息"""
+
+    rejected_declared: int = 0  # Content-Length 超出上限、未读取请求体即拒绝的次数
+    rejected_streamed: int = 0  # 读取过程中累计字节数超出上限被中止的次数（分块传输或长度不实）
+
+    def snapshot(self) -> dict[str, int]:
+        """返回当前统计快照"""
+        return asdict(self)
+
+
+body_limit_stats = BodyLimitStats()
+
+
+class BodyLimitMiddleware:
+    """
+    请求体大小限制中间件（纯 ASGI）
+
+    - 不预先读取请求体，而是包装 receive：端点首次读取请求体时路由已匹配完成，
+      按路由确定上限，Content-Length 超出上限时直接拒绝，不读取任何数据
+    - 之后每次读取累计字节数，分块传输或 Content-Length 不实的请求在超出上限的那一块即中止，
+      缓冲的数据不会超过上限
+    - 超限时从 receive 抛出 PayloadTooLargeException，由异常处理器渲染为统一的 413 错误响应，
+      并通过 Connection: close 让服务器在响应后关闭连接，不再接收剩余的请求体
+    - 不读取请求体的端点不受影响
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit: int | None = None
+        resolved = False
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal limit, resolved, received
+            if not resolved:
+                resolved = True
+                limit = route_body_limit(scope, self.max_bytes)
+                content_length = Headers(scope=scope).get("content-length")
+                if (
+                    limit is not None
+                    and content_length
+                    and content_length.isdigit()
+                    and int(content_length) > limit
+                ):
+                    body_limit_stats.rejected_declared += 1
+                    raise payload_too_large(limit)
+            message = await receive()
+            if limit is not None and message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    body_limit_stats.rejected_streamed += 1
+                    raise payload_too_large(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LRUCache[KeyType, ValueType]:
+    """
+    进程内有界 LRU 缓存，每个条目带有独立的过期时间
+
+    - 超出容量时淘汰最久未使用的条目
+    - 读取时惰性检查过期，过期条目视为未命中
+    - 非线程安全，仅用于单个事件循环内
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[KeyType, tuple[float, ValueType]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: KeyType) -> ValueType | None:
+        """获取缓存值，不存在或已过期时返回 None"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KeyType, value: ValueType, ttl: float) -> None:
+        """写入缓存值，ttl 秒后过期；ttl <= 0 时不缓存"""
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: KeyType) -> ValueType | None:
+        """移除并返回缓存值"""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
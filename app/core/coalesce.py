@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import Row
+
+from app.core.replicas import replica_router
+from app.repositories.user import UserRepository
+
+# 所有实例，用于导出指标
+_instances: list["SingleFlight | DataLoader"] = []
+
+
+@dataclass
+class CoalesceStats:
+    """
+    请求合并统计信息
+
+    合并率 = 1 - executions / calls，多工作进程汇总时按 counter 计算:
+    1 - rate(xxx_executions[5m]) / rate(xxx_calls[5m])
+    """
+
+    calls: int = 0  # 调用次数（DataLoader 为 load 的键数）
+    executions: int = 0  # 实际执行次数（DataLoader 为批量查询次数）
+    coalesced: int = 0  # 与其他调用共享结果的调用次数
+
+
+class SingleFlight[KeyType: Hashable, ValueType]:
+    """
+    合并并发的相同调用（singleflight）
+
+    - 同一个键同时只有一个执行中的调用，期间其他调用等待并共享其结果（包括异常）
+    - 调用完成即移除，之后的调用重新执行，不缓存结果（缓存由调用方负责）
+    - 单个等待方被取消不影响执行中的调用与其他等待方
+    - 非线程安全，仅用于单个事件循环内
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = CoalesceStats()
+        self._inflight: dict[KeyType, asyncio.Task[ValueType]] = {}
+        _instances.append(self)
+
+    async def do(self, key: KeyType, fn: Callable[[], Awaitable[ValueType]]) -> ValueType:
+        """执行 fn() 并返回结果，已有相同键的调用执行中时直接等待其结果"""
+        self.stats.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def forget(self, key: KeyType) -> None:
+        """数据已变更时调用，之后的调用不再等待此前执行中的调用"""
+        self._inflight.pop(key, None)
+
+    def _forget(self, key: KeyType, task: asyncio.Task[ValueType]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 所有等待方都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {**asdict(self.stats), "inflight": len(self._inflight)}
+
+
+class DataLoader[KeyType: Hashable, ValueType]:
+    """
+    批量加载器（DataLoader）
+
+    - 同一轮事件循环内各协程的 load() 汇总为一次 batch_fn 调用，相同的键只查询一次
+    - 待加载的键达到 max_batch_size 时立即发起一批
+    - batch_fn 接收键列表，返回 {键: 值}，缺失的键对应 None；batch_fn 出错时该批所有调用抛出同一异常
+    - 不缓存结果，每批都重新查询；非线程安全，仅用于单个事件循环内
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list[KeyType]], Awaitable[Mapping[KeyType, ValueType]]],
+        max_batch_size: int = 100,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.stats = CoalesceStats()
+        self._pending: dict[KeyType, asyncio.Future[ValueType | None]] = {}
+        self._scheduled: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        _instances.append(self)
+
+    async def load(self, key: KeyType) -> ValueType | None:
+        """加载单个键"""
+        self.stats.calls += 1
+        future = self._pending.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            loop = asyncio.get_running_loop()
+            future = self._pending[key] = loop.create_future()
+            if len(self._pending) >= self.max_batch_size:
+                self._dispatch()
+            elif self._scheduled is None:
+                # 排在当前已就绪的回调之后，同一轮中其他协程的 load() 会进入同一批
+                self._scheduled = loop.call_soon(self._dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[KeyType]) -> list[ValueType | None]:
+        """加载多个键，结果与 keys 顺序对应"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        if self._scheduled is not None:
+            self._scheduled.cancel()
+            self._scheduled = None
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        self.stats.executions += 1
+        self.stats.coalesced += len(batch) - 1
+        task = asyncio.create_task(self._run(batch))
+        # 保留引用，避免执行中的任务被垃圾回收
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict[KeyType, asyncio.Future[ValueType | None]]) -> None:
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # 所有等待方都已取消时避免 "exception was never retrieved" 警告
+                    future.exception()
+            return
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {**asdict(self.stats), "pending": len(self._pending)}
+
+
+def coalesce_snapshots() -> dict[str, dict[str, Any]]:
+    """返回 {名称: 统计快照}"""
+    return {instance.name: instance.snapshot() for instance in _instances}
+
+
+_singleflights: dict[str, SingleFlight] = {}
+
+
+def get_singleflight(name: str) -> SingleFlight:
+    """获取指定名称的共享 SingleFlight，不存在时创建"""
+    flight = _singleflights.get(name)
+    if flight is None:
+        flight = _singleflights[name] = SingleFlight(name)
+    return flight
+
+
+async def _load_users(ids: list[int]) -> dict[int, Row]:
+    # 独立的只读会话（优先使用只读副本），返回不绑定会话的 Row，可在多个请求间共享
+    async with replica_router.session() as session:
+        return await UserRepository(session).get_many(ids, rows=True)
+
+
+# 按 ID 加载用户的只读行，并发请求中的查询合并为 WHERE id = ANY(:ids)
+user_loader: DataLoader[int, Row] = DataLoader("user_loader", _load_users)
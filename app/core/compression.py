@@ -0,0 +1,291 @@
+import asyncio
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # 可选依赖: uv sync --extra compression
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖: uv sync --extra compression
+    zstandard = None
+
+# 默认允许压缩的内容类型，以 "/" 结尾的表示整个主类型
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# 超过该字节数的一次性响应在线程中压缩，避免阻塞事件循环
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+class StreamCompressor(Protocol):
+    """流式压缩器的统一接口"""
+
+    def compress(self, data: bytes) -> bytes:
+        """压缩一段数据，并刷新已产生的输出，保证客户端可以及时解码"""
+        ...
+
+    def finish(self) -> bytes:
+        """结束压缩流"""
+        ...
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class Codec:
+    """内容编码：一次性压缩与流式压缩"""
+
+    def __init__(
+        self,
+        name: str,
+        level: int,
+        compress: Callable[[bytes, int], bytes],
+        stream: Callable[[int], StreamCompressor],
+    ):
+        self.name = name
+        self.level = level
+        self._compress = compress
+        self._stream = stream
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data, self.level)
+
+    def stream(self) -> StreamCompressor:
+        return self._stream(self.level)
+
+
+def available_codecs(zstd_level: int, brotli_level: int, gzip_level: int) -> list[Codec]:
+    """按服务端优先级返回当前环境可用的编码：zstd > br > gzip"""
+    codecs = []
+    if zstandard is not None:
+        codecs.append(
+            Codec(
+                "zstd",
+                zstd_level,
+                lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+                _ZstdStream,
+            )
+        )
+    if brotli is not None:
+        codecs.append(
+            Codec(
+                "br",
+                brotli_level,
+                lambda data, level: brotli.compress(data, quality=level),
+                _BrotliStream,
+            )
+        )
+    codecs.append(
+        Codec(
+            "gzip",
+            gzip_level,
+            lambda data, level: zlib.compress(data, level, wbits=31),
+            _GzipStream,
+        )
+    )
+    return codecs
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """解析 Accept-Encoding 请求头，返回 {编码: q 值}"""
+    accepted = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    多编码响应压缩中间件（纯 ASGI）
+
+    - 根据 Accept-Encoding 协商 zstd / br / gzip，未安装的编码自动跳过
+    - 仅压缩白名单内的内容类型，已带 Content-Encoding 的响应原样透传
+    - 仅压缩 2xx 响应；206 与带 Content-Range 的响应原样透传（其字节范围描述的是未压缩的内容）
+    - 一次性响应小于 minimum_size 时不压缩；流式响应（more_body）逐块压缩并刷新
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        codecs: list[Codec],
+        minimum_size: int = 1024,
+        content_types: tuple[str, ...] = DEFAULT_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.codecs = codecs
+        self.minimum_size = minimum_size
+        self.content_types = content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = self.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, codec, send)
+        await self.app(scope, receive, responder.send)
+
+    def negotiate(self, accept_encoding: str) -> Codec | None:
+        """选择客户端接受的、服务端优先级最高的编码"""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for codec in self.codecs:
+            if accepted.get(codec.name, wildcard) > 0:
+                return codec
+        return None
+
+    def is_compressible(self, status: int, headers: Headers) -> bool:
+        if not 200 <= status < 300 or status in (204, 206):
+            return False
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        if content_type == "text/event-stream":
+            return False
+        return any(
+            content_type.startswith(allowed) if allowed.endswith("/") else content_type == allowed
+            for allowed in self.content_types
+        )
+
+
+class _CompressionResponder:
+    """单个请求的压缩状态：推迟发送响应头，直到看到第一个响应体消息"""
+
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec, send: Send):
+        self.middleware = middleware
+        self.codec = codec
+        self._send = send
+        self.start_message: Message | None = None
+        self.stream: StreamCompressor | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            return
+        if message_type != "http.response.body":
+            # pathsend 等扩展消息无法压缩，原样发送
+            await self._flush_passthrough(message)
+            return
+        if self.stream is not None:
+            await self._send_stream_chunk(message)
+            return
+
+        headers = Headers(raw=self.start_message["headers"])
+        status = self.start_message["status"]
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.middleware.is_compressible(status, headers):
+            await self._flush_passthrough(message)
+            return
+
+        if not more_body:
+            if len(body) < self.middleware.minimum_size:
+                await self._flush_passthrough(message)
+                return
+            if len(body) >= THREAD_MINIMUM_SIZE:
+                compressed = await asyncio.to_thread(self.codec.compress, body)
+            else:
+                compressed = self.codec.compress(body)
+            self._rewrite_headers(content_length=len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        # 流式响应：长度未知，去掉 Content-Length 后逐块压缩
+        self.stream = self.codec.stream()
+        self._rewrite_headers(content_length=None)
+        await self._send(self.start_message)
+        await self._send_stream_chunk(message)
+
+    async def _send_stream_chunk(self, message: Message) -> None:
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _flush_passthrough(self, message: Message) -> None:
+        self.passthrough = True
+        if self.start_message is not None:
+            await self._send(self.start_message)
+        await self._send(message)
+
+    def _rewrite_headers(self, content_length: int | None) -> None:
+        headers = MutableHeaders(raw=list(self.start_message["headers"]))
+        headers["Content-Encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
+        # 范围请求会得到未压缩内容的字节范围，与压缩后的表示不一致，不再声明支持范围请求
+        if "accept-ranges" in headers:
+            del headers["Accept-Ranges"]
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        # 压缩后的表示与原始字节不同，强 ETag 降级为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        self.start_message["headers"] = headers.raw
@@ -7,10 +7,26 @@ from pydantic import ValidationError, computed_field
 from pydantic_settings import BaseSettings
 
 from .database import DatabaseConfig
+from .http import HttpConfig
+from .jobs import JobsConfig
+from .metrics import MetricsConfig
+from .overload import OverloadConfig
 from .path import PathConfig
+from .security import SecurityConfig
+from .upload import UploadConfig
 
 
-class Settings(BaseSettings, DatabaseConfig, PathConfig):
+class Settings(
+    BaseSettings,
+    DatabaseConfig,
+    HttpConfig,
+    JobsConfig,
+    MetricsConfig,
+    OverloadConfig,
+    PathConfig,
+    SecurityConfig,
+    UploadConfig,
+):
     # 应用配置
     APP_NAME: str = "FastAPI Template"
     APP_ENV: Literal["development", "testing", "production"] = "development"
@@ -19,7 +35,13 @@ class Settings(BaseSettings, DatabaseConfig, PathConfig):
     SUPERADMIN_EMAIL: str
     SUPERADMIN_PASSWORD: str
     # JWT 配置
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: Literal["HS256", "HS384", "HS512", "ES256", "EdDSA"] = "HS256"
+    # 编解码实现: native（默认）、jose 或 pyjwt（需安装可选依赖）
+    JWT_BACKEND: Literal["native", "jose", "pyjwt"] = "native"
+    # 签名使用的密钥 ID（非对称算法），为空时使用 JWT_KEYS_DIR 中 kid 排序最大的私钥
+    JWT_ACTIVE_KID: str = ""
+    # 使用非对称算法时仍接受 SECRET_KEY 签发的 HS256 令牌（从 HMAC 迁移期间开启）
+    JWT_ACCEPT_HMAC: bool = False
     ACCESS_TOKEN_EXPIRE_DELTA_SECONDS: int = 60 * 30  # 30 分钟
     REFRESH_TOKEN_EXPIRE_DELTA_SECONDS: int = 60 * 60 * 24 * 7  # 7 天
     # 后端服务绑定地址，用于 uvicorn 启动服务
@@ -1,3 +1,4 @@
+from typing import Literal
 from urllib.parse import quote_plus
 
 from pydantic import computed_field
@@ -12,11 +13,45 @@ class DatabaseConfig:
     POSTGRES_DB: str = "postgres"
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str
+    # 只读副本，"host" 或 "host:port"，与主库使用相同的数据库名与凭证；为空时读写都走主库
+    POSTGRES_REPLICA_HOSTS: list[str] = []
+    POSTGRES_REPLICA_STRATEGY: Literal["round_robin", "least_connections"] = "round_robin"
+    POSTGRES_READ_YOUR_WRITES_SECONDS: float = 5.0  # 用户写入后，其读请求停留在主库的秒数
+    POSTGRES_REPLICA_RETRY_SECONDS: float = 10.0  # 副本连接失败后暂停使用的秒数
+    # 连接池：所有工作进程合计的连接数上限，按 WORKERS 平分（主库与每个副本分别计算）
+    POSTGRES_MAX_CONNECTIONS: int = 60
+    POSTGRES_POOL_TIMEOUT: float = 30.0  # 获取连接的等待超时（秒）
+    POSTGRES_POOL_RECYCLE: int = 1800  # 连接自动回收周期（秒）
+    # 语句缓存条数：SQLAlchemy 编译缓存（每个引擎）与 asyncpg 预编译语句缓存（每个连接）
+    POSTGRES_STATEMENT_CACHE_SIZE: int = 500
     # Redis
     REDIS_HOST: str = "127.0.0.1"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str
+    REDIS_MAX_CONNECTIONS: int = 200  # 所有工作进程合计的连接数上限，按 WORKERS 平分
+    REDIS_POOL_TIMEOUT: float = 5.0  # 连接全部被占用时获取连接的等待超时（秒）
+    POOL_WARMUP: bool = True  # 启动时预先建立数据库与 Redis 连接并检测连通性
+
+    @computed_field
+    @property
+    def POSTGRES_POOL_SIZE(self) -> int:
+        """每个工作进程的核心连接数（本进程连接预算的 1/3）"""
+        per_worker = max(1, self.POSTGRES_MAX_CONNECTIONS // self.WORKERS)
+        return max(1, per_worker // 3)
+
+    @computed_field
+    @property
+    def POSTGRES_MAX_OVERFLOW(self) -> int:
+        """每个工作进程在核心连接之外允许临时创建的连接数"""
+        per_worker = max(1, self.POSTGRES_MAX_CONNECTIONS // self.WORKERS)
+        return max(0, per_worker - self.POSTGRES_POOL_SIZE)
+
+    @computed_field
+    @property
+    def REDIS_POOL_SIZE(self) -> int:
+        """每个工作进程的 Redis 连接数上限"""
+        return max(1, self.REDIS_MAX_CONNECTIONS // self.WORKERS)
 
     @computed_field
     @property
@@ -30,6 +65,21 @@ class DatabaseConfig:
         )
         return uri
 
+    @computed_field
+    @property
+    def SQLALCHEMY_REPLICA_URLS(self) -> list[str]:
+        """只读副本的异步 SQLAlchemy 连接 URL 列表"""
+        encoded_password = quote_plus(self.POSTGRES_PASSWORD)
+        uris = []
+        for replica in self.POSTGRES_REPLICA_HOSTS:
+            host, _, port = replica.partition(":")
+            uris.append(
+                f"postgresql+asyncpg://"
+                f"{self.POSTGRES_USER}:{encoded_password}@"
+                f"{host}:{port or self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            )
+        return uris
+
     @computed_field
     @property
     def REDIS_URL(self) -> str:
@@ -0,0 +1,25 @@
+class HttpConfig:
+    """HTTP 传输相关配置"""
+
+    # 请求体大小限制
+    REQUEST_MAX_BODY_BYTES: int = 1024 * 1024  # 默认上限（字节），上传、导入等路由单独设置
+
+    # 响应压缩
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 小于该字节数的响应不压缩
+    COMPRESSION_ZSTD_LEVEL: int = 3  # zstd 压缩等级（1~22），需安装 zstandard
+    COMPRESSION_BROTLI_LEVEL: int = 4  # brotli 压缩等级（0~11），需安装 brotli
+    COMPRESSION_GZIP_LEVEL: int = 5  # gzip 压缩等级（1~9）
+
+    # 接口响应缓存（cache_response 装饰的 GET 路由）
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_SIZE: int = 1000  # 进程内缓存的响应数量上限（每个工作进程），0 为只使用 Redis
+    RESPONSE_CACHE_LOCAL_TTL: float = 30.0  # 进程内缓存的最长时长(秒)，即失效通知丢失时的最大延迟
+    # 过期后旧响应继续保留的时长(秒)，期间只有一个请求重新生成，其余请求直接返回旧响应
+    RESPONSE_CACHE_STALE_SECONDS: float = 30.0
+    # 重新生成的锁时长(秒)，没有旧响应可返回的请求最多等待该时长
+    RESPONSE_CACHE_LOCK_SECONDS: float = 5.0
+
+    # 静态文件
+    STATIC_PRECOMPRESS: bool = True  # 启动时为可压缩的静态文件生成 .zst/.br/.gz 预压缩副本
+    STATIC_MEMORY_FILE_MAX_SIZE: int = 256 * 1024  # 不超过该字节数的静态文件缓存在内存中
+    STATIC_MEMORY_CACHE_BYTES: int = 32 * 1024 * 1024  # 静态文件内存缓存总字节数上限
@@ -0,0 +1,16 @@
+class JobsConfig:
+    """后台任务队列（Redis Streams）配置"""
+
+    JOBS_STREAM: str = "jobs"  # 任务流键名，延迟队列与死信队列为 <JOBS_STREAM>:delayed / :dead
+    # 应用进程内是否启动消费者；使用独立的 worker.py 进程消费时可关闭
+    JOBS_CONSUMER_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 8  # 每个进程同时执行的任务数
+    JOBS_BATCH_SIZE: int = 32  # 每次从 Redis 读取的最大任务数
+    JOBS_BLOCK_SECONDS: float = 1.0  # 无任务时阻塞读取的时长，也是延迟任务的检查间隔(秒)
+    JOBS_MAX_ATTEMPTS: int = 5  # 最大执行次数，超出后转入死信队列
+    JOBS_RETRY_BACKOFF_SECONDS: float = 1.0  # 重试退避的初始间隔(秒)，每次失败翻倍
+    JOBS_RETRY_BACKOFF_MAX_SECONDS: float = 300.0  # 重试退避的最大间隔(秒)
+    # 任务可见性超时(秒)：消费者崩溃时，其未确认的任务超过该时长后由其他消费者接管；
+    # 单个任务的执行时限比该值短 5 秒（最多为该值的一半），超时视为失败
+    JOBS_VISIBILITY_TIMEOUT_SECONDS: float = 60.0
+    JOBS_DEAD_LETTER_MAX_LENGTH: int = 10000  # 死信队列保留的最大任务数（近似）
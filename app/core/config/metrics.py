@@ -0,0 +1,11 @@
+import tempfile
+from pathlib import Path
+
+
+class MetricsConfig:
+    """指标配置"""
+
+    METRICS_ENABLED: bool = True  # 是否记录指标并开放 /metrics 端点
+    # 多工作进程时各进程写入指标快照的目录，/metrics 汇总该目录下所有快照
+    METRICS_DIR: Path = Path(tempfile.gettempdir()) / "fastapi-template-metrics"
+    METRICS_FLUSH_SECONDS: float = 5.0  # 多工作进程时写入快照的间隔（秒）
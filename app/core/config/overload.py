@@ -0,0 +1,14 @@
+class OverloadConfig:
+    """过载保护配置（每个工作进程分别计算）"""
+
+    OVERLOAD_PROTECTION_ENABLED: bool = True
+    # 准入控制
+    OVERLOAD_MAX_CONCURRENCY: int = 200  # 同时处理的请求数上限，超出的请求排队
+    OVERLOAD_QUEUE_SIZE: int = 200  # 排队的请求数上限，超出时直接拒绝
+    OVERLOAD_QUEUE_TIMEOUT_SECONDS: float = 1.0  # 排队时长上限(秒)，超时拒绝
+    # 过载判定，任一指标超出阈值时拒绝新请求
+    OVERLOAD_SAMPLE_INTERVAL_SECONDS: float = 0.1  # 事件循环延迟与连接池等待的采样间隔(秒)
+    OVERLOAD_LOOP_LAG_SECONDS: float = 0.2  # 事件循环延迟阈值(秒)
+    OVERLOAD_POOL_WAIT_SECONDS: float = 1.0  # 数据库/Redis 连接池获取连接的等待时长阈值(秒)
+    OVERLOAD_SUSTAINED_SAMPLES: int = 3  # 连续超出阈值的采样次数达到该值才拒绝，单次停顿不触发
+    OVERLOAD_RETRY_AFTER_SECONDS: int = 1  # 拒绝时 Retry-After 响应头的秒数
@@ -1,7 +1,6 @@
 from pathlib import Path
 
 from loguru import logger
-from pydantic import model_validator
 
 
 class PathConfig:
@@ -9,10 +8,11 @@ class PathConfig:
 
     APP_DIR: Path = Path(__file__).resolve().parent.parent
     STATIC_DIR: Path = APP_DIR.parent / "static"
+    # JWT 非对称签名密钥目录，文件名为 <kid>.pem
+    JWT_KEYS_DIR: Path = APP_DIR.parent / "keys"
 
-    @model_validator(mode="after")
     def ensure_directories_exist(self):
-        """确保所有配置的目录都存在"""
+        """确保所有配置的目录都存在（应用启动时调用，读取配置本身不产生副作用）"""
         directories = [self.STATIC_DIR]
 
         for directory in directories:
@@ -21,5 +21,3 @@ class PathConfig:
             else:
                 directory.mkdir(parents=True, exist_ok=True)
                 logger.info(f"创建目录: {directory}")
-
-        return self
@@ -0,0 +1,28 @@
+from typing import Literal
+
+
+class SecurityConfig:
+    """安全相关配置"""
+
+    # 密码哈希线程池
+    PASSWORD_HASH_WORKERS: int = 2  # 哈希线程数（每个工作进程）
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 排队+执行中的最大任务数，超出时直接拒绝
+    # 密码哈希策略，参数与策略不一致的已有哈希在用户登录时重新生成
+    PASSWORD_HASH_SCHEME: Literal["bcrypt", "argon2id"] = "bcrypt"  # argon2id 需安装 argon2-cffi
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt 轮数，每 +1 耗时翻倍
+    PASSWORD_ARGON2_TIME_COST: int = 3  # argon2id 迭代次数
+    PASSWORD_ARGON2_MEMORY_COST: int = 65536  # argon2id 内存(KiB)
+    PASSWORD_ARGON2_PARALLELISM: int = 1  # argon2id 并行度
+    # 大于 0 时启动时按该目标耗时(毫秒)校准轮数/迭代次数（覆盖上面的设置，结果经 Redis 在进程间共享），
+    # 0 为不校准；也可运行 python -m app.core.passwords --target-ms 250 校准后写入环境变量
+    PASSWORD_HASH_TARGET_MS: float = 0
+    # Access Token 解码缓存
+    TOKEN_CACHE_SIZE: int = 10000  # 缓存的 Access Token 数量上限（每个工作进程），0 为禁用
+    TOKEN_CACHE_NEGATIVE_TTL: float = 5.0  # 无效令牌的缓存时长(秒)
+    # 用户令牌状态缓存时长(秒)，即撤销令牌、用户版本变更传播到其他工作进程的最大延迟
+    TOKEN_STATE_CACHE_TTL: float = 5.0
+    # 限流
+    RATE_LIMIT_DEFAULT: str = ""  # 全局按 IP 限流规则，如 "600/minute"，留空为不启用
+    RATE_LIMIT_LOGIN: str = "5/minute"  # 登录接口按 IP 限流规则，留空为不启用
+    RATE_LIMIT_LOCAL_BATCH: int = 10  # 每个工作进程一次从 Redis 领取的最大令牌数
+    RATE_LIMIT_LEASE_SECONDS: float = 1.0  # 本地令牌储备的有效期(秒)
@@ -0,0 +1,14 @@
+class UploadConfig:
+    """文件上传配置"""
+
+    # 头像
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024  # 上传大小上限（字节），接收过程中超出即中止
+    AVATAR_SIZES: list[int] = [256, 128, 64]  # 生成的正方形缩略图边长（像素），第一个为默认头像
+    AVATAR_MAX_PIXELS: int = 40_000_000  # 原图像素数上限，防止解压炸弹
+    # 用户批量导入
+    USER_IMPORT_MAX_BYTES: int = (
+        256 * 1024 * 1024
+    )  # 导入请求体上限（字节），流式处理，内存占用与大小无关
+    # 图片处理进程池
+    IMAGE_WORKERS: int = 2  # 进程数（每个工作进程）
+    IMAGE_MAX_PENDING: int = 16  # 排队+执行中的最大任务数，超出时直接拒绝
@@ -1,33 +1,252 @@
+import asyncio
+import os
+from collections.abc import Awaitable, Callable
+from typing import Any
+
 import orjson
 import redis.asyncio as aioredis
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import ORMExecuteState, Session
 
 from app.core.config import get_settings
+from app.core.metrics import (
+    InstrumentedConnectionPool,
+    InstrumentedPool,
+    InstrumentedRedis,
+    PoolWaitStats,
+    instrument_engine,
+)
 
 settings = get_settings()
 
-async_engine = create_async_engine(
-    url=settings.SQLALCHEMY_DATABASE_URL,
-    # 连接池配置
-    pool_size=10,  # 核心连接池大小
-    max_overflow=20,  # 超出 pool_size 时允许创建的临时连接数
-    pool_timeout=30,  # 获取连接等待超时(秒)
-    pool_recycle=1800,  # 连接自动回收周期(秒)
-    pool_pre_ping=True,  # 执行前自动测试连接有效性
-    # 日志与调试
-    echo=False,  # 是否输出 SQL 日志
-    echo_pool=False,  # 是否记录连接池事件
-    # 性能优化
-    json_serializer=orjson.dumps,  # orjson 序列化
-    json_deserializer=orjson.loads,  # orjson 反序列化
-)
 
-async_session_factory = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,  # 提交后不自动过期对象
-    autoflush=False,  # 禁用自动 flush
-    future=True,  # 显示指定使用 SQLAlchemy 2.0 API
-)
+def _create_engine(url: str) -> AsyncEngine:
+    """创建异步引擎，主库与只读副本使用相同的配置"""
+    engine = create_async_engine(
+        url=url,
+        # 连接池配置
+        # 由连接预算按工作进程数平分，避免 WORKERS 个进程合计超出数据库连接上限
+        poolclass=InstrumentedPool,  # 记录获取连接的等待时间
+        pool_size=settings.POSTGRES_POOL_SIZE,  # 核心连接池大小
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,  # 超出 pool_size 时允许创建的临时连接数
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,  # 获取连接等待超时(秒)
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,  # 连接自动回收周期(秒)
+        pool_pre_ping=True,  # 执行前自动测试连接有效性
+        # 语句缓存
+        query_cache_size=settings.POSTGRES_STATEMENT_CACHE_SIZE,  # SQL 编译缓存
+        connect_args={
+            # 每个连接缓存的预编译语句数，命中时省去服务端解析与规划
+            "prepared_statement_cache_size": settings.POSTGRES_STATEMENT_CACHE_SIZE
+        },
+        # 日志与调试
+        echo=False,  # 是否输出 SQL 日志
+        echo_pool=False,  # 是否记录连接池事件
+        # 性能优化
+        json_serializer=orjson.dumps,  # orjson 序列化
+        json_deserializer=orjson.loads,  # orjson 反序列化
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+    return engine
+
+
+def _create_redis() -> aioredis.Redis:
+    redis_class = InstrumentedRedis if settings.METRICS_ENABLED else aioredis.Redis
+    return redis_class.from_pool(
+        InstrumentedConnectionPool.from_url(
+            url=settings.REDIS_URL,
+            max_connections=settings.REDIS_POOL_SIZE,
+            timeout=settings.REDIS_POOL_TIMEOUT,
+            decode_responses=True,
+        )
+    )
+
+
+class Resources:
+    """
+    数据库引擎、会话工厂与 Redis 客户端
+
+    - 导入本模块不创建任何资源，应用工厂 create_app 调用 init() 创建，
+      脚本、基准测试等未经过应用工厂的场景在首次访问时创建
+    - 应用关闭时由生命周期调用 close() 释放，之后再次访问会重新创建
+    """
+
+    def __init__(self):
+        self._engine: AsyncEngine | None = None
+        self._replica_engines: list[AsyncEngine] = []
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._redis: aioredis.Redis | None = None
+
+    def init(self) -> None:
+        """创建全部资源，已创建时不做任何事"""
+        if self._engine is None:
+            self._engine = _create_engine(settings.SQLALCHEMY_DATABASE_URL)
+            # 只读副本引擎，未配置副本时为空列表
+            self._replica_engines = [
+                _create_engine(url) for url in settings.SQLALCHEMY_REPLICA_URLS
+            ]
+            self._session_factory = async_sessionmaker(
+                bind=self._engine,
+                class_=AsyncSession,
+                expire_on_commit=False,  # 提交后不自动过期对象
+                autoflush=False,  # 禁用自动 flush
+                future=True,  # 显示指定使用 SQLAlchemy 2.0 API
+            )
+        if self._redis is None:
+            self._redis = _create_redis()
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """主库引擎"""
+        if self._engine is None:
+            self.init()
+        return self._engine
+
+    @property
+    def replica_engines(self) -> list[AsyncEngine]:
+        """只读副本引擎"""
+        if self._engine is None:
+            self.init()
+        return self._replica_engines
+
+    @property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        """绑定主库的会话工厂"""
+        if self._session_factory is None:
+            self.init()
+        return self._session_factory
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        """Redis 客户端"""
+        if self._redis is None:
+            self.init()
+        return self._redis
+
+    async def close(self) -> None:
+        """释放数据库连接与 Redis 连接"""
+        if self._engine is not None:
+            logger.info("释放数据库连接...")
+            await self._engine.dispose()
+            for engine in self._replica_engines:
+                await engine.dispose()
+            self._engine, self._replica_engines, self._session_factory = None, [], None
+        if self._redis is not None:
+            logger.info("释放 Redis 连接...")
+            await self._redis.aclose()
+            self._redis = None
+
+
+resources = Resources()
+
+
+async def _warm_up_engine(engine: AsyncEngine, size: int) -> None:
+    # 同时借出 size 个连接，确保连接池中建立了 size 个不同的连接
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(size)), return_exceptions=True
+    )
+    connections = [result for result in results if isinstance(result, AsyncConnection)]
+    try:
+        for connection in connections:
+            await connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            await connection.close()
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+async def _warm_up_redis(size: int) -> None:
+    pool = resources.redis.connection_pool
+    results = await asyncio.gather(
+        *(pool.get_connection() for _ in range(size)), return_exceptions=True
+    )
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        for connection in connections:
+            await connection.send_command("PING")
+            await connection.read_response()
+    finally:
+        for connection in connections:
+            await pool.release(connection)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+async def warm_up_pools() -> None:
+    """
+    预先建立连接并检测连通性，避免部署后的首批请求承担建连（TCP、TLS、认证）开销
+
+    数据库主库与各只读副本建立核心连接池大小的连接，Redis 建立同样数量的连接；
+    预热失败只记录警告，连接仍会在首次使用时按需建立
+    """
+    size = settings.POSTGRES_POOL_SIZE
+    targets = {"数据库主库": _warm_up_engine(resources.engine, size)}
+    for index, engine in enumerate(resources.replica_engines):
+        targets[f"只读副本 {index}"] = _warm_up_engine(engine, size)
+    targets["Redis"] = _warm_up_redis(min(size, settings.REDIS_POOL_SIZE))
+    results = await asyncio.gather(*targets.values(), return_exceptions=True)
+    for name, result in zip(targets, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.warning(f"{name} 连接池预热失败: {result!r}")
+        else:
+            logger.info(f"{name} 连接池预热完成")
+
+
+def pool_stats() -> dict[str, Any]:
+    """当前工作进程内各连接池的状态"""
+    return {
+        "pid": os.getpid(),
+        "workers": settings.WORKERS,
+        "primary": resources.engine.pool.stats(),
+        "replicas": [engine.pool.stats() for engine in resources.replica_engines],
+        "redis": resources.redis.connection_pool.stats(),
+    }
+
+
+def pool_wait_stats() -> list[PoolWaitStats]:
+    """当前工作进程内各连接池（主库、只读副本、Redis）的等待统计"""
+    return [
+        resources.engine.pool.wait_stats,
+        *(engine.pool.wait_stats for engine in resources.replica_engines),
+        resources.redis.connection_pool.wait_stats,
+    ]
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]]) -> None:
+    """注册事务提交成功后执行的异步回调（由 get_session 在提交后依次执行）"""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """执行并清空会话上注册的提交后回调"""
+    callbacks = session.info.pop("after_commit", [])
+    for callback in callbacks:
+        await callback()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_execute(orm_execute_state: ORMExecuteState) -> None:
+    # 文本 SQL 无法区分读写，保守地视为写入
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
 
-redis_client = aioredis.from_url(url=settings.REDIS_URL, decode_responses=True)
+def has_writes(session: AsyncSession) -> bool:
+    """会话中是否执行过写操作（flush 或非 SELECT 语句）"""
+    return session.info.get("has_writes", False)
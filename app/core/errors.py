@@ -16,4 +16,5 @@ class ErrorTypeEnum(StrEnum):
     PAYLOAD_TOO_LARGE = "PAYLOAD_TOO_LARGE"  # 请求体过大
     DATA_VALIDATION = "DATA_VALIDATION"  # 数据验证失败
     TOO_MANY_REQUESTS = "TOO_MANY_REQUESTS"  # 请求过于频繁
+    SERVICE_UNAVAILABLE = "SERVICE_UNAVAILABLE"  # 服务过载，暂时无法处理
     INTERNA_SERVER_ERROR = "INTERNA_SERVER_ERROR"  # 内部服务器错误
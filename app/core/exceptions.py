@@ -164,6 +164,17 @@ class TooManyRequestsException(APIException):
         )
 
 
+class ServiceUnavailableException(APIException):
+    """服务过载，暂时无法处理请求，如事件循环延迟过高、数据库连接池耗尽"""
+
+    def __init__(self, message: str = "Service overloaded, please retry later."):
+        super().__init__(
+            status_code=503,
+            error_type=ErrorTypeEnum.SERVICE_UNAVAILABLE,
+            message=message,
+        )
+
+
 class InternalServerException(APIException):
     """服务器内部错误"""
 
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.exceptions import TooManyRequestsException
+
+settings = get_settings()
+
+
+@dataclass
+class ExecutorStats:
+    """执行器统计信息（秒）"""
+
+    submitted: int = 0  # 已提交任务数
+    completed: int = 0  # 已完成任务数
+    rejected: int = 0  # 因队列已满被拒绝的任务数
+    wait_seconds_total: float = 0.0  # 任务在队列中等待的总时长
+    wait_seconds_max: float = 0.0
+    run_seconds_total: float = 0.0  # 任务实际执行的总时长
+    run_seconds_max: float = 0.0
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple) -> tuple[Any, float, float]:
+    """在工作线程/进程中执行任务，并返回开始与结束时间
+
+    使用 time.monotonic()，在 Linux 下跨进程可比较
+    """
+    started = time.monotonic()
+    result = fn(*args)
+    return result, started, time.monotonic()
+
+
+class BoundedExecutor:
+    """
+    有界执行器，用于将 CPU 密集型任务移出事件循环
+
+    - 固定大小的线程池/进程池，避免单个工作进程被大量计算任务拖垮
+    - 排队+执行中的任务数超过 max_pending 时直接抛出 TooManyRequestsException
+    - 分别统计任务的排队等待时长和实际执行时长
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_workers: int,
+        max_pending: int,
+        kind: Literal["thread", "process"] = "thread",
+    ):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self.stats = ExecutorStats()
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """当前排队+执行中的任务数"""
+        return self._pending
+
+    def start(self) -> None:
+        """创建底层线程池/进程池"""
+        if self._executor is not None:
+            return
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        logger.debug(f"执行器 {self.name} 已启动: {self.kind} x {self.max_workers}")
+
+    async def shutdown(self) -> None:
+        """等待已提交任务完成后关闭执行器"""
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        logger.debug(f"执行器 {self.name} 已关闭")
+
+    async def run[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """在执行器中运行 fn(*args)，队列已满时抛出 TooManyRequestsException"""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats.rejected += 1
+                raise TooManyRequestsException("Server is busy, please retry later.")
+            self._pending += 1
+            self.stats.submitted += 1
+        if self._executor is None:
+            self.start()
+        submitted_at = time.monotonic()
+        try:
+            future: Future = self._executor.submit(_timed_call, fn, args)
+        except BaseException:
+            self._release()
+            raise
+        # 在底层任务真正结束时才释放名额，即使等待方被取消，任务仍占用工作线程
+        future.add_done_callback(lambda _: self._release())
+        result, started_at, finished_at = await asyncio.wrap_future(future)
+        self._record(started_at - submitted_at, finished_at - started_at)
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            **asdict(self.stats),
+        }
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _record(self, wait_seconds: float, run_seconds: float) -> None:
+        wait_seconds = max(wait_seconds, 0.0)
+        stats = self.stats
+        stats.completed += 1
+        stats.wait_seconds_total += wait_seconds
+        stats.wait_seconds_max = max(stats.wait_seconds_max, wait_seconds)
+        stats.run_seconds_total += run_seconds
+        stats.run_seconds_max = max(stats.run_seconds_max, run_seconds)
+
+
+# 密码哈希执行器：bcrypt 在计算期间会释放 GIL，线程池即可并行
+password_executor = BoundedExecutor(
+    name="password-hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+# 图片处理执行器：解码与缩放为 CPU 密集型任务，在独立进程中执行，不占用工作进程的 CPU 时间片与 GIL
+image_executor = BoundedExecutor(
+    name="image",
+    max_workers=settings.IMAGE_WORKERS,
+    max_pending=settings.IMAGE_MAX_PENDING,
+    kind="process",
+)
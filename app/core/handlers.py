@@ -1,25 +1,39 @@
+from http import HTTPStatus
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import ORJSONResponse
 from loguru import logger
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from app.core.errors import ErrorTypeEnum
 from app.core.exceptions import APIException
-from app.schemas.response import Error, ErrorDetail, ErrorResponse
+from app.core.responses import (
+    EnvelopeResponse,
+    prerender_error,
+    prerender_exceptions,
+    render_error,
+)
+from app.schemas.response import ErrorDetail
 
 
 def register_handlers(app: FastAPI):
     """注册异常处理器"""
 
+    # 固定消息的错误响应体在启动时渲染一次，请求时直接发送字节
+    prerender_exceptions()
+    for status in (HTTPStatus.NOT_FOUND, HTTPStatus.METHOD_NOT_ALLOWED):
+        prerender_error(ErrorTypeEnum.HTTP_EXCEPTION, status.phrase)
+    internal_error_body = prerender_error(
+        ErrorTypeEnum.INTERNA_SERVER_ERROR, "Internal server error."
+    )
+
     @app.exception_handler(APIException)
     async def api_exception_handler(request: Request, exc: APIException):
         """处理自定义的业务异常"""
-        return ORJSONResponse(
+        return EnvelopeResponse(
             status_code=exc.status_code,
-            content=ErrorResponse(
-                error=Error(type=exc.error_type, message=exc.message, details=exc.details)
-            ).model_dump(),
+            content=render_error(exc.error_type, exc.message, exc.details),
+            headers=exc.headers,
         )
 
     @app.exception_handler(RequestValidationError)
@@ -28,15 +42,11 @@ def register_handlers(app: FastAPI):
         details = [
             ErrorDetail(field=error["loc"][-1], message=error["msg"]) for error in exc.errors()
         ]
-        return ORJSONResponse(
+        return EnvelopeResponse(
             status_code=422,
-            content=ErrorResponse(
-                error=Error(
-                    type=ErrorTypeEnum.DATA_VALIDATION,
-                    message="Request validation error.",
-                    details=details,
-                )
-            ).model_dump(),
+            content=render_error(
+                ErrorTypeEnum.DATA_VALIDATION, "Request validation error.", details
+            ),
         )
 
     @app.exception_handler(StarletteHTTPException)
@@ -49,14 +59,10 @@ def register_handlers(app: FastAPI):
         捕获所有由 FastAPI/Starlette 抛出的标准 HTTP 异常，
         并将其转换为统一的错误响应格式。
         """
-        return ORJSONResponse(
+        return EnvelopeResponse(
             status_code=exc.status_code,
-            content=ErrorResponse(
-                error=Error(
-                    type=ErrorTypeEnum.HTTP_EXCEPTION,
-                    message=exc.detail,
-                )
-            ).model_dump(),
+            content=render_error(ErrorTypeEnum.HTTP_EXCEPTION, exc.detail),
+            headers=exc.headers,
         )
 
     @app.exception_handler(Exception)
@@ -70,12 +76,4 @@ def register_handlers(app: FastAPI):
         """
         logger.exception(f"服务器内部错误: {exc}")
 
-        return ORJSONResponse(
-            status_code=500,
-            content=ErrorResponse(
-                error=Error(
-                    type=ErrorTypeEnum.INTERNA_SERVER_ERROR,
-                    message="Internal server error.",
-                )
-            ).model_dump(),
-        )
+        return EnvelopeResponse(status_code=500, content=internal_error_body)
@@ -0,0 +1,58 @@
+import importlib.util
+from pathlib import Path
+
+# 本模块在图片处理进程池的子进程中导入，只依赖标准库与 Pillow
+
+# Pillow 为可选依赖（uv sync --extra images），未安装时不注册头像上传接口
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# 允许上传的图片格式（Pillow 识别的格式名），按文件内容识别，与扩展名、Content-Type 无关
+ALLOWED_FORMATS = frozenset({"JPEG", "PNG", "WEBP", "GIF"})
+THUMBNAIL_SUFFIX = ".webp"
+
+
+class InvalidImageError(ValueError):
+    """无法识别、格式不允许或尺寸超出限制的图片"""
+
+
+def thumbnail_name(size: int) -> str:
+    return f"{size}{THUMBNAIL_SUFFIX}"
+
+
+def make_thumbnails(source: str, target_dir: str, sizes: list[int], max_pixels: int) -> list[str]:
+    """
+    解码 source，居中裁剪为正方形并按 sizes 缩放，以 <边长>.webp 保存到 target_dir
+
+    在进程池中执行；从大到小依次缩放，每个尺寸以上一个尺寸为输入。返回生成的文件名
+
+    Raises:
+        InvalidImageError: 图片无法解码、格式不允许或像素数超出 max_pixels
+    """
+    # 可选依赖: uv sync --extra images
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    largest = max(sizes)
+    try:
+        with Image.open(source) as image:
+            # 只读取文件头，尚未解码像素
+            if image.format not in ALLOWED_FORMATS:
+                raise InvalidImageError(f"unsupported image format: {image.format}")
+            if image.width * image.height > max_pixels:
+                raise InvalidImageError("image dimensions too large")
+            # JPEG 直接按缩小的比例解码（不小于最大缩略图），省去大部分解码与缩放开销
+            image.draft("RGB", (largest, largest))
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(str(e)) from e
+
+    target = Path(target_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    names = []
+    for size in sorted(sizes, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+        name = thumbnail_name(size)
+        image.save(target / name, "WEBP", quality=85, method=4)
+        names.append(name)
+    return names
@@ -0,0 +1,396 @@
+import asyncio
+import os
+import random
+import socket
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.config import get_settings
+from app.core.database import resources
+
+settings = get_settings()
+
+type JobHandler = Callable[..., Awaitable[Any]]
+
+# 把到期的延迟任务移入任务流: KEYS = [延迟队列, 任务流], ARGV = [当前时间戳, 最大数量]
+_PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for i, job in ipairs(due) do
+    redis.call('XADD', KEYS[2], '*', 'job', job)
+end
+if #due > 0 then
+    redis.call('ZREM', KEYS[1], unpack(due))
+end
+return #due
+"""
+# 关闭时等待执行中任务完成的时长(秒)，超时的任务被取消，由其他消费者超时接管
+_SHUTDOWN_TIMEOUT = 10.0
+# 处理函数的执行时限比可见性超时短的余量(秒，最多为可见性超时的一半)，
+# 保证超时的任务在被其他消费者接管之前已记录失败结果，不会同时在两个消费者中执行
+_TIMEOUT_MARGIN = 5.0
+
+
+@dataclass
+class JobStats:
+    """任务队列统计信息（本进程）"""
+
+    enqueued: int = 0  # 入队任务数
+    completed: int = 0  # 执行成功的任务数
+    retried: int = 0  # 失败后安排重试的次数
+    dead: int = 0  # 转入死信队列的任务数
+    reclaimed: int = 0  # 从超时未确认的消费者接管的任务数
+    run_seconds_total: float = 0.0  # 任务执行的总时长
+    latency_seconds_total: float = 0.0  # 从入队（或重试到期）到开始执行的总时长
+
+
+@dataclass(frozen=True, slots=True)
+class Job:
+    """任务消息，序列化后作为任务流条目的 job 字段"""
+
+    id: str
+    name: str
+    payload: dict[str, Any]
+    attempts: int = 0  # 已失败的次数
+    enqueued_at: float = 0.0  # 入队时间戳，重试时为重新入队的到期时间
+    error: str | None = None  # 最近一次失败的原因
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(asdict(self))
+
+    @classmethod
+    def loads(cls, data: str | bytes) -> "Job":
+        return cls(**orjson.loads(data))
+
+
+class JobQueue:
+    """
+    基于 Redis Streams 消费者组的后台任务队列
+
+    - <stream>          待执行任务（XADD / XREADGROUP），执行成功后 XACK + XDEL，流长度即积压数
+    - <stream>:delayed  延迟与重试任务(ZSET)，score 为到期时间戳，到期后由 Lua 脚本原子地移入任务流
+    - <stream>:dead     超出最大执行次数或没有处理函数的任务，保留最近 JOBS_DEAD_LETTER_MAX_LENGTH 条
+    - 投递语义为至少一次：任务超时、进程崩溃后会再次执行，处理函数需保证幂等
+    - 消费者名为 <主机名>-<pid>，每个应用进程或 worker 进程各一个；
+      崩溃的消费者留下的未确认任务超过 JOBS_VISIBILITY_TIMEOUT_SECONDS 后由其他消费者以 XAUTOCLAIM 接管，计为一次失败
+    - 处理函数的执行时限为可见性超时减去余量 _TIMEOUT_MARGIN，执行中的任务不会被其他消费者接管
+    - 无法解析的条目记录日志后确认丢弃
+    """
+
+    def __init__(
+        self,
+        stream: str,
+        group: str = "workers",
+        *,
+        concurrency: int,
+        batch_size: int,
+        block_seconds: float,
+        max_attempts: int,
+        backoff: float,
+        backoff_max: float,
+        visibility_timeout: float,
+        dead_letter_max_length: int,
+        redis: aioredis.Redis | None = None,
+    ):
+        self.stream = stream
+        self.delayed_key = f"{stream}:delayed"
+        self.dead_key = f"{stream}:dead"
+        self.group = group
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.block_seconds = block_seconds
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.visibility_timeout = visibility_timeout
+        self.handler_timeout = visibility_timeout - min(_TIMEOUT_MARGIN, visibility_timeout / 2)
+        self.dead_letter_max_length = dead_letter_max_length
+        self.stats = JobStats()
+        self.handlers: dict[str, JobHandler] = {}
+        self._redis = redis
+        self._promote = AsyncScript(None, _PROMOTE_SCRIPT.encode())
+        # 执行中的任务: 流条目 ID -> asyncio.Task
+        self._running: dict[str, asyncio.Task[None]] = {}
+        # 执行成功、等待批量确认的流条目 ID
+        self._acks: list[str] = []
+        self._tasks: list[asyncio.Task[None]] = []
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    def handler(self, name: str) -> Callable[[JobHandler], JobHandler]:
+        """注册任务处理函数，任务的 payload 作为关键字参数传入"""
+
+        def decorator(fn: JobHandler) -> JobHandler:
+            if name in self.handlers:
+                raise ValueError(f"任务 {name} 已注册")
+            self.handlers[name] = fn
+            return fn
+
+        return decorator
+
+    async def load_scripts(self) -> None:
+        """预加载脚本，避免首次调用时的 NOSCRIPT 重试往返"""
+        self._promote.sha = await self.redis.script_load(self._promote.script)
+
+    async def enqueue(self, name: str, *, delay: float = 0, **payload: Any) -> str:
+        """
+        提交任务，delay 秒后才开始执行，返回任务 ID
+
+        payload 需可由 orjson 序列化，执行时作为关键字参数传给处理函数
+        """
+        job = Job(id=uuid.uuid4().hex, name=name, payload=payload, enqueued_at=time.time() + delay)
+        if delay > 0:
+            await self.redis.zadd(self.delayed_key, {job.dumps(): job.enqueued_at})
+        else:
+            await self.redis.xadd(self.stream, {"job": job.dumps()})
+        self.stats.enqueued += 1
+        return job.id
+
+    async def enqueue_many(self, name: str, payloads: Iterable[dict[str, Any]]) -> list[str]:
+        """批量提交同一类任务，一次往返，返回与 payloads 顺序对应的任务 ID"""
+        now = time.time()
+        jobs = [Job(id=uuid.uuid4().hex, name=name, payload=p, enqueued_at=now) for p in payloads]
+        if not jobs:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for job in jobs:
+                pipe.xadd(self.stream, {"job": job.dumps()})
+            await pipe.execute()
+        self.stats.enqueued += len(jobs)
+        return [job.id for job in jobs]
+
+    async def _create_group(self) -> None:
+        """创建消费者组（不存在时），同时创建任务流"""
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def start(self) -> None:
+        """创建消费者组并开始消费"""
+        # 启动时确定，fork 出的子进程使用各自的 pid
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        await self._create_group()
+        self._tasks = [
+            asyncio.create_task(self._consume()),
+            asyncio.create_task(self._maintain()),
+        ]
+        logger.info(f"任务消费者已启动: {self.consumer}（并发 {self.concurrency}）")
+
+    async def shutdown(self) -> None:
+        """停止读取新任务，等待执行中的任务完成后确认"""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._running:
+            logger.info(f"等待 {len(self._running)} 个执行中的任务完成...")
+            _, pending = await asyncio.wait(self._running.values(), timeout=_SHUTDOWN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        try:
+            await self._flush_acks()
+            # 没有未确认的任务时移除本消费者，避免消费者组中残留已退出的进程
+            pending = await self.redis.xpending_range(
+                self.stream, self.group, "-", "+", 1, consumername=self.consumer
+            )
+            if not pending:
+                await self.redis.xgroup_delconsumer(self.stream, self.group, self.consumer)
+        except RedisError as e:
+            logger.warning(f"任务消费者退出清理失败: {e}")
+
+    async def _consume(self) -> None:
+        while True:
+            free = self.concurrency - len(self._running)
+            if free <= 0:
+                await asyncio.wait(self._running.values(), return_when=asyncio.FIRST_COMPLETED)
+                continue
+            try:
+                await self._flush_acks()
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {self.stream: ">"},
+                    count=min(free, self.batch_size),
+                    block=int(self.block_seconds * 1000),
+                )
+            except RedisError as e:
+                logger.warning(f"读取任务失败: {e}")
+                await asyncio.sleep(self.block_seconds)
+                if isinstance(e, ResponseError) and "NOGROUP" in str(e):
+                    # 任务流被删除后重新创建
+                    await self._create_group()
+                continue
+            for _, entries in response or ():
+                for entry_id, fields in entries:
+                    self._spawn(entry_id, fields)
+
+    async def _maintain(self) -> None:
+        """移入到期的延迟任务，并定期接管超时未确认的任务"""
+        reclaim_interval = self.visibility_timeout / 2
+        next_reclaim = time.monotonic() + reclaim_interval
+        while True:
+            await asyncio.sleep(self.block_seconds)
+            try:
+                while (
+                    await self._promote(
+                        keys=[self.delayed_key, self.stream],
+                        args=[time.time(), self.batch_size],
+                        client=self.redis,
+                    )
+                    == self.batch_size
+                ):
+                    pass
+                if time.monotonic() >= next_reclaim:
+                    next_reclaim = time.monotonic() + reclaim_interval
+                    await self._reclaim()
+            except RedisError as e:
+                logger.warning(f"任务队列维护失败: {e}")
+            except Exception:
+                # 维护任务退出后延迟任务不再到期执行，记录后继续
+                logger.exception("任务队列维护出错")
+
+    async def _reclaim(self) -> None:
+        cursor = "0-0"
+        while True:
+            cursor, entries, *_ = await self.redis.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer,
+                min_idle_time=int(self.visibility_timeout * 1000),
+                start_id=cursor,
+                count=self.batch_size,
+            )
+            for entry_id, fields in entries:
+                # 本进程执行中的任务由自身的超时处理
+                if entry_id in self._running:
+                    continue
+                self.stats.reclaimed += 1
+                job = self._parse(entry_id, fields)
+                if job is not None:
+                    await self._fail(entry_id, job, "visibility timeout exceeded")
+            if cursor == "0-0":
+                return
+
+    def _spawn(self, entry_id: str, fields: dict[str, str]) -> None:
+        task = asyncio.create_task(self._run(entry_id, fields))
+        self._running[entry_id] = task
+        task.add_done_callback(lambda _: self._running.pop(entry_id, None))
+
+    def _parse(self, entry_id: str, fields: dict[str, str] | None) -> Job | None:
+        """解析任务流条目，无法解析时安排确认丢弃并返回 None"""
+        try:
+            return Job.loads(fields["job"])
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"无法解析的任务 {entry_id}，已丢弃: {fields}")
+            self._acks.append(entry_id)
+            return None
+
+    async def _run(self, entry_id: str, fields: dict[str, str]) -> None:
+        job = self._parse(entry_id, fields)
+        if job is None:
+            return
+        handler = self.handlers.get(job.name)
+        try:
+            if handler is None:
+                await self._dead(entry_id, job, f"no handler registered for {job.name!r}")
+                return
+            started = time.time()
+            self.stats.latency_seconds_total += max(0.0, started - job.enqueued_at)
+            try:
+                async with asyncio.timeout(self.handler_timeout):
+                    await handler(**job.payload)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                logger.warning(
+                    f"任务 {job.name}（{job.id}）第 {job.attempts + 1} 次执行失败: {error}"
+                )
+                await self._fail(entry_id, job, error)
+                return
+            finally:
+                self.stats.run_seconds_total += time.time() - started
+        except RedisError as e:
+            # 失败结果未能写入，任务保持未确认状态，超时后由消费者接管
+            logger.warning(f"记录任务 {job.id} 失败结果时出错: {e}")
+            return
+        self.stats.completed += 1
+        self._acks.append(entry_id)
+
+    async def _flush_acks(self) -> None:
+        """批量确认并删除执行成功的任务"""
+        if not self._acks:
+            return
+        acks, self._acks = self._acks, []
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.xack(self.stream, self.group, *acks)
+                pipe.xdel(self.stream, *acks)
+                await pipe.execute()
+        except RedisError:
+            self._acks.extend(acks)
+            raise
+
+    async def _fail(self, entry_id: str, job: Job, error: str) -> None:
+        """记录一次失败：未超出最大执行次数时按指数退避安排重试，否则转入死信队列"""
+        attempts = job.attempts + 1
+        if attempts >= self.max_attempts:
+            await self._dead(entry_id, job, error)
+            return
+        delay = min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+        # 抖动，避免同时失败的任务同时重试
+        due = time.time() + delay * random.uniform(0.5, 1.0)
+        retry = Job(job.id, job.name, job.payload, attempts, due, error)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.delayed_key, {retry.dumps(): due})
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+        self.stats.retried += 1
+
+    async def _dead(self, entry_id: str, job: Job, error: str) -> None:
+        logger.error(f"任务 {job.name}（{job.id}）转入死信队列: {error}")
+        dead = Job(job.id, job.name, job.payload, job.attempts + 1, job.enqueued_at, error)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(
+                self.dead_key,
+                {"job": dead.dumps(), "failed_at": time.time()},
+                maxlen=self.dead_letter_max_length,
+                approximate=True,
+            )
+            pipe.xack(self.stream, self.group, entry_id)
+            pipe.xdel(self.stream, entry_id)
+            await pipe.execute()
+        self.stats.dead += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {**asdict(self.stats), "running": len(self._running)}
+
+
+job_queue = JobQueue(
+    settings.JOBS_STREAM,
+    concurrency=settings.JOBS_CONCURRENCY,
+    batch_size=settings.JOBS_BATCH_SIZE,
+    block_seconds=settings.JOBS_BLOCK_SECONDS,
+    max_attempts=settings.JOBS_MAX_ATTEMPTS,
+    backoff=settings.JOBS_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.JOBS_RETRY_BACKOFF_MAX_SECONDS,
+    visibility_timeout=settings.JOBS_VISIBILITY_TIMEOUT_SECONDS,
+    dead_letter_max_length=settings.JOBS_DEAD_LETTER_MAX_LENGTH,
+)
@@ -3,8 +3,24 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from loguru import logger
 
+from .avatars import avatar_store
+from .bodylimit import body_limit_stats
+from .coalesce import coalesce_snapshots
 from .config import get_settings
-from .database import async_engine, redis_client
+from .database import pool_stats, resources, warm_up_pools
+from .executors import image_executor, password_executor
+from .images import PILLOW_AVAILABLE
+from .jobs import job_queue
+from .metrics import multiprocess_exporter, registry
+from .overload import admission_controller, load_monitor
+from .passwords import password_hasher
+from .ratelimit import rate_limiter
+from .replicas import replica_router
+from .response_cache import response_cache
+from .security import access_token_cache
+from .signing import jwt_keyring
+from .staticfiles import static_assets
+from .token_store import refresh_token_store
 
 settings = get_settings()
 
@@ -17,14 +33,151 @@ class AppLifespanManager:
         logger.info(f"调试模式: {settings.DEBUG}")
         logger.info(f"服务绑定: {settings.SERVER_HOST}:{settings.SERVER_PORT}")
         logger.info(f"访问地址: {settings.PUBLIC_URL}")
+        settings.ensure_directories_exist()
+        # 启动时解析 JWT 密钥，配置错误（缺少私钥、密钥类型不支持）时直接失败
+        jwt_keyring.load()
+        resources.init()
+        replica_router.bind(resources.engine, resources.replica_engines)
+        password_executor.start()
+        if settings.POOL_WARMUP:
+            await warm_up_pools()
+        await refresh_token_store.load_scripts()
+        await rate_limiter.load_scripts()
+        await job_queue.load_scripts()
+        if settings.PASSWORD_HASH_TARGET_MS > 0:
+            await password_hasher.calibrate_shared(settings.PASSWORD_HASH_TARGET_MS)
+        await static_assets.startup()
+        if not PILLOW_AVAILABLE:
+            logger.warning("未安装 Pillow（uv sync --extra images），头像上传接口已禁用")
+        if settings.JOBS_CONSUMER_ENABLED:
+            await job_queue.start()
+        if settings.RESPONSE_CACHE_ENABLED:
+            await response_cache.start()
+        if settings.OVERLOAD_PROTECTION_ENABLED:
+            await load_monitor.start()
+        if settings.METRICS_ENABLED:
+            self.register_metrics()
+            if settings.WORKERS > 1:
+                await multiprocess_exporter.start()
+
+    def register_metrics(self):
+        """把各组件的统计快照导出为指标"""
+        registry.register_stats(
+            "password_executor",
+            password_executor.snapshot,
+            counters=(
+                "submitted",
+                "completed",
+                "rejected",
+                "wait_seconds_total",
+                "run_seconds_total",
+            ),
+        )
+        registry.register_stats(
+            "image_executor",
+            image_executor.snapshot,
+            counters=(
+                "submitted",
+                "completed",
+                "rejected",
+                "wait_seconds_total",
+                "run_seconds_total",
+            ),
+        )
+        registry.register_stats(
+            "avatars",
+            avatar_store.snapshot,
+            counters=(
+                "uploaded",
+                "deduplicated",
+                "rejected_too_large",
+                "rejected_invalid",
+                "bytes_received",
+            ),
+        )
+        registry.register_stats("password_policy", password_hasher.snapshot, counters=())
+        registry.register_stats(
+            "jobs",
+            job_queue.snapshot,
+            counters=(
+                "enqueued",
+                "completed",
+                "retried",
+                "dead",
+                "reclaimed",
+                "run_seconds_total",
+                "latency_seconds_total",
+            ),
+        )
+        registry.register_stats(
+            "response_cache",
+            response_cache.snapshot,
+            counters=(
+                "local_hits",
+                "redis_hits",
+                "stale_hits",
+                "misses",
+                "lock_waits",
+                "not_modified",
+                "invalidations",
+                "redis_errors",
+            ),
+        )
+        registry.register_stats(
+            "access_token_cache",
+            access_token_cache.snapshot,
+            counters=("hits", "misses", "evictions"),
+        )
+        registry.register_stats(
+            "body_limit",
+            body_limit_stats.snapshot,
+            counters=("rejected_declared", "rejected_streamed"),
+        )
+        registry.register_stats(
+            "admission",
+            admission_controller.snapshot,
+            counters=(
+                "admitted",
+                "queued",
+                "shed_overloaded",
+                "shed_queue_full",
+                "shed_queue_timeout",
+            ),
+        )
+        registry.register_stats("load", load_monitor.snapshot, counters=())
+        registry.register_stats(
+            "rate_limiter",
+            rate_limiter.snapshot,
+            counters=("redis_calls", "local_hits", "rejected", "redis_errors"),
+        )
+        registry.register_stats("db_replicas", replica_router.snapshot, counters=("fallbacks",))
+        pool_counters = ("checkouts", "timeouts", "wait_seconds_total")
+        registry.register_stats("db_pool", lambda: pool_stats()["primary"], counters=pool_counters)
+        registry.register_stats("redis_pool", lambda: pool_stats()["redis"], counters=pool_counters)
+        registry.register_collector(self.collect_coalescing)
+
+    @staticmethod
+    def collect_coalescing():
+        """请求合并（SingleFlight / DataLoader）的统计，按名称区分"""
+        for name, snapshot in coalesce_snapshots().items():
+            for key, value in snapshot.items():
+                kind = "gauge" if key in ("inflight", "pending") else "counter"
+                registry.family(f"coalesce_{key}", kind, f"coalesce {key}", ("name",)).set(
+                    (name,), value
+                )
 
     async def shutdown(self):
         """应用关闭时执行"""
         logger.info("关闭应用...")
-        logger.info("释放数据库连接...")
-        await async_engine.dispose()
-        logger.info("释放 Redis 连接...")
-        await redis_client.aclose()
+        if settings.METRICS_ENABLED and settings.WORKERS > 1:
+            await multiprocess_exporter.shutdown()
+        await load_monitor.shutdown()
+        await job_queue.shutdown()
+        await response_cache.shutdown()
+        logger.info("关闭密码哈希执行器...")
+        await password_executor.shutdown()
+        await image_executor.shutdown()
+        await resources.close()
 
 
 @asynccontextmanager
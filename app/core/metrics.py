@@ -0,0 +1,558 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Literal
+
+import orjson
+from loguru import logger
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as SATimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+type MetricKind = Literal["counter", "gauge", "histogram"]
+type Labels = tuple[str, ...]
+
+# 延迟直方图的默认桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricFamily:
+    """同名指标的集合，按标签值区分子序列"""
+
+    def __init__(
+        self,
+        name: str,
+        kind: MetricKind,
+        help: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # counter/gauge: 标签值 -> 数值；histogram: 标签值 -> [各桶计数..., +Inf 桶计数, 总和]
+        self.values: dict[Labels, Any] = {}
+
+    def inc(self, labels: Labels = (), value: float = 1.0) -> None:
+        """counter 增加 / gauge 增减"""
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def set(self, labels: Labels, value: float) -> None:
+        self.values[labels] = value
+
+    def observe(self, labels: Labels, value: float) -> None:
+        """histogram 记录一次观测值"""
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+
+    - 直方图按桶计数（非累积），渲染时才累加，记录一次观测只需一次二分查找
+    - 多工作进程时各进程定期把快照写入 METRICS_DIR/<pid>.json，
+      /metrics 合并所有快照：counter 与 histogram 求和；gauge 求和（_max 结尾的取最大值），
+      已退出进程的 gauge 不再计入
+    - collectors 在快照时调用，把执行器、缓存、限流器等组件的统计值导出为指标
+    - 指标只在事件循环内读写：快照在事件循环内构造（复制各序列的值），仅序列化与文件读写放到线程中
+    """
+
+    def __init__(self):
+        self.families: dict[str, MetricFamily] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def family(
+        self,
+        name: str,
+        kind: MetricKind,
+        help: str,
+        labelnames: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> MetricFamily:
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = MetricFamily(name, kind, help, labelnames, buckets)
+        return family
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def register_stats(
+        self, prefix: str, snapshot: Callable[[], dict[str, Any]], counters: tuple[str, ...]
+    ) -> None:
+        """把组件 snapshot() 返回的数值字段导出为 prefix_字段名 指标，counters 中的字段为 counter"""
+
+        def collect() -> None:
+            for key, value in snapshot().items():
+                if isinstance(value, bool) or not isinstance(value, int | float):
+                    continue
+                kind = "counter" if key in counters else "gauge"
+                self.family(f"{prefix}_{key}", kind, f"{prefix} {key}").set((), value)
+
+        self.register_collector(collect)
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回可序列化的快照（须在事件循环内调用），不引用注册表内可变的数据"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:  # 单个组件出错不影响其他指标
+                logger.warning(f"指标收集失败: {e}")
+        return {
+            "pid": os.getpid(),
+            "families": [
+                {
+                    "name": family.name,
+                    "kind": family.kind,
+                    "help": family.help,
+                    "labelnames": family.labelnames,
+                    "buckets": family.buckets,
+                    "values": [
+                        [list(labels), value.copy() if isinstance(value, list) else value]
+                        for labels, value in family.values.items()
+                    ],
+                }
+                for family in self.families.values()
+            ],
+        }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(snapshots: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """合并多个进程的快照"""
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        alive = snapshot["alive"]
+        for family in snapshot["families"]:
+            if family["kind"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(family["name"], {**family, "values": {}})
+            values = target["values"]
+            use_max = family["name"].endswith("_max")
+            for labels, value in family["values"]:
+                key = tuple(labels)
+                current = values.get(key)
+                if current is None:
+                    values[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    values[key] = [a + b for a, b in zip(current, value, strict=True)]
+                else:
+                    values[key] = max(current, value) if use_max else current + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus(merged: dict[str, dict[str, Any]]) -> str:
+    """渲染为 Prometheus 文本格式"""
+    lines = []
+    for name, family in sorted(merged.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        labelnames = tuple(family["labelnames"])
+        for labels, value in sorted(family["values"].items()):
+            if family["kind"] != "histogram":
+                lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip(family["buckets"], value, strict=False):
+                cumulative += count
+                le = _format_labels(labelnames, labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            cumulative += value[len(family["buckets"])]
+            le = _format_labels(labelnames, labels, 'le="+Inf"')
+            lines.append(f"{name}_bucket{le} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, labels)} {value[-1]}")
+            lines.append(f"{name}_count{_format_labels(labelnames, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+class MultiprocessExporter:
+    """多工作进程指标快照的写入与汇总"""
+
+    def __init__(self, registry: MetricsRegistry, directory: Path, interval: float):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{os.getpid()}.json"
+
+    async def start(self) -> None:
+        """清理已退出进程的快照，并开始定期写入本进程快照"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for path in self.directory.glob("*.json"):
+            if path.stem.isdigit() and not _pid_alive(int(path.stem)):
+                path.unlink(missing_ok=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.flush()
+
+    def flush(self) -> None:
+        self._write(self.registry.snapshot())
+
+    def _write(self, snapshot: dict[str, Any]) -> None:
+        data = orjson.dumps(snapshot)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(self.path)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(self._write, self.registry.snapshot())
+            except OSError as e:
+                logger.warning(f"写入指标快照失败: {e}")
+            except Exception:
+                # 写入任务退出后本进程的指标不再更新，记录后继续
+                logger.exception("生成指标快照出错")
+
+    async def collect(self) -> list[dict[str, Any]]:
+        """本进程的实时快照 + 其他进程最近一次写入的快照"""
+        own = self.registry.snapshot()
+        own["alive"] = True
+        return [own, *await asyncio.to_thread(self._read_others)]
+
+    def _read_others(self) -> list[dict[str, Any]]:
+        snapshots = []
+        for path in self.directory.glob("*.json"):
+            if path == self.path or not path.stem.isdigit():
+                continue
+            try:
+                snapshot = orjson.loads(path.read_bytes())
+            except (OSError, orjson.JSONDecodeError):
+                continue
+            snapshot["alive"] = _pid_alive(snapshot["pid"])
+            snapshots.append(snapshot)
+        return snapshots
+
+
+registry = MetricsRegistry()
+multiprocess_exporter = MultiprocessExporter(
+    registry, settings.METRICS_DIR, settings.METRICS_FLUSH_SECONDS
+)
+
+http_requests = registry.family(
+    "http_request_duration_seconds",
+    "histogram",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+http_in_flight = registry.family(
+    "http_requests_in_flight", "gauge", "HTTP requests currently being served", ("method",)
+)
+db_queries = registry.family(
+    "db_query_duration_seconds", "histogram", "Database statement execution time", ("operation",)
+)
+db_pool_checkout = registry.family(
+    "db_pool_checkout_seconds", "histogram", "Time spent waiting for a pooled DB connection"
+)
+redis_pool_checkout = registry.family(
+    "redis_pool_checkout_seconds", "histogram", "Time spent waiting for a pooled Redis connection"
+)
+redis_commands = registry.family(
+    "redis_command_duration_seconds", "histogram", "Redis command round-trip time", ("command",)
+)
+
+
+class RequestTimings:
+    """单个请求内的耗时分解（秒），用于 Server-Timing 响应头"""
+
+    __slots__ = ("db", "redis")
+
+    def __init__(self):
+        self.db = 0.0
+        self.redis = 0.0
+
+
+request_timings: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+def _route_label(scope: Scope) -> str:
+    """路由模板作为标签（而非实际路径），避免路径参数导致的标签基数膨胀"""
+    # 嵌套 include_router 时 scope["route"] 只有路由自身的相对路径，完整模板在 effective_route_context 中
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    route = context or scope.get("route")
+    if route is None:
+        return "<unmatched>"
+    return getattr(route, "path_format", None) or getattr(route, "path", "<unknown>")
+
+
+class MetricsMiddleware:
+    """
+    指标中间件（纯 ASGI）
+
+    记录每个路由的延迟直方图与进行中的请求数；
+    enable_server_timing 为 True 时在响应头中附加 Server-Timing（db / redis / app 耗时，毫秒）
+    """
+
+    def __init__(self, app: ASGIApp, enable_server_timing: bool = False):
+        self.app = app
+        self.enable_server_timing = enable_server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.enable_server_timing:
+                    elapsed = time.perf_counter() - started
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f"db;dur={timings.db * 1000:.2f}, redis;dur={timings.redis * 1000:.2f}, "
+                        f"app;dur={elapsed * 1000:.2f}",
+                    )
+            await send(message)
+
+        http_in_flight.inc((method,), 1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.inc((method,), -1)
+            request_timings.reset(token)
+            http_requests.observe(
+                (method, _route_label(scope), str(status)), time.perf_counter() - started
+            )
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """为引擎注册语句执行耗时的事件钩子"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        db_queries.observe((operation,), elapsed)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.db += elapsed
+
+
+class PoolWaitStats:
+    """连接池获取连接的次数、超时次数与等待时间统计"""
+
+    __slots__ = (
+        "checkouts",
+        "timeouts",
+        "wait_seconds_total",
+        "wait_seconds_max",
+        "_waiting",
+        "_recent_max",
+    )
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._waiting: list[float] = []  # 等待中的获取操作的开始时间（按开始先后排列）
+        self._recent_max = 0.0  # 上次 take_recent_wait() 以来完成的最长等待
+
+    def begin(self) -> float:
+        """开始一次获取连接，返回开始时间"""
+        started = time.perf_counter()
+        self._waiting.append(started)
+        return started
+
+    def record(self, started: float, timed_out: bool) -> float:
+        """结束一次获取连接，返回等待时长"""
+        elapsed = time.perf_counter() - started
+        self._waiting.remove(started)
+        self.checkouts += 1
+        self.timeouts += timed_out
+        self.wait_seconds_total += elapsed
+        self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+        self._recent_max = max(self._recent_max, elapsed)
+        return elapsed
+
+    def take_recent_wait(self) -> float:
+        """上次调用以来完成的最长等待，与仍在等待的获取操作已等待的最长时间，取较大值（秒）"""
+        current = time.perf_counter() - self._waiting[0] if self._waiting else 0.0
+        recent, self._recent_max = self._recent_max, 0.0
+        return max(recent, current)
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """记录获取连接等待时间的数据库连接池"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = self.wait_stats.begin()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except SATimeoutError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = self.wait_stats.record(started, timed_out)
+            db_pool_checkout.observe((), elapsed)
+            timings = request_timings.get()
+            if timings is not None:
+                timings.db += elapsed
+
+    def recreate(self) -> "InstrumentedPool":
+        # dispose() 时以相同参数重建连接池，沿用原有统计
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def stats(self) -> dict[str, Any]:
+        """连接池状态：核心连接数、已借出、空闲、溢出连接数与等待统计"""
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            **self.wait_stats.snapshot(),
+        }
+
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """记录获取连接等待时间的 Redis 连接池（连接用尽时等待而非直接报错）"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    async def get_connection(self, *args, **kwargs):
+        started = self.wait_stats.begin()
+        timed_out = False
+        try:
+            return await super().get_connection(*args, **kwargs)
+        except RedisConnectionError:
+            timed_out = True
+            raise
+        finally:
+            elapsed = self.wait_stats.record(started, timed_out)
+            redis_pool_checkout.observe((), elapsed)
+
+    def stats(self) -> dict[str, Any]:
+        """连接池状态：连接数上限、使用中、空闲连接数与等待统计"""
+        return {
+            "max_connections": self.max_connections,
+            "in_use": len(self._in_use_connections),
+            "idle": len(self._available_connections),
+            **self.wait_stats.snapshot(),
+        }
+
+
+def _record_redis(command: str, elapsed: float) -> None:
+    redis_commands.observe((command,), elapsed)
+    timings = request_timings.get()
+    if timings is not None:
+        timings.redis += elapsed
+
+
+class InstrumentedPipeline(Pipeline):
+    """记录整批执行耗时的 Redis 管道"""
+
+    async def execute(self, raise_on_error: bool = True) -> list[Any]:
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            _record_redis("PIPELINE", time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """记录每条命令往返耗时的 Redis 客户端"""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            _record_redis(str(args[0]).upper(), time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Prometheus 指标端点，多工作进程时汇总所有进程的快照"""
+    if settings.WORKERS > 1:
+        snapshots = await multiprocess_exporter.collect()
+    else:
+        snapshot = registry.snapshot()
+        snapshot["alive"] = True
+        snapshots = [snapshot]
+    return PlainTextResponse(
+        render_prometheus(merge_snapshots(snapshots)),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,19 +1,48 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
+from app.core.bodylimit import BodyLimitMiddleware
+from app.core.compression import CompressionMiddleware, available_codecs
 from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware
+from app.core.overload import AdmissionMiddleware
+from app.core.ratelimit import RateLimitMiddleware
 
 settings = get_settings()
 
 
 def register_middlewares(app: FastAPI):
     """注册中间件"""
-    # GZIP：对大于 1024 字节(1KB)的响应进行压缩，提升传输效率
+    # 限流：全局按客户端 IP 限流，静态文件与指标端点不计数
+    if settings.RATE_LIMIT_DEFAULT:
+        app.add_middleware(
+            RateLimitMiddleware,
+            rule=settings.RATE_LIMIT_DEFAULT,
+            exempt_paths=("/static", "/metrics"),
+        )
+    # 请求体大小：读取请求体时按路由的上限计数，超出即以 413 中止
+    app.add_middleware(BodyLimitMiddleware, max_bytes=settings.REQUEST_MAX_BODY_BYTES)
+    # 压缩：按 Accept-Encoding 协商 zstd/br/gzip，仅压缩文本类响应
     app.add_middleware(
-        GZipMiddleware,
-        minimum_size=1024,
+        CompressionMiddleware,
+        codecs=available_codecs(
+            zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+            brotli_level=settings.COMPRESSION_BROTLI_LEVEL,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        ),
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
     )
+    # 过载保护：限制并发与排队时长，过载时以 503 快速拒绝；健康检查、指标与令牌接口不受限制，导入导出不排队
+    if settings.OVERLOAD_PROTECTION_ENABLED:
+        app.add_middleware(
+            AdmissionMiddleware,
+            critical_paths=("/health", "/metrics", "/.well-known", f"{settings.API_PREFIX}/tokens"),
+            low_priority_paths=(
+                f"{settings.API_PREFIX}/users/export",
+                f"{settings.API_PREFIX}/users/import",
+            ),
+            retry_after=settings.OVERLOAD_RETRY_AFTER_SECONDS,
+        )
     # CORS：允许指定的外部源列表访问
     app.add_middleware(
         CORSMiddleware,
@@ -22,3 +51,6 @@ def register_middlewares(app: FastAPI):
         allow_methods=["*"],  # 允许所有 HTTP 方法
         allow_headers=["*"],  # 允许所有请求头
     )
+    # 指标：最外层，记录完整的请求耗时；调试模式下附加 Server-Timing 响应头
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, enable_server_timing=settings.DEBUG)
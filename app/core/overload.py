@@ -0,0 +1,259 @@
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.database import pool_wait_stats
+from app.core.errors import ErrorTypeEnum
+from app.core.exceptions import ServiceUnavailableException
+from app.core.responses import render_error
+
+settings = get_settings()
+
+# 请求优先级: critical 不受准入控制（健康检查、认证），normal 过载时拒绝、繁忙时排队，low 繁忙时不排队直接拒绝
+type Priority = Literal["critical", "normal", "low"]
+
+
+@dataclass
+class AdmissionStats:
+    """准入控制统计信息"""
+
+    admitted: int = 0  # 准入的请求数
+    queued: int = 0  # 经过排队才准入的请求数
+    shed_overloaded: int = 0  # 事件循环延迟或连接池等待超出阈值被拒绝的请求数
+    shed_queue_full: int = 0  # 排队已满（或低优先级请求无空闲名额）被拒绝的请求数
+    shed_queue_timeout: int = 0  # 排队超时被拒绝的请求数
+
+
+class LoadMonitor:
+    """
+    负载监测
+
+    按固定间隔采样事件循环延迟（定时器实际唤醒时间与预期时间之差）与各连接池获取连接的等待时长，
+    连续 sustained_samples 次采样中任一指标超出阈值才视为过载，单次停顿（如一次 GC、同步调用）不触发拒绝；
+    采样在事件循环内执行，事件循环被阻塞时恢复后的首次采样即反映阻塞时长
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        lag_threshold: float,
+        pool_wait_threshold: float,
+        sustained_samples: int,
+    ):
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+        self.pool_wait_threshold = pool_wait_threshold
+        self.sustained_samples = sustained_samples
+        self.loop_lag = 0.0  # 最近一次采样的事件循环延迟（秒）
+        self.pool_wait = 0.0  # 最近一个采样间隔内连接池的最长等待（秒）
+        self.over_threshold = 0  # 连续超出阈值的采样次数
+        self.overloaded = False
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.over_threshold = 0
+        self.overloaded = False
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.sample(max(0.0, loop.time() - expected))
+
+    def sample(self, lag: float) -> None:
+        """记录一次采样并更新过载状态"""
+        self.loop_lag = lag
+        self.pool_wait = max(stats.take_recent_wait() for stats in pool_wait_stats())
+        if self.loop_lag > self.lag_threshold or self.pool_wait > self.pool_wait_threshold:
+            self.over_threshold += 1
+        else:
+            self.over_threshold = 0
+        self.overloaded = self.over_threshold >= self.sustained_samples
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前状态快照"""
+        return {
+            "loop_lag_seconds": self.loop_lag,
+            "pool_wait_seconds": self.pool_wait,
+            "overloaded": int(self.overloaded),
+        }
+
+
+class AdmissionController:
+    """
+    并发准入控制
+
+    - 同时处理的请求数不超过 max_concurrency，超出的请求按到达顺序排队，排队超过 queue_timeout 秒即拒绝，
+      请求在过载时快速失败，而不是在各处（如数据库连接池）等待到超时
+    - 请求结束时名额直接移交给队首的请求
+    - 非线程安全，仅用于单个事件循环内
+    """
+
+    def __init__(self, max_concurrency: int, queue_size: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.stats = AdmissionStats()
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self, priority: Priority) -> bool:
+        """获取处理名额，失败时返回 False；成功后须调用 release()"""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.stats.admitted += 1
+            return True
+        if priority == "low" or len(self._waiters) >= self.queue_size:
+            self.stats.shed_queue_full += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            # 超时与名额移交同时发生时，名额已属于本请求
+            if waiter.done() and not waiter.cancelled():
+                self.stats.admitted += 1
+                self.stats.queued += 1
+                return True
+            self._discard(waiter)
+            self.stats.shed_queue_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # 客户端断开等原因被取消，已移交的名额交还
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        self.stats.admitted += 1
+        self.stats.queued += 1
+        return True
+
+    def release(self) -> None:
+        """释放名额，有排队的请求时移交给队首"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {**asdict(self.stats), "active": self.active, "waiting": len(self._waiters)}
+
+
+def service_unavailable(retry_after: int) -> ServiceUnavailableException:
+    """构造带 Retry-After 响应头的 503 异常"""
+    exc = ServiceUnavailableException()
+    exc.headers = {"Retry-After": str(retry_after)}
+    return exc
+
+
+load_monitor = LoadMonitor(
+    interval=settings.OVERLOAD_SAMPLE_INTERVAL_SECONDS,
+    lag_threshold=settings.OVERLOAD_LOOP_LAG_SECONDS,
+    pool_wait_threshold=settings.OVERLOAD_POOL_WAIT_SECONDS,
+    sustained_samples=settings.OVERLOAD_SUSTAINED_SAMPLES,
+)
+admission_controller = AdmissionController(
+    max_concurrency=settings.OVERLOAD_MAX_CONCURRENCY,
+    queue_size=settings.OVERLOAD_QUEUE_SIZE,
+    queue_timeout=settings.OVERLOAD_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+class AdmissionMiddleware:
+    """
+    过载保护中间件（纯 ASGI），按路径前缀划分请求优先级
+
+    - critical_paths: 不受限制，过载时健康检查与登录、刷新令牌仍可用
+    - low_priority_paths: 没有空闲名额时不排队，直接拒绝
+    - 其他请求在过载（事件循环延迟或连接池等待超出阈值）时直接拒绝，名额已满时排队
+    拒绝时返回 503 与 Retry-After 响应头
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        critical_paths: tuple[str, ...] = (),
+        low_priority_paths: tuple[str, ...] = (),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.critical_paths = critical_paths
+        self.low_priority_paths = low_priority_paths
+        self.retry_after = retry_after
+
+    def priority(self, path: str) -> Priority:
+        if path.startswith(self.critical_paths):
+            return "critical"
+        if path.startswith(self.low_priority_paths):
+            return "low"
+        return "normal"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority(scope["path"])
+        if priority == "critical":
+            await self.app(scope, receive, send)
+            return
+        if load_monitor.overloaded:
+            admission_controller.stats.shed_overloaded += 1
+            await self._reject(send)
+            return
+        if not await admission_controller.acquire(priority):
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_controller.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = render_error(
+            ErrorTypeEnum.SERVICE_UNAVAILABLE, "Service overloaded, please retry later."
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+async def health_endpoint(request: Request) -> JSONResponse:
+    """健康检查（不受准入控制），返回本工作进程的负载状态；过载时仍返回 200，仅表示进程存活"""
+    return JSONResponse(
+        {"status": "ok", **load_monitor.snapshot(), **admission_controller.snapshot()}
+    )
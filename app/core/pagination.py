@@ -0,0 +1,167 @@
+import base64
+import hashlib
+import hmac
+import uuid
+from datetime import date, datetime
+from typing import Any, Literal
+
+import orjson
+from sqlalchemy import ColumnElement, Select, func, literal, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.exceptions import DataValidationException
+from app.schemas.response import CursorPaginationInfo
+
+settings = get_settings()
+
+type TotalMode = Literal["none", "exact", "estimate"]
+
+# 游标签名长度（字节），截断的 HMAC-SHA256 足以防止伪造
+_SIGNATURE_SIZE = 16
+# 游标中以字符串保存（orjson 序列化）的排序列值，按列的 Python 类型还原
+_CURSOR_PARSERS = {
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+    uuid.UUID: uuid.UUID,
+}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes, scope: str) -> bytes:
+    message = scope.encode() + b"\x00" + payload
+    return hmac.digest(settings.SECRET_KEY.encode(), message, hashlib.sha256)[:_SIGNATURE_SIZE]
+
+
+def encode_cursor(values: tuple[Any, ...], scope: str) -> str:
+    """
+    编码不透明游标
+
+    游标内容为排序列的值，附带与 scope（排序方式）绑定的签名，
+    客户端无法篡改，也不能把一种排序的游标用于另一种排序
+    """
+    payload = orjson.dumps(values)
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload, scope))}"
+
+
+def decode_cursor(cursor: str, scope: str) -> list[Any]:
+    """解码并校验游标，无效时抛出 DataValidationException"""
+    try:
+        payload_part, _, signature_part = cursor.partition(".")
+        payload = _b64decode(payload_part)
+        signature = _b64decode(signature_part)
+    except ValueError as e:
+        raise DataValidationException(message="Invalid cursor") from e
+    if not hmac.compare_digest(signature, _sign(payload, scope)):
+        raise DataValidationException(message="Invalid cursor")
+    try:
+        values = orjson.loads(payload)
+    except orjson.JSONDecodeError as e:
+        raise DataValidationException(message="Invalid cursor") from e
+    if not isinstance(values, list):
+        raise DataValidationException(message="Invalid cursor")
+    return values
+
+
+def cursor_scope(order_by: tuple[ColumnElement, ...], descending: bool = False) -> str:
+    """游标的签名范围：排序列与方向"""
+    return f"{','.join(str(column) for column in order_by)}:{'desc' if descending else 'asc'}"
+
+
+def _cursor_bound(order_by: tuple[ColumnElement, ...], values: list[Any]) -> ColumnElement:
+    """游标值构成的行值，各绑定参数使用对应排序列的类型（而不是按 JSON 值推断）"""
+    if len(values) != len(order_by):
+        raise DataValidationException(message="Invalid cursor")
+    binds = []
+    for column, value in zip(order_by, values, strict=True):
+        try:
+            parse = _CURSOR_PARSERS.get(column.type.python_type)
+        except NotImplementedError:
+            parse = None
+        if parse is not None and isinstance(value, str):
+            try:
+                value = parse(value)
+            except ValueError as e:
+                raise DataValidationException(message="Invalid cursor") from e
+        binds.append(literal(value, column.type))
+    return tuple_(*binds)
+
+
+async def count_exact(session: AsyncSession, stmt: Select) -> int:
+    """精确总数：对查询执行 COUNT(*)，大表上代价与行数成正比"""
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return (await session.execute(count_stmt)).scalar_one()
+
+
+async def count_estimate(session: AsyncSession, table_name: str) -> int:
+    """
+    近似总数：读取 PostgreSQL 规划器统计信息 pg_class.reltuples
+
+    只反映整张表的行数（由 VACUUM/ANALYZE 更新），不适用于带过滤条件的查询；
+    表从未被分析过时 reltuples 为 -1，此时返回 -1 由调用方回退到精确计数
+    """
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": table_name},
+    )
+    estimate = result.scalar_one_or_none()
+    return -1 if estimate is None else estimate
+
+
+async def paginate_keyset[T](
+    session: AsyncSession,
+    stmt: Select[tuple[T]],
+    order_by: tuple[ColumnElement, ...],
+    size: int,
+    cursor: str | None = None,
+    descending: bool = False,
+    total: TotalMode = "none",
+) -> tuple[list[T], CursorPaginationInfo]:
+    """
+    键集（游标）分页
+
+    - 按 order_by 的列排序，用行值比较 (a, b) > (:a, :b) 定位起点，
+      由对应的复合索引直接跳转，深翻页与首页耗时相同（没有 OFFSET 扫描）
+    - order_by 的最后一列必须唯一（通常为主键），保证排序稳定
+    - 多取一行判断是否还有下一页，返回 (当前页条目, 分页元信息)
+    - total 为 "exact" 时执行 COUNT(*)；为 "estimate" 时读取规划器统计，
+      仅适用于未过滤的整表查询
+    """
+    scope = cursor_scope(order_by, descending)
+    base_stmt = stmt
+    if cursor is not None:
+        position = tuple_(*order_by)
+        bound = _cursor_bound(order_by, decode_cursor(cursor, scope))
+        stmt = stmt.where(position < bound if descending else position > bound)
+    ordering = [column.desc() if descending else column.asc() for column in order_by]
+    rows = list((await session.scalars(stmt.order_by(*ordering).limit(size + 1))).all())
+
+    has_more = len(rows) > size
+    items = rows[:size]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(tuple(getattr(last, column.key) for column in order_by), scope)
+
+    total_items = None
+    estimated = False
+    if total == "estimate":
+        table_name = base_stmt.get_final_froms()[0].name
+        total_items = await count_estimate(session, table_name)
+        estimated = total_items >= 0
+    if total == "exact" or total_items == -1:
+        total_items = await count_exact(session, base_stmt)
+    return items, CursorPaginationInfo(
+        size=size,
+        next_cursor=next_cursor,
+        has_more=has_more,
+        total_items=total_items,
+        total_is_estimate=estimated,
+    )
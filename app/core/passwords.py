@@ -0,0 +1,237 @@
+import asyncio
+import statistics
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Literal
+
+import orjson
+import redis.asyncio as aioredis
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.database import resources
+
+settings = get_settings()
+
+type HashScheme = Literal["bcrypt", "argon2id"]
+
+# 校准时工作因子的下限：即使硬件较慢超出目标耗时，也不低于该强度
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 31
+ARGON2_MIN_TIME_COST = 1
+# 校准使用的固定密码，耗时与密码内容无关
+_CALIBRATION_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordPolicy:
+    """密码哈希策略，新哈希按该策略生成，参数不一致的已有哈希在登录时重新生成"""
+
+    scheme: HashScheme = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_time_cost: int = 3
+    argon2_memory_cost: int = 65536  # KiB
+    argon2_parallelism: int = 1
+
+    @property
+    def cost(self) -> int:
+        """校准调整的工作因子：bcrypt 为轮数（每 +1 耗时翻倍），argon2id 为迭代次数（耗时线性增长）"""
+        return self.bcrypt_rounds if self.scheme == "bcrypt" else self.argon2_time_cost
+
+    def with_cost(self, cost: int) -> "PasswordPolicy":
+        if self.scheme == "bcrypt":
+            return replace(self, bcrypt_rounds=cost)
+        return replace(self, argon2_time_cost=cost)
+
+    def env(self) -> dict[str, str]:
+        """对应的环境变量"""
+        env = {"PASSWORD_HASH_SCHEME": self.scheme}
+        if self.scheme == "bcrypt":
+            env["PASSWORD_BCRYPT_ROUNDS"] = str(self.bcrypt_rounds)
+        else:
+            env["PASSWORD_ARGON2_TIME_COST"] = str(self.argon2_time_cost)
+            env["PASSWORD_ARGON2_MEMORY_COST"] = str(self.argon2_memory_cost)
+            env["PASSWORD_ARGON2_PARALLELISM"] = str(self.argon2_parallelism)
+        return env
+
+
+@dataclass(frozen=True, slots=True)
+class PasswordCheck:
+    """密码校验结果，可直接作为布尔值使用（等同于 valid）"""
+
+    valid: bool
+    needs_rehash: bool = False  # 密码正确，但哈希的算法或参数与当前策略不一致（低于或高于策略）
+
+    def __bool__(self) -> bool:
+        return self.valid
+
+
+def _argon2_hasher(policy: PasswordPolicy):
+    # 可选依赖: uv sync --extra argon2，首次使用时才导入
+    from argon2 import PasswordHasher as Argon2Hasher
+    from argon2 import Type
+
+    return Argon2Hasher(
+        time_cost=policy.argon2_time_cost,
+        memory_cost=policy.argon2_memory_cost,
+        parallelism=policy.argon2_parallelism,
+        type=Type.ID,
+    )
+
+
+class PasswordHasher:
+    """
+    按策略生成与校验密码哈希
+
+    - 哈希自带算法与参数（bcrypt: $2b$<轮数>$...，argon2id: $argon2id$v=19$m=..,t=..,p=..$...），
+      校验时按哈希前缀选择算法，因此策略变更后旧哈希仍可校验，并在登录时重新生成
+    - 工作因子可按目标耗时在本机校准（启动时或通过命令行），使登录的 CPU 开销随硬件调整
+    - 线程安全：策略为不可变对象，校准完成后整体替换
+    """
+
+    def __init__(self, policy: PasswordPolicy):
+        self.policy = policy
+
+    def hash(self, password: str) -> str:
+        policy = self.policy
+        if policy.scheme == "argon2id":
+            return _argon2_hasher(policy).hash(password)
+        import bcrypt
+
+        salt = bcrypt.gensalt(rounds=policy.bcrypt_rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed: str) -> PasswordCheck:
+        if hashed.startswith("$argon2"):
+            from argon2.exceptions import InvalidHashError, VerificationError
+
+            try:
+                # 按哈希自带的参数校验
+                valid = _argon2_hasher(self.policy).verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                valid = False
+        else:
+            import bcrypt
+
+            try:
+                valid = bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+            except ValueError:  # 不是有效的 bcrypt 哈希
+                valid = False
+        return PasswordCheck(valid=valid, needs_rehash=valid and self.needs_rehash(hashed))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """哈希的算法或参数与当前策略不一致"""
+        policy = self.policy
+        if hashed.startswith("$argon2"):
+            if policy.scheme != "argon2id":
+                return True
+            from argon2 import Type, extract_parameters
+
+            params = extract_parameters(hashed)
+            return (
+                params.type != Type.ID
+                or params.time_cost != policy.argon2_time_cost
+                or params.memory_cost != policy.argon2_memory_cost
+                or params.parallelism != policy.argon2_parallelism
+            )
+        if hashed.startswith("$2"):
+            # $2b$12$...
+            return policy.scheme != "bcrypt" or int(hashed[4:6]) != policy.bcrypt_rounds
+        return True
+
+    def measure(self, policy: PasswordPolicy, samples: int = 3) -> float:
+        """按 policy 生成哈希的耗时中位数（毫秒）"""
+        hasher = PasswordHasher(policy)
+        timings = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            hasher.hash(_CALIBRATION_PASSWORD)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def calibrate(self, target_ms: float, samples: int = 3) -> tuple[PasswordPolicy, float]:
+        """
+        在本机寻找耗时不超过 target_ms 的最高工作因子（算法与内存等其他参数不变）
+
+        Returns:
+            (校准后的策略, 该策略的实测耗时毫秒)，不修改当前策略
+        """
+        base = self.policy
+        if base.scheme == "bcrypt":
+            cost, max_cost = BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS
+            elapsed = self.measure(base.with_cost(cost), samples)
+            # 每增加一轮耗时翻倍
+            while cost < max_cost and elapsed * 2 <= target_ms:
+                cost += 1
+                elapsed = self.measure(base.with_cost(cost), samples)
+        else:
+            per_iteration = self.measure(base.with_cost(1), samples)
+            cost = max(ARGON2_MIN_TIME_COST, int(target_ms // per_iteration))
+            elapsed = self.measure(base.with_cost(cost), samples)
+            while cost > ARGON2_MIN_TIME_COST and elapsed > target_ms:
+                cost -= 1
+                elapsed = self.measure(base.with_cost(cost), samples)
+        if elapsed > target_ms:
+            logger.warning(
+                f"密码哈希校准: 最低工作因子 {cost} 的耗时 {elapsed:.0f}ms 已超出目标 {target_ms:.0f}ms"
+            )
+        return base.with_cost(cost), elapsed
+
+    async def calibrate_shared(
+        self, target_ms: float, redis: aioredis.Redis | None = None, ttl: int = 86400
+    ) -> PasswordPolicy:
+        """
+        校准并启用策略，所有工作进程（包括其他主机）共享同一个结果
+
+        第一个启动的进程校准后写入 Redis（SET NX），其他进程直接读取，
+        避免各进程校准结果不同导致哈希在登录时被反复重新生成；ttl 秒后的下一次启动重新校准
+        """
+        redis = redis if redis is not None else resources.redis
+        base = self.policy
+        key = (
+            f"password_policy:{base.scheme}:{target_ms:g}:"
+            f"{base.argon2_memory_cost}:{base.argon2_parallelism}"
+        )
+        stored = await redis.get(key)
+        if stored is None:
+            policy, elapsed = await asyncio.to_thread(self.calibrate, target_ms)
+            logger.info(
+                f"密码哈希校准: {policy.scheme} 工作因子 {policy.cost}，耗时 {elapsed:.0f}ms"
+            )
+            await redis.set(key, orjson.dumps(asdict(policy)), nx=True, ex=ttl)
+            stored = await redis.get(key)
+        self.policy = PasswordPolicy(**orjson.loads(stored))
+        return self.policy
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前策略"""
+        return asdict(self.policy)
+
+
+password_hasher = PasswordHasher(
+    PasswordPolicy(
+        scheme=settings.PASSWORD_HASH_SCHEME,
+        bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+        argon2_time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+        argon2_memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+        argon2_parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+    )
+)
+
+
+if __name__ == "__main__":
+    # 校准工作因子并输出对应的环境变量: python -m app.core.passwords --target-ms 250
+    import argparse
+
+    parser = argparse.ArgumentParser(description="按目标耗时校准密码哈希工作因子")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="单次哈希的目标耗时")
+    parser.add_argument("--scheme", choices=("bcrypt", "argon2id"), default=None)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.scheme:
+        password_hasher.policy = replace(password_hasher.policy, scheme=args.scheme)
+    policy, elapsed = password_hasher.calibrate(args.target_ms, args.samples)
+    print(f"# {policy.scheme} 工作因子 {policy.cost}，实测耗时 {elapsed:.0f}ms")
+    for name, value in policy.env().items():
+        print(f"{name}={value}")
@@ -0,0 +1,221 @@
+import time
+from dataclasses import dataclass
+
+import redis.asyncio as aioredis
+from loguru import logger
+from redis.commands.core import AsyncScript
+from redis.exceptions import RedisError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+from app.core.database import resources
+from app.core.errors import ErrorTypeEnum
+from app.core.exceptions import TooManyRequestsException
+from app.core.responses import render_error
+
+settings = get_settings()
+
+# 令牌桶: KEYS = [桶键], ARGV = [容量, 每毫秒补充令牌数, 申请令牌数]
+# 返回 [实际发放令牌数, 无令牌时建议的重试等待毫秒数]
+# 使用 Redis 服务器时间，避免多主机时钟偏差
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1000)
+local retry_after = 0
+if granted == 0 then
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+return {granted, retry_after}
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    """速率限制规则：period 秒内最多 limit 次，令牌按速率平滑补充"""
+
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """解析 "100/minute"、"10/second"、"5/30s" 形式的规则"""
+        count, _, unit = value.partition("/")
+        periods = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+        if unit in periods:
+            period = periods[unit]
+        elif unit.endswith("s") and unit[:-1].isdigit():
+            period = int(unit[:-1])
+        else:
+            raise ValueError(f"无效的速率限制规则: {value}")
+        return cls(limit=int(count), period=period)
+
+    @property
+    def rate_per_ms(self) -> float:
+        return self.limit / (self.period * 1000)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0.0  # 被拒绝时建议的重试等待秒数
+
+
+@dataclass(slots=True)
+class _Reservoir:
+    """工作进程本地的令牌储备"""
+
+    tokens: int
+    denied_until: float = 0.0
+
+
+class RateLimiter:
+    """
+    基于 Redis 令牌桶的分布式限流器
+
+    - 每次访问 Redis 都是一次 Lua 调用，由 Redis 原子地补充与发放令牌
+    - 每个工作进程一次最多领取 local_batch 个令牌存入本地储备，后续请求直接消耗本地令牌；
+      本地储备在 lease_seconds 秒后作废，被拒绝的结果也会在本地缓存到可重试时间为止
+    - 令牌总是先从 Redis 领取再使用，因此多进程下不会超发，只可能因储备作废而略微少放行
+    - Redis 不可用（连接失败、超时）时放行请求并计数，限流暂时失效而不是让所有受限请求返回 500
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis | None,
+        local_batch: int,
+        lease_seconds: float,
+        prefix: str = "ratelimit",
+        cache_size: int = 10000,
+    ):
+        self._redis = redis
+        self.local_batch = local_batch
+        self.lease_seconds = lease_seconds
+        self.prefix = prefix
+        self.redis_calls = 0
+        self.local_hits = 0
+        self.rejected = 0
+        self.redis_errors = 0
+        self._script = AsyncScript(None, _TOKEN_BUCKET_SCRIPT.encode())
+        self._local: LRUCache[str, _Reservoir] = LRUCache(cache_size)
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    async def load_scripts(self) -> None:
+        """预加载脚本，避免首次调用时的 NOSCRIPT 重试往返"""
+        self._script.sha = await self.redis.script_load(self._script.script)
+
+    async def hit(self, key: str, limit: RateLimit) -> RateLimitResult:
+        """消耗 key 的一个令牌"""
+        now = time.monotonic()
+        reservoir = self._local.get(key)
+        if reservoir is not None:
+            if reservoir.denied_until > now:
+                self.rejected += 1
+                return RateLimitResult(allowed=False, retry_after=reservoir.denied_until - now)
+            if reservoir.tokens > 0:
+                reservoir.tokens -= 1
+                self.local_hits += 1
+                return RateLimitResult(allowed=True)
+
+        self.redis_calls += 1
+        try:
+            granted, retry_after_ms = await self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[limit.limit, limit.rate_per_ms, self._batch_size(limit)],
+                client=self.redis,
+            )
+        except RedisError as e:
+            self.redis_errors += 1
+            logger.warning(f"限流器访问 Redis 失败，放行请求: {e}")
+            return RateLimitResult(allowed=True)
+        if granted == 0:
+            retry_after = retry_after_ms / 1000
+            self._local.set(key, _Reservoir(tokens=0, denied_until=now + retry_after), retry_after)
+            self.rejected += 1
+            return RateLimitResult(allowed=False, retry_after=retry_after)
+        if granted > 1:
+            self._local.set(key, _Reservoir(tokens=granted - 1), self.lease_seconds)
+        return RateLimitResult(allowed=True)
+
+    def _batch_size(self, limit: RateLimit) -> int:
+        # 小额度的规则（如登录 5 次/分钟）逐个领取，避免单个进程囤积令牌
+        return max(1, min(self.local_batch, limit.limit // 10))
+
+    def snapshot(self) -> dict[str, int]:
+        """返回当前统计快照"""
+        return {
+            "redis_calls": self.redis_calls,
+            "local_hits": self.local_hits,
+            "rejected": self.rejected,
+            "redis_errors": self.redis_errors,
+        }
+
+
+rate_limiter = RateLimiter(
+    None,
+    local_batch=settings.RATE_LIMIT_LOCAL_BATCH,
+    lease_seconds=settings.RATE_LIMIT_LEASE_SECONDS,
+)
+
+
+def too_many_requests(retry_after: float) -> TooManyRequestsException:
+    """构造带 Retry-After 响应头的 429 异常"""
+    exc = TooManyRequestsException()
+    exc.headers = {"Retry-After": str(max(1, round(retry_after)))}
+    return exc
+
+
+def client_ip(scope: Scope) -> str:
+    """客户端 IP（部署在反向代理后时需开启 uvicorn 的 proxy_headers）"""
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """全局限流中间件（纯 ASGI），按客户端 IP 计数"""
+
+    def __init__(self, app: ASGIApp, rule: str, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.limit = RateLimit.parse(rule)
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+        result = await rate_limiter.hit(f"global:{client_ip(scope)}", self.limit)
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+        body = render_error(ErrorTypeEnum.TOO_MANY_REQUESTS, "Too many requests.")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, round(result.retry_after))).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,147 @@
+import itertools
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+import redis.asyncio as aioredis
+from loguru import logger
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+from app.core.database import resources
+
+settings = get_settings()
+
+# 建立连接时视为副本不可用的异常
+_CONNECT_ERRORS = (OSError, TimeoutError, DBAPIError)
+
+
+class ReplicaRouter:
+    """
+    只读会话路由
+
+    - 只读会话使用 postgresql_readonly 执行选项开启只读事务（随 BEGIN 一起发送，没有额外往返）
+    - 按 round_robin（轮询）或 least_connections（连接池已借出连接最少）选择副本
+    - 打开会话时即建立连接，副本连接失败则暂停使用 retry_seconds 秒，
+      依次尝试其他健康副本，全部不可用时回退到主库
+    - 未配置副本时，只读会话直接使用主库
+    - 未传入引擎时，由应用生命周期启动时绑定应用的引擎（或首次使用时绑定）
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine | None,
+        replicas: list[AsyncEngine],
+        strategy: Literal["round_robin", "least_connections"],
+        retry_seconds: float,
+    ):
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self.fallbacks = 0  # 回退到主库的次数
+        self._counter = itertools.count()
+        self.primary: AsyncEngine | None = None
+        self.replicas: list[AsyncEngine] = []
+        self._unhealthy_until: list[float] = []
+        if primary is not None:
+            self.bind(primary, replicas)
+
+    def bind(self, primary: AsyncEngine, replicas: list[AsyncEngine]) -> None:
+        """绑定主库与副本引擎"""
+        self.primary = primary.execution_options(postgresql_readonly=True)
+        self.replicas = [
+            replica.execution_options(postgresql_readonly=True) for replica in replicas
+        ]
+        self._unhealthy_until = [0.0] * len(replicas)
+
+    def healthy_replicas(self) -> list[int]:
+        now = time.monotonic()
+        return [i for i, until in enumerate(self._unhealthy_until) if until <= now]
+
+    def choose(self, exclude: set[int] = frozenset()) -> int | None:
+        """选择一个健康副本的下标，没有可用副本时返回 None"""
+        candidates = [i for i in self.healthy_replicas() if i not in exclude]
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=lambda i: self.replicas[i].pool.checkedout())
+        return candidates[next(self._counter) % len(candidates)]
+
+    def mark_unhealthy(self, index: int, error: Exception) -> None:
+        self._unhealthy_until[index] = time.monotonic() + self.retry_seconds
+        logger.warning(f"只读副本 {index} 不可用，暂停 {self.retry_seconds} 秒: {error}")
+
+    @asynccontextmanager
+    async def session(self, use_primary: bool = False) -> AsyncIterator[AsyncSession]:
+        """打开只读会话（事务已开始，结束时回滚），use_primary 为 True 时直接使用主库"""
+        if self.primary is None:
+            self.bind(resources.engine, resources.replica_engines)
+        tried: set[int] = set()
+        while True:
+            index = None if use_primary else self.choose(tried)
+            engine = self.primary if index is None else self.replicas[index]
+            session = resources.session_factory(bind=engine)
+            try:
+                await session.connection()
+            except _CONNECT_ERRORS as e:
+                await session.close()
+                if index is None:
+                    raise
+                self.mark_unhealthy(index, e)
+                tried.add(index)
+                continue
+            if index is None and self.replicas and not use_primary:
+                self.fallbacks += 1
+            break
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    def snapshot(self) -> dict[str, int]:
+        """返回当前统计快照"""
+        return {
+            "replicas": len(self.replicas),
+            "healthy": len(self.healthy_replicas()),
+            "fallbacks": self.fallbacks,
+        }
+
+
+class ReadYourWrites:
+    """
+    写后读一致性：用户提交写事务后的 window 秒内，其只读会话使用主库
+
+    标记同时写入进程内缓存与 Redis（带过期时间），其他工作进程通过 Redis 感知
+    """
+
+    def __init__(self, redis: aioredis.Redis | None, window: float, cache_size: int = 10000):
+        self._redis = redis
+        self.window = window
+        self._local: LRUCache[str, bool] = LRUCache(cache_size)
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    async def mark(self, subject: str) -> None:
+        """记录用户刚刚提交了写入"""
+        self._local.set(subject, True, self.window)
+        await self.redis.set(f"primary_reads:{subject}", 1, px=int(self.window * 1000))
+
+    async def is_recent(self, subject: str) -> bool:
+        """用户是否在窗口期内提交过写入"""
+        if self._local.get(subject):
+            return True
+        return bool(await self.redis.exists(f"primary_reads:{subject}"))
+
+
+replica_router = ReplicaRouter(
+    None,
+    [],
+    strategy=settings.POSTGRES_REPLICA_STRATEGY,
+    retry_seconds=settings.POSTGRES_REPLICA_RETRY_SECONDS,
+)
+read_your_writes = ReadYourWrites(None, window=settings.POSTGRES_READ_YOUR_WRITES_SECONDS)
@@ -0,0 +1,425 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass
+from typing import Any, Literal
+
+import redis.asyncio as aioredis
+from fastapi import Request
+from fastapi.security.utils import get_authorization_scheme_param
+from loguru import logger
+from redis.exceptions import RedisError
+from starlette.responses import Response
+
+from app.core.cache import LRUCache
+from app.core.coalesce import SingleFlight
+from app.core.config import get_settings
+from app.core.database import resources
+from app.core.exceptions import APIException
+from app.core.responses import EnvelopeResponse
+from app.core.security import verify_access_token
+
+settings = get_settings()
+
+# 缓存区分调用方的粒度:
+# shared 所有通过路由鉴权的调用方共享，power 按权限等级区分，user 按用户区分
+type CacheVary = Literal["shared", "power", "user"]
+type TagsSpec = Iterable[str] | Callable[[Request], Iterable[str]]
+
+# 标签版本号的保留时长(秒)，需长于任何条目的 ttl + 旧响应保留时长
+TAG_RETENTION_SECONDS = 24 * 60 * 60
+# 单次失效的标签数超过该值时，通知各进程清空整个进程内缓存，而不是逐个发送标签
+LOCAL_FLUSH_TAGS = 1000
+# 等待其他进程生成响应时的轮询间隔(秒)
+WAIT_INTERVAL = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """缓存的响应体"""
+
+    body: bytes
+    etag: str  # 强 ETag，响应体的摘要
+    fresh_until: float  # 过期时间戳，之后为旧响应
+    versions: str  # 生成前读取的各标签版本号，与当前版本号不一致时条目作废
+
+
+@dataclass(frozen=True, slots=True)
+class _LocalEntry:
+    response: CachedResponse
+    tags: tuple[str, ...]
+    stored_at: float  # 生成或读取开始的 monotonic 时间，早于该标签的失效时间时作废
+
+
+@dataclass
+class ResponseCacheStats:
+    """响应缓存统计信息"""
+
+    local_hits: int = 0  # 进程内缓存命中次数
+    redis_hits: int = 0  # Redis 缓存命中次数
+    stale_hits: int = 0  # 其他请求正在重新生成、返回旧响应的次数
+    misses: int = 0  # 执行处理器生成响应的次数
+    lock_waits: int = 0  # 等待其他进程生成响应的次数
+    not_modified: int = 0  # 返回 304 的次数
+    invalidations: int = 0  # 失效的标签数
+    redis_errors: int = 0  # Redis 不可用、直接执行处理器（或失效未能写入）的次数
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否匹配（弱比较，压缩中间件会把强 ETag 降级为弱 ETag）"""
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+class ResponseCache:
+    """
+    接口响应缓存（进程内 LRU + Redis）
+
+    - resp_cache:{key}      Hash(body, etag, fresh, versions)，保留 ttl + 旧响应保留时长
+    - resp_cache:tag:{tag}  标签版本号，失效时 INCR；条目记录生成前读取的版本号，读取时与当前版本号比较，
+      生成期间发生的失效也不会被之后写入的条目掩盖，失效操作与条目数量无关
+    - resp_cache:invalidate 失效通知频道，各进程收到后丢弃进程内缓存中带有该标签的条目；
+      订阅中断期间的通知会丢失，重新订阅时清空进程内缓存，进程内缓存的时长也不超过 RESPONSE_CACHE_LOCAL_TTL
+    - 防击穿: 本进程内相同键的并发未命中合并为一次（SingleFlight），进程间通过 Redis 锁只允许一个请求重新生成，
+      其余请求返回旧响应，没有旧响应时等待生成结果
+    - Redis 出错时不缓存，直接调用 compute() 生成响应（来源为 BYPASS），缓存不可用不影响接口本身
+    """
+
+    def __init__(
+        self,
+        redis: aioredis.Redis | None,
+        prefix: str,
+        local_size: int,
+        local_ttl: float,
+        stale_seconds: float,
+        lock_seconds: float,
+    ):
+        self._redis = redis
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.local_ttl = local_ttl
+        self.stale_seconds = stale_seconds
+        self.lock_seconds = lock_seconds
+        self.stats = ResponseCacheStats()
+        self._local: LRUCache[str, _LocalEntry] = LRUCache(local_size)
+        # 最近失效的标签 -> 失效时间(monotonic)，只保留 local_ttl 内的记录（更早的条目已过期）
+        self._invalidated: dict[str, float] = {}
+        self.flight: SingleFlight[str, tuple[CachedResponse, str]] = SingleFlight(prefix)
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    def entry_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+    def lock_key(self, key: str) -> str:
+        return f"{self.prefix}:lock:{key}"
+
+    async def start(self) -> None:
+        """开始订阅失效通知"""
+        self._task = asyncio.create_task(self._listen())
+
+    async def shutdown(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def get(
+        self,
+        key: str,
+        tags: tuple[str, ...],
+        ttl: float,
+        compute: Callable[[], Awaitable[bytes]],
+    ) -> tuple[CachedResponse, str]:
+        """
+        获取缓存的响应，未命中时调用 compute() 生成并写入缓存
+
+        返回 (响应, 来源)，来源为 HIT / MISS / STALE / BYPASS；
+        同一个键的并发调用只执行第一个调用方的 compute()，其结果返回给所有调用方
+        """
+        entry = self._local.get(key)
+        if entry is not None and self._locally_valid(entry):
+            self.stats.local_hits += 1
+            return entry.response, "HIT"
+        return await self.flight.do(key, lambda: self._load(key, tags, ttl, compute))
+
+    async def invalidate(self, *tags: str) -> None:
+        """使带有任一标签的缓存条目失效（所有进程）"""
+        if not tags:
+            return
+        self.stats.invalidations += len(tags)
+        self._forget(tags)
+        try:
+            for start in range(0, len(tags), LOCAL_FLUSH_TAGS):
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for tag in tags[start : start + LOCAL_FLUSH_TAGS]:
+                        pipe.incr(self.tag_key(tag))
+                        pipe.expire(self.tag_key(tag), TAG_RETENTION_SECONDS)
+                    await pipe.execute()
+            message = "*" if len(tags) > LOCAL_FLUSH_TAGS else "\n".join(tags)
+            await self.redis.publish(self.channel, message)
+        except RedisError as e:
+            # 在事务提交后调用，不影响已完成的写入；Redis 中的条目最迟在 ttl + 旧响应保留时长后过期
+            self.stats.redis_errors += 1
+            logger.warning(f"响应缓存失效失败: {e}")
+
+    def clear_local(self) -> None:
+        """清空本进程的缓存"""
+        self._local.clear()
+        self._invalidated.clear()
+
+    def _locally_valid(self, entry: _LocalEntry) -> bool:
+        return all(self._invalidated.get(tag, -1.0) < entry.stored_at for tag in entry.tags)
+
+    def _forget(self, tags: Iterable[str]) -> None:
+        """记录本进程内标签的失效时间，并清理早于进程内缓存时长的记录"""
+        now = time.monotonic()
+        for tag in tags:
+            self._invalidated.pop(tag, None)
+            self._invalidated[tag] = now
+        while self._invalidated:
+            tag, at = next(iter(self._invalidated.items()))
+            if at > now - self.local_ttl:
+                break
+            del self._invalidated[tag]
+
+    def _store_local(self, key: str, tags: tuple[str, ...], response: CachedResponse, at: float):
+        # 从 at 起算，保证条目过期前其间标签的失效记录不会被清理
+        ttl = min(self.local_ttl - (time.monotonic() - at), response.fresh_until - time.time())
+        self._local.set(key, _LocalEntry(response, tags, at), ttl=ttl)
+
+    async def _load(
+        self,
+        key: str,
+        tags: tuple[str, ...],
+        ttl: float,
+        compute: Callable[[], Awaitable[bytes]],
+    ) -> tuple[CachedResponse, str]:
+        started = time.monotonic()
+        lock_key = self.lock_key(key)
+        try:
+            cached, versions = await self._read(key, tags)
+            if cached is not None and cached.fresh_until > time.time():
+                self.stats.redis_hits += 1
+                self._store_local(key, tags, cached, started)
+                return cached, "HIT"
+
+            if not await self.redis.set(lock_key, 1, nx=True, px=int(self.lock_seconds * 1000)):
+                if cached is not None:
+                    self.stats.stale_hits += 1
+                    return cached, "STALE"
+                self.stats.lock_waits += 1
+                waited = await self._wait(key, tags)
+                if waited is not None:
+                    self._store_local(key, tags, waited, started)
+                    return waited, "HIT"
+                # 生成方出错、生成期间条目已失效或等待超时，自行生成
+        except RedisError as e:
+            self.stats.redis_errors += 1
+            logger.warning(f"响应缓存读取失败，直接执行处理器: {e}")
+            self.stats.misses += 1
+            body = await compute()
+            return CachedResponse(body, make_etag(body), time.time() + ttl, ""), "BYPASS"
+        try:
+            self.stats.misses += 1
+            body = await compute()
+            response = CachedResponse(
+                body=body, etag=make_etag(body), fresh_until=time.time() + ttl, versions=versions
+            )
+            stored = await self._write(key, response, ttl)
+        finally:
+            await self._unlock(lock_key)
+        # 未写入 Redis 时也不放入进程内缓存（此时失效通知同样可能无法送达）
+        if stored:
+            self._store_local(key, tags, response, started)
+        return response, "MISS"
+
+    async def _write(self, key: str, response: CachedResponse, ttl: float) -> bool:
+        """写入 Redis，出错时返回 False"""
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(
+                    self.entry_key(key),
+                    mapping={
+                        "body": response.body,
+                        "etag": response.etag,
+                        "fresh": response.fresh_until,
+                        "versions": response.versions,
+                    },
+                )
+                pipe.pexpire(self.entry_key(key), int((ttl + self.stale_seconds) * 1000))
+                await pipe.execute()
+        except RedisError as e:
+            self.stats.redis_errors += 1
+            logger.warning(f"响应缓存写入失败: {e}")
+            return False
+        return True
+
+    async def _unlock(self, lock_key: str) -> None:
+        try:
+            await self.redis.delete(lock_key)
+        except RedisError as e:
+            # 锁在 lock_seconds 后自动过期
+            logger.warning(f"响应缓存释放锁失败: {e}")
+
+    async def _read(self, key: str, tags: tuple[str, ...]) -> tuple[CachedResponse | None, str]:
+        """读取 Redis 中的条目与各标签的当前版本号，版本号不一致的条目视为不存在"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self.entry_key(key))
+            if tags:
+                pipe.mget([self.tag_key(tag) for tag in tags])
+            data, *rest = await pipe.execute()
+        versions = ",".join(version or "0" for version in rest[0]) if tags else ""
+        if not data or data["versions"] != versions:
+            return None, versions
+        cached = CachedResponse(
+            body=data["body"].encode(),
+            etag=data["etag"],
+            fresh_until=float(data["fresh"]),
+            versions=versions,
+        )
+        return cached, versions
+
+    async def _wait(self, key: str, tags: tuple[str, ...]) -> CachedResponse | None:
+        """等待持有锁的请求生成响应，锁已释放仍没有可用的条目或等待超时时返回 None"""
+        deadline = time.monotonic() + self.lock_seconds
+        while time.monotonic() < deadline:
+            await asyncio.sleep(WAIT_INTERVAL)
+            cached, _ = await self._read(key, tags)
+            if cached is not None and cached.fresh_until > time.time():
+                return cached
+            if not await self.redis.exists(self.lock_key(key)):
+                break
+        return None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    # 订阅建立之前的通知可能已丢失
+                    self.clear_local()
+                    async for message in pubsub.listen():
+                        if message["data"] == "*":
+                            self.clear_local()
+                        else:
+                            self._forget(message["data"].split("\n"))
+            except RedisError as e:
+                logger.warning(f"响应缓存失效通知订阅中断: {e}")
+                await asyncio.sleep(1)
+
+    def snapshot(self) -> dict[str, Any]:
+        """返回当前统计快照"""
+        return {**asdict(self.stats), "local_size": len(self._local)}
+
+
+response_cache = ResponseCache(
+    None,
+    prefix="resp_cache",
+    local_size=settings.RESPONSE_CACHE_SIZE,
+    local_ttl=settings.RESPONSE_CACHE_LOCAL_TTL,
+    stale_seconds=settings.RESPONSE_CACHE_STALE_SECONDS,
+    lock_seconds=settings.RESPONSE_CACHE_LOCK_SECONDS,
+)
+
+
+async def request_scope(request: Request, vary: CacheVary) -> str:
+    """请求的调用方范围，作为缓存键的一部分（令牌验证结果有缓存）"""
+    if vary == "shared":
+        return ""
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return "anonymous"
+    try:
+        payload = await verify_access_token(token)
+    except APIException:
+        return "anonymous"
+    return f"user:{payload['sub']}" if vary == "user" else f"power:{payload['pwr']}"
+
+
+def cache_key(request: Request, scope: str) -> str:
+    """按调用方范围、路径与查询参数（顺序无关）生成缓存键"""
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    material = f"{scope}\n{request.url.path}\n{query}"
+    return hashlib.blake2b(material.encode(), digest_size=16).hexdigest()
+
+
+def cache_response[F: Callable](ttl: float, tags: TagsSpec = (), vary: CacheVary = "user"):
+    """
+    GET 路由的响应缓存装饰器，需写在路由装饰器下方:
+
+        @router.get("/{user_id}")
+        @cache_response(ttl=60, tags=lambda request: [f"user:{request.path_params['user_id']}"])
+        async def get_user(...): ...
+
+    - 依赖项（鉴权等）照常执行，缓存在处理器执行前查找，命中时不执行处理器
+    - 响应带强 ETag，请求的 If-None-Match 匹配时返回 304
+    - tags 为标签列表或由请求生成标签的函数，数据变更后调用 response_cache.invalidate(标签) 使其失效，
+      如用户 {id} 的各个视图使用 user:{id}，用户列表使用 users
+    - 处理器需返回可序列化的对象（而非 Response），只缓存成功的响应，抛出的异常不缓存
+    - 同一缓存键的并发未命中只执行第一个请求的处理器（使用该请求的依赖项，如数据库会话、当前用户），
+      其结果返回给所有请求：处理器的结果只能取决于路径、查询参数与 vary 对应的调用方范围，
+      不能依赖其他请求相关的内容（如请求头、Cookie、vary="shared" 时的当前用户）
+    - Redis 不可用时不缓存，每个请求直接执行处理器
+    """
+    if ttl + settings.RESPONSE_CACHE_STALE_SECONDS >= TAG_RETENTION_SECONDS:
+        raise ValueError(f"响应缓存时长需小于 {TAG_RETENTION_SECONDS} 秒")
+
+    def decorator(endpoint: F) -> F:
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return endpoint
+        signature = inspect.signature(endpoint)
+        # 处理器没有声明 Request 参数时追加一个，由 FastAPI 注入
+        request_param = next(
+            (name for name, p in signature.parameters.items() if p.annotation is Request), None
+        )
+        injected = request_param is None
+        if injected:
+            request_param = "response_cache_request"
+            parameter = inspect.Parameter(
+                request_param, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+            )
+            signature = signature.replace(parameters=[*signature.parameters.values(), parameter])
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs) -> Response:
+            request: Request = kwargs.pop(request_param) if injected else kwargs[request_param]
+            key = cache_key(request, await request_scope(request, vary))
+            entry_tags = tuple(tags(request) if callable(tags) else tags)
+
+            async def compute() -> bytes:
+                return EnvelopeResponse(content=await endpoint(*args, **kwargs)).body
+
+            cached, source = await response_cache.get(key, entry_tags, ttl, compute)
+            # 需要鉴权的响应不允许共享缓存（代理、CDN）保存；客户端每次使用前需以 ETag 验证
+            private = vary != "shared" or "authorization" in request.headers
+            headers = {
+                "ETag": cached.etag,
+                "Cache-Control": "private, no-cache" if private else "no-cache",
+                "X-Cache": source,
+            }
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match is not None and etag_matches(if_none_match, cached.etag):
+                response_cache.stats.not_modified += 1
+                return Response(status_code=304, headers=headers)
+            return Response(cached.body, headers=headers, media_type="application/json")
+
+        wrapper.__signature__ = signature
+        return wrapper
+
+    return decorator
@@ -0,0 +1,63 @@
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.core.errors import ErrorTypeEnum
+from app.core.exceptions import APIException
+from app.schemas.response import Error, ErrorDetail, ErrorResponse
+
+# 按运行时类型推断序列化方式，BaseModel 直接使用其自身的核心序列化器
+_any_adapter = TypeAdapter(Any)
+
+# 固定消息错误的预渲染响应体，键为 (错误类型, 错误消息)
+_prerendered_errors: dict[tuple[ErrorTypeEnum, str], bytes] = {}
+
+
+class EnvelopeResponse(JSONResponse):
+    """
+    统一响应信封的 JSON 响应
+
+    内容（SuccessResponse / PaginatedResponse / ErrorResponse 或任意可序列化对象）
+    由 Pydantic 核心一次性序列化为字节，不经过 model_dump() 的中间字典；
+    bytes 视为已渲染的响应体，原样发送
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return _any_adapter.dump_json(content)
+
+
+def render_error(
+    error_type: ErrorTypeEnum, message: str, details: list[ErrorDetail] | None = None
+) -> bytes:
+    """渲染错误响应体，固定消息的错误直接返回预渲染结果"""
+    if details is None:
+        body = _prerendered_errors.get((error_type, message))
+        if body is not None:
+            return body
+    error = ErrorResponse(error=Error(type=error_type, message=message, details=details))
+    return error.__pydantic_serializer__.to_json(error)
+
+
+def prerender_error(error_type: ErrorTypeEnum, message: str) -> bytes:
+    """预渲染并登记一个固定消息错误的响应体"""
+    body = render_error(error_type, message)
+    _prerendered_errors[(error_type, message)] = body
+    return body
+
+
+def prerender_exceptions() -> int:
+    """为所有 APIException 子类的默认消息预渲染响应体，返回登记数量"""
+    pending = list(APIException.__subclasses__())
+    while pending:
+        exc_class = pending.pop()
+        pending.extend(exc_class.__subclasses__())
+        try:
+            exc = exc_class()
+        except TypeError:  # 没有默认消息的异常
+            continue
+        if exc.details is None:
+            prerender_error(exc.error_type, exc.message)
+    return len(_prerendered_errors)
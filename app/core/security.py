@@ -1,39 +1,145 @@
+import asyncio
+import hashlib
 import random
+import time
 import uuid
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from typing import Any, Protocol
 
-import bcrypt
-from jose import JWTError, jwt
-from jose.exceptions import ExpiredSignatureError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
 from app.core.config import get_settings
-from app.core.database import redis_client
-from app.core.exceptions import PermissionDeniedException, UnauthorizedException
+from app.core.database import on_commit
+from app.core.exceptions import (
+    APIException,
+    PermissionDeniedException,
+    TokenExpiredException,
+    UnauthorizedException,
+)
+from app.core.executors import password_executor
+from app.core.passwords import PasswordCheck, password_hasher
+from app.core.signing import TokenDecodeError, TokenExpiredError, jwt_codec
+from app.core.token_state import issued_at_now, token_state_store
+from app.core.token_store import refresh_token_store
+from app.models.enums import PowerEnum
 from app.models.user import User
 
 settings = get_settings()
 
+# 批量生成密码哈希时每个执行器任务包含的密码数
+PASSWORD_HASH_CHUNK_SIZE = 16
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码哈希"""
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+@dataclass(frozen=True, slots=True)
+class TokenRejection:
+    """被缓存的令牌验证失败结果，命中时重新构造异常抛出"""
+
+    exc_type: type[APIException]
+    message: str
+
+    def to_exception(self) -> APIException:
+        return self.exc_type(message=self.message)
+
+
+class UserIdentity(Protocol):
+    """用户身份，ORM 模型 User 与令牌声明解析出的 CurrentUser 均满足"""
+
+    id: int
+    power: PowerEnum
+
+
+# 已验证 Access Token 的进程内缓存: 令牌摘要 -> payload 或 TokenRejection
+access_token_cache: LRUCache[bytes, dict | TokenRejection] = LRUCache(settings.TOKEN_CACHE_SIZE)
+
+
+# bcrypt、argon2 与 cryptography（非对称签名密钥）在首次使用时才导入，
+# 不需要签发或校验令牌的导入方（脚本、基准测试、模型定义等）无需承担其导入开销
+
+
+def verify_password(plain_password: str, hashed_password: str) -> PasswordCheck:
+    """验证密码哈希，结果可直接作为布尔值使用；needs_rehash 为 True 时应按当前策略重新生成哈希"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """生成密码哈希"""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+    """按当前密码哈希策略生成密码哈希"""
+    return password_hasher.hash(password)
 
 
-def create_access_token(sub: str, expires_delta: timedelta | None = None) -> str:
-    """创建 Access Token"""
+async def async_verify_password(plain_password: str, hashed_password: str) -> PasswordCheck:
+    """在密码哈希执行器中验证密码哈希，避免阻塞事件循环
+
+    Raises:
+        TooManyRequestsException: 执行器队列已满时抛出
+    """
+    return await password_executor.run(verify_password, plain_password, hashed_password)
+
+
+async def async_get_password_hash(password: str) -> str:
+    """在密码哈希执行器中生成密码哈希，避免阻塞事件循环
+
+    Raises:
+        TooManyRequestsException: 执行器队列已满时抛出
+    """
+    return await password_executor.run(get_password_hash, password)
+
+
+def get_password_hashes(passwords: list[str]) -> list[str]:
+    """批量生成密码哈希"""
+    return [get_password_hash(password) for password in passwords]
+
+
+async def async_get_password_hashes(passwords: list[str]) -> list[str]:
+    """批量生成密码哈希（用于批量导入）
+
+    按 PASSWORD_HASH_CHUNK_SIZE 个一组提交到密码哈希执行器，同时执行的分组数少于工作线程数（至少一个），
+    登录请求的哈希不会排在整个批次之后
+
+    Raises:
+        TooManyRequestsException: 执行器队列已满时抛出
+    """
+    limit = asyncio.Semaphore(max(1, password_executor.max_workers - 1))
+
+    async def run(chunk: list[str]) -> list[str]:
+        async with limit:
+            return await password_executor.run(get_password_hashes, chunk)
+
+    chunks = [
+        passwords[i : i + PASSWORD_HASH_CHUNK_SIZE]
+        for i in range(0, len(passwords), PASSWORD_HASH_CHUNK_SIZE)
+    ]
+    results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+
+def create_access_token(
+    sub: str, expires_delta: timedelta | None = None, claims: dict[str, Any] | None = None
+) -> str:
+    """创建 Access Token，claims 为附加声明"""
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
         expire = datetime.now(UTC) + timedelta(minutes=15)  # 默认过期时间，15 分钟
-    payload = {"sub": sub, "exp": expire, "type": "access"}
-    access_token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    return access_token
+    payload = {
+        **(claims or {}),
+        "sub": sub,
+        "iat": issued_at_now(),
+        "exp": int(expire.timestamp()),
+        "type": "access",
+    }
+    return jwt_codec.encode(payload)
+
+
+def create_user_access_token(user: User, expires_delta: timedelta | None = None) -> str:
+    """为用户创建 Access Token，携带身份声明，供 get_current_user 免查库使用
+
+    声明: name 用户名，pwr 权限等级，ver 用户版本
+    """
+    expires_delta = expires_delta or timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_DELTA_SECONDS)
+    claims = {"name": user.username, "pwr": int(user.power), "ver": user.token_version}
+    return create_access_token(str(user.id), expires_delta, claims=claims)
 
 
 async def create_refresh_token(sub: str, expires_delta: timedelta | None = None) -> str:
@@ -41,79 +147,135 @@ async def create_refresh_token(sub: str, expires_delta: timedelta | None = None)
     expires_delta = expires_delta if expires_delta else timedelta(days=7)  # 默认过期时间，7 天
     expire = datetime.now(UTC) + expires_delta
     refresh_token_id = str(uuid.uuid4())
-    payload = {"sub": sub, "jti": refresh_token_id, "exp": expire, "type": "refresh"}
-    refresh_token = jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
-    # 保存 refresh token 到 redis
-    refresh_token_key = f"refresh_token:{sub}:{refresh_token_id}"
-    await redis_client.setex(refresh_token_key, expires_delta, refresh_token)
-    # 保存 refresh token ID 到 redis
-    user_tokens_key = f"user_tokens:{sub}"
-    await redis_client.sadd(user_tokens_key, refresh_token_id)
+    payload = {
+        "sub": sub,
+        "jti": refresh_token_id,
+        "iat": issued_at_now(),
+        "exp": int(expire.timestamp()),
+        "type": "refresh",
+    }
+    refresh_token = jwt_codec.encode(payload)
+    # 登记 refresh token ID 到 redis
+    await refresh_token_store.issue(sub, refresh_token_id, int(expire.timestamp()))
     return refresh_token
 
 
-def verify_access_token(access_token: str) -> dict:
-    """验证 JWT token 并返回 payload"""
+async def verify_access_token(access_token: str) -> dict:
+    """验证 JWT token 并返回 payload
+
+    解码结果按令牌摘要缓存: 有效令牌缓存至其 exp，无效令牌缓存 TOKEN_CACHE_NEGATIVE_TTL 秒；
+    用户令牌状态（撤销时间、用户版本）不参与该缓存，每次都会检查
+    """
+    payload = _verify_access_token_signature(access_token)
+    state = await token_state_store.get(payload["sub"])
+    if (payload.get("iat") or 0) < state.valid_after:
+        raise UnauthorizedException(message="Access Token revoked")
+    if payload.get("ver", 0) < state.version:
+        # 用户权限或状态已变更，需使用 Refresh Token 换取新的 Access Token
+        raise UnauthorizedException(message="Access Token outdated")
+    return payload
+
+
+def _verify_access_token_signature(access_token: str) -> dict:
+    """解码并校验 Access Token 签名与声明，带缓存"""
+    cache_key = _token_digest(access_token)
+    cached = access_token_cache.get(cache_key)
+    if isinstance(cached, TokenRejection):
+        raise cached.to_exception()
+    if cached is not None:
+        return dict(cached)
+    try:
+        payload = _decode_access_token(access_token)
+    except APIException as e:
+        rejection = TokenRejection(exc_type=type(e), message=e.message)
+        access_token_cache.set(cache_key, rejection, ttl=settings.TOKEN_CACHE_NEGATIVE_TTL)
+        raise
+    exp = payload.get("exp")
+    if isinstance(exp, int | float):
+        access_token_cache.set(cache_key, payload, ttl=exp - time.time())
+    return dict(payload)
+
+
+def flush_access_token_cache() -> None:
+    """清空 Access Token 缓存，需在 SECRET_KEY 轮换或移除 JWT 验证密钥后调用"""
+    access_token_cache.clear()
+
+
+def _token_digest(token: str) -> bytes:
+    """令牌摘要，用作缓存键，避免在内存中长期保留完整令牌"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def _decode_access_token(access_token: str) -> dict:
+    """解码并校验 Access Token"""
     try:
-        payload = jwt.decode(access_token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        sub: str = payload.get("sub")
-        token_type: str = payload.get("type")
-        if sub is None or token_type != "access":
-            raise UnauthorizedException(msg="Access Token invalid")
-        return payload
-    except JWTError as e:
-        raise UnauthorizedException(msg="Access Token invalid") from e
+        payload = jwt_codec.decode(access_token)
+    except TokenExpiredError as e:
+        raise TokenExpiredException(message="Access Token expired") from e
+    except TokenDecodeError as e:
+        raise UnauthorizedException(message="Access Token invalid") from e
+    sub: str = payload.get("sub")
+    token_type: str = payload.get("type")
+    if sub is None or token_type != "access":
+        raise UnauthorizedException(message="Access Token invalid")
+    return payload
 
 
 async def verify_refresh_token(refresh_token: str) -> dict:
     """验证 Refresh Token"""
     try:
-        payload = jwt.decode(
-            refresh_token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
-        sub: str = payload.get("sub")
-        jti: str = payload.get("jti")
-        token_type: str = payload.get("type")
-        refresh_token_key = f"refresh_token:{sub}:{jti}"
-        if sub is None or jti is None or token_type != "refresh":
-            # Refresh Token 验证失败
-            raise UnauthorizedException(msg="Refresh Token invalid")
-        if not await redis_client.exists(refresh_token_key):
-            # Refresh Token 已注销
-            user_tokens_key = f"user_tokens:{sub}"
-            await redis_client.srem(user_tokens_key, jti)
-            raise UnauthorizedException(msg="Refresh Token revoked")
-        return payload
-    except ExpiredSignatureError as e:
-        # Refresh Token 已过期
-        user_tokens_key = f"user_tokens:{sub}"
-        await redis_client.srem(user_tokens_key, jti)
-        raise ExpiredSignatureError(msg="Refresh Token expired") from e
-    except JWTError as e:
+        payload = jwt_codec.decode(refresh_token)
+    except TokenExpiredError as e:
+        # Refresh Token 已过期，索引中的过期 ID 会在下次写入时清理
+        raise TokenExpiredException(message="Refresh Token expired") from e
+    except TokenDecodeError as e:
+        # Refresh Token 验证失败
+        raise UnauthorizedException(message="Refresh Token invalid") from e
+    sub: str = payload.get("sub")
+    jti: str = payload.get("jti")
+    token_type: str = payload.get("type")
+    if sub is None or jti is None or token_type != "refresh":
         # Refresh Token 验证失败
-        raise UnauthorizedException(msg="Refresh Token invalid") from e
+        raise UnauthorizedException(message="Refresh Token invalid")
+    state = await token_state_store.get(sub)
+    if (payload.get("iat") or 0) < state.valid_after:
+        # 用户已撤销全部令牌
+        raise UnauthorizedException(message="Refresh Token revoked")
+    if not await refresh_token_store.verify(sub, jti):
+        # Refresh Token 已注销
+        raise UnauthorizedException(message="Refresh Token revoked")
+    return payload
+
+
+async def revoke_refresh_token(user_id: int, refresh_token_id: str) -> bool:
+    """撤销特定 Refresh Token，返回是否由本次调用撤销（令牌已被撤销或已过期时为 False）"""
+    return await refresh_token_store.revoke(user_id, refresh_token_id)
+
 
+async def revoke_user_tokens(user_id: int) -> None:
+    """注销用户的所有令牌（Access Token 与 Refresh Token）
+
+    仅推进用户的令牌生效起点（一次写入），已登记的 Refresh Token ID 随各自过期时间自然清理
+    """
+    await token_state_store.revoke_all(user_id)
 
-async def revoke_refresh_token(user_id: int, refresh_token_id: str) -> None:
-    """撤销特定 Refresh Token"""
-    refresh_token_key = f"refresh_token:{user_id}:{refresh_token_id}"
-    await redis_client.delete(refresh_token_key)
-    user_tokens_key = f"user_tokens:{user_id}"
-    await redis_client.srem(user_tokens_key, refresh_token_id)
 
+def bump_user_token_version(session: AsyncSession, user: User) -> None:
+    """递增用户版本，使携带旧声明的 Access Token 失效
+
+    用户权限变更或被封禁时调用；版本随事务提交写入数据库，提交成功后再同步到 Redis
+    """
+    user.token_version += 1
+    publish_token_versions(session, {user.id: user.token_version})
 
-async def revoke_user_tokens(user_id: int) -> int:
-    """注销用户的所有 Refresh Token"""
-    user_tokens_key = f"user_tokens:{user_id}"
-    token_ids = await redis_client.smembers(user_tokens_key)
-    revoked_count = 0
-    for token_id in token_ids:
-        refresh_token_key = f"refresh_token:{user_id}:{token_id}"
-        if await redis_client.exists(refresh_token_key):
-            await redis_client.delete(refresh_token_key)
-            revoked_count += 1
-    await redis_client.delete(user_tokens_key)
-    return revoked_count
+
+def publish_token_versions(session: AsyncSession, versions: dict[int, int]) -> None:
+    """事务提交成功后把用户版本（用户 ID -> 版本）同步到 Redis
+
+    以 SQL 批量递增 token_version 的写入路径（如用户导入）直接调用
+    """
+    if versions:
+        on_commit(session, lambda: token_state_store.set_versions(versions))
 
 
 def generate_security_password(length: int = 12) -> str:
@@ -159,7 +321,7 @@ def generate_security_password(length: int = 12) -> str:
     return "".join(password)
 
 
-def check_user_management_permission(current_user: User, target_user: User) -> None:
+def check_user_management_permission(current_user: UserIdentity, target_user: UserIdentity) -> None:
     """
     检查当前用户是否有权限管理目标用户，无权限时直接抛出异常
 
@@ -173,19 +335,19 @@ def check_user_management_permission(current_user: User, target_user: User) -> N
         target_user: 目标用户
 
     Raises:
-        UnauthorizedException: 当没有权限管理时抛出
+        PermissionDeniedException: 当没有权限管理时抛出
     """
     # 自己可以管理自己
     if current_user.id == target_user.id:
         return
 
     # 超级管理员可以管理所有用户
-    if current_user.power.value >= 2:
+    if current_user.power >= PowerEnum.SUPER_ADMIN:
         return
 
     # 管理员只能管理普通用户和封禁用户
-    if current_user.power.value == 1 and target_user.power.value <= 0:
+    if current_user.power == PowerEnum.ADMIN and target_user.power <= PowerEnum.USER:
         return
 
     # 其他用户无管理权限
-    raise PermissionDeniedException(msg="Insufficient permissions")
+    raise PermissionDeniedException(message="Insufficient permissions")
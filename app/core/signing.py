@@ -0,0 +1,468 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Literal, Protocol
+
+import orjson
+from loguru import logger
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+type JWTAlgorithm = Literal["HS256", "HS384", "HS512", "ES256", "EdDSA"]
+type JWTBackendName = Literal["native", "jose", "pyjwt"]
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+# cryptography 的非对称算法模块（随 python-jose[cryptography] 安装）仅在使用非对称密钥时导入
+
+
+class TokenDecodeError(Exception):
+    """令牌格式、签名或声明无效"""
+
+
+class TokenExpiredError(TokenDecodeError):
+    """令牌已过期"""
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _int_b64(value: int, size: int) -> str:
+    return _b64encode(value.to_bytes(size, "big")).decode()
+
+
+@dataclass(eq=False, slots=True)
+class SigningKey:
+    """
+    已解析的签名密钥，启动时构造一次，签名与验证直接使用其中的密钥对象
+
+    - HMAC: secret 为共享密钥，不出现在 JWKS 中，kid 为 None（兼容未携带 kid 的历史令牌）
+    - ES256 / EdDSA: private_key 为 None 时仅用于验证（已轮换下线、仍在有效期内的旧密钥）
+    """
+
+    kid: str | None
+    algorithm: str
+    secret: bytes | None = None
+    private_key: Any = None
+    public_key: Any = None
+    # 预先编码的 JWS 头部，签名时直接拼接
+    header_segment: bytes = field(init=False)
+
+    def __post_init__(self):
+        header = {"alg": self.algorithm, "typ": "JWT"}
+        if self.kid is not None:
+            header["kid"] = self.kid
+        self.header_segment = _b64encode(orjson.dumps(header))
+
+    @property
+    def can_sign(self) -> bool:
+        return self.secret is not None or self.private_key is not None
+
+    def sign(self, data: bytes) -> bytes:
+        if self.secret is not None:
+            return hmac.digest(self.secret, data, HMAC_ALGORITHMS[self.algorithm])
+        if self.algorithm == "EdDSA":
+            return self.private_key.sign(data)
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+        # JWS 的 ES256 签名为定长的 r || s，而非 DER 编码
+        r, s = decode_dss_signature(self.private_key.sign(data, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        if self.secret is not None:
+            expected = hmac.digest(self.secret, data, HMAC_ALGORITHMS[self.algorithm])
+            return hmac.compare_digest(expected, signature)
+        from cryptography.exceptions import InvalidSignature
+
+        try:
+            if self.algorithm == "EdDSA":
+                self.public_key.verify(signature, data)
+            else:
+                from cryptography.hazmat.primitives import hashes
+                from cryptography.hazmat.primitives.asymmetric import ec
+                from cryptography.hazmat.primitives.asymmetric.utils import (
+                    encode_dss_signature,
+                )
+
+                if len(signature) != 64:
+                    return False
+                der = encode_dss_signature(
+                    int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+                )
+                self.public_key.verify(der, data, ec.ECDSA(hashes.SHA256()))
+        except InvalidSignature:
+            return False
+        return True
+
+    def jwk(self) -> dict[str, str] | None:
+        """公钥的 JWK 表示，HMAC 密钥返回 None"""
+        if self.secret is not None:
+            return None
+        base = {"kid": self.kid, "alg": self.algorithm, "use": "sig"}
+        if self.algorithm == "EdDSA":
+            from cryptography.hazmat.primitives import serialization
+
+            raw = self.public_key.public_bytes(
+                serialization.Encoding.Raw, serialization.PublicFormat.Raw
+            )
+            return {"kty": "OKP", "crv": "Ed25519", "x": _b64encode(raw).decode(), **base}
+        numbers = self.public_key.public_numbers()
+        return {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _int_b64(numbers.x, 32),
+            "y": _int_b64(numbers.y, 32),
+            **base,
+        }
+
+    def pem(self, private: bool) -> str:
+        """PEM 编码的密钥（供 python-jose 使用），HMAC 密钥返回共享密钥本身"""
+        if self.secret is not None:
+            return self.secret.decode()
+        from cryptography.hazmat.primitives import serialization
+
+        if private:
+            return self.private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ).decode()
+        return self.public_key.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+
+def load_key_file(path: Path) -> SigningKey:
+    """读取 PEM 密钥文件（私钥或公钥），kid 为文件名（不含扩展名），算法由密钥类型决定"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    data = path.read_bytes()
+    try:
+        private_key = serialization.load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+    except ValueError:
+        private_key = None
+        public_key = serialization.load_pem_public_key(data)
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        algorithm = "EdDSA"
+    elif isinstance(public_key, ec.EllipticCurvePublicKey) and public_key.curve.name == "secp256r1":
+        algorithm = "ES256"
+    else:
+        raise ValueError(f"不支持的 JWT 密钥类型: {path}（仅支持 Ed25519 与 P-256）")
+    kid = path.name.removesuffix(".pem")
+    return SigningKey(kid=kid, algorithm=algorithm, private_key=private_key, public_key=public_key)
+
+
+class KeyRing:
+    """
+    JWT 密钥环
+
+    - HMAC 算法使用 SECRET_KEY；非对称算法从 keys_dir 读取 <kid>.pem（私钥或公钥）
+    - 签名使用 active_kid 对应的私钥（未指定时取 kid 排序最大的私钥），令牌头部携带 kid
+    - 验证按令牌头部的 kid 选择密钥，且令牌声明的算法必须与密钥算法一致
+    - 密钥轮换: 放入新密钥并切换 active_kid，旧密钥保留至其签发的令牌全部过期（最长为 Refresh Token 有效期）后删除；
+      密钥在首次使用或应用启动时解析，变更后需重启
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: str,
+        keys_dir: Path,
+        active_kid: str = "",
+        accept_hmac: bool = False,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.accept_hmac = accept_hmac
+        self._keys: dict[str | None, SigningKey] | None = None
+        self._signing_key: SigningKey | None = None
+
+    def load(self) -> None:
+        """解析全部密钥（幂等）"""
+        if self._keys is not None:
+            return
+        keys: dict[str | None, SigningKey] = {}
+        if self.algorithm in HMAC_ALGORITHMS:
+            keys[None] = SigningKey(None, self.algorithm, secret=self.secret_key.encode())
+        elif self.accept_hmac:
+            # 从 HMAC 迁移到非对称算法期间，继续接受此前签发的 HS256 令牌
+            keys[None] = SigningKey(None, "HS256", secret=self.secret_key.encode())
+        if self.algorithm in ASYMMETRIC_ALGORITHMS and self.keys_dir.is_dir():
+            for path in sorted(self.keys_dir.glob("*.pem")):
+                key = load_key_file(path)
+                keys[key.kid] = key
+        self._signing_key = self._choose_signing_key(keys)
+        self._keys = keys
+        logger.debug(
+            f"JWT 密钥已加载: 签名 {self._signing_key.algorithm}"
+            f"（kid={self._signing_key.kid}），共 {len(keys)} 个验证密钥"
+        )
+
+    def _choose_signing_key(self, keys: dict[str | None, SigningKey]) -> SigningKey:
+        if self.algorithm in HMAC_ALGORITHMS:
+            return keys[None]
+        candidates = [
+            key
+            for key in keys.values()
+            if key.kid is not None and key.algorithm == self.algorithm and key.can_sign
+        ]
+        if self.active_kid:
+            candidates = [key for key in candidates if key.kid == self.active_kid]
+        if not candidates:
+            raise ValueError(
+                f"未找到 {self.algorithm} 签名私钥"
+                f"{f'（kid={self.active_kid}）' if self.active_kid else ''}: {self.keys_dir}，"
+                f"可运行 python -m app.core.signing --algorithm {self.algorithm} 生成"
+            )
+        return max(candidates, key=lambda key: key.kid)
+
+    @property
+    def signing_key(self) -> SigningKey:
+        if self._signing_key is None:
+            self.load()
+        return self._signing_key
+
+    def verification_key(self, kid: str | None, algorithm: str | None) -> SigningKey:
+        """按 kid 查找验证密钥，算法不一致（如用公钥冒充 HMAC 密钥）时视为无效"""
+        if self._keys is None:
+            self.load()
+        key = self._keys.get(kid)
+        if key is None or key.algorithm != algorithm:
+            raise TokenDecodeError("unknown key")
+        return key
+
+    def jwks(self) -> dict[str, list[dict[str, str]]]:
+        """全部公钥的 JWKS 文档"""
+        if self._keys is None:
+            self.load()
+        return {"keys": [jwk for key in self._keys.values() if (jwk := key.jwk()) is not None]}
+
+
+def validate_claims(payload: Any) -> dict:
+    """校验 exp / nbf 时间声明"""
+    if not isinstance(payload, dict):
+        raise TokenDecodeError("payload must be an object")
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, int | float):
+            raise TokenDecodeError("invalid exp")
+        if now >= exp:
+            raise TokenExpiredError("token expired")
+    nbf = payload.get("nbf")
+    if nbf is not None and (not isinstance(nbf, int | float) or now < nbf):
+        raise TokenDecodeError("token not yet valid")
+    return payload
+
+
+class JWTBackend(Protocol):
+    """JWT 编解码后端"""
+
+    name: str
+    algorithms: frozenset[str]
+
+    def encode(self, payload: dict[str, Any], key: SigningKey) -> str: ...
+
+    def decode(self, token: str, keyring: KeyRing) -> dict[str, Any]:
+        """校验签名与时间声明并返回 payload，失败时抛出 TokenDecodeError / TokenExpiredError"""
+        ...
+
+
+class NativeBackend:
+    """
+    基于 hmac / cryptography 与 orjson 的实现（默认）
+
+    头部按密钥预先编码，HMAC 签名为一次 hmac.digest，省去通用库的参数解析与 JSON 序列化开销
+    """
+
+    name = "native"
+    algorithms = frozenset({*HMAC_ALGORITHMS, *ASYMMETRIC_ALGORITHMS})
+
+    def encode(self, payload: dict[str, Any], key: SigningKey) -> str:
+        signing_input = key.header_segment + b"." + _b64encode(orjson.dumps(payload))
+        return (signing_input + b"." + _b64encode(key.sign(signing_input))).decode()
+
+    def decode(self, token: str, keyring: KeyRing) -> dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.encode().split(b".")
+            header = orjson.loads(_b64decode(header_segment))
+            key = keyring.verification_key(header.get("kid"), header.get("alg"))
+            signature = _b64decode(signature_segment)
+        except (ValueError, AttributeError, binascii.Error) as e:
+            raise TokenDecodeError("malformed token") from e
+        if not key.verify(header_segment + b"." + payload_segment, signature):
+            raise TokenDecodeError("signature mismatch")
+        try:
+            payload = orjson.loads(_b64decode(payload_segment))
+        except (ValueError, binascii.Error) as e:
+            raise TokenDecodeError("malformed payload") from e
+        return validate_claims(payload)
+
+
+class JoseBackend:
+    """python-jose（不支持 EdDSA）"""
+
+    name = "jose"
+    algorithms = frozenset({*HMAC_ALGORITHMS, "ES256"})
+
+    def __init__(self):
+        # 密钥的 PEM 编码，按 (kid, 是否私钥) 缓存
+        self._pems: dict[tuple[str | None, bool], str] = {}
+
+    def _pem(self, key: SigningKey, private: bool) -> str:
+        pem = self._pems.get((key.kid, private))
+        if pem is None:
+            pem = self._pems[(key.kid, private)] = key.pem(private)
+        return pem
+
+    def encode(self, payload: dict[str, Any], key: SigningKey) -> str:
+        from jose import jwt
+
+        headers = {"kid": key.kid} if key.kid is not None else None
+        return jwt.encode(payload, self._pem(key, True), key.algorithm, headers=headers)
+
+    def decode(self, token: str, keyring: KeyRing) -> dict[str, Any]:
+        from jose import JWTError, jwt
+        from jose.exceptions import ExpiredSignatureError
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = keyring.verification_key(header.get("kid"), header.get("alg"))
+            payload = jwt.decode(token, self._pem(key, False), algorithms=[key.algorithm])
+        except ExpiredSignatureError as e:
+            raise TokenExpiredError("token expired") from e
+        except JWTError as e:
+            raise TokenDecodeError(str(e)) from e
+        return validate_claims(payload)
+
+
+class PyJWTBackend:
+    """PyJWT（可选依赖: uv sync --extra pyjwt）"""
+
+    name = "pyjwt"
+    algorithms = frozenset({*HMAC_ALGORITHMS, *ASYMMETRIC_ALGORITHMS})
+
+    def encode(self, payload: dict[str, Any], key: SigningKey) -> str:
+        import jwt
+
+        headers = {"kid": key.kid} if key.kid is not None else None
+        return jwt.encode(payload, key.secret or key.private_key, key.algorithm, headers=headers)
+
+    def decode(self, token: str, keyring: KeyRing) -> dict[str, Any]:
+        import jwt
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = keyring.verification_key(header.get("kid"), header.get("alg"))
+            payload = jwt.decode(token, key.secret or key.public_key, algorithms=[key.algorithm])
+        except jwt.ExpiredSignatureError as e:
+            raise TokenExpiredError("token expired") from e
+        except jwt.InvalidTokenError as e:
+            raise TokenDecodeError(str(e)) from e
+        return validate_claims(payload)
+
+
+BACKENDS: dict[str, type[JWTBackend]] = {
+    "native": NativeBackend,
+    "jose": JoseBackend,
+    "pyjwt": PyJWTBackend,
+}
+
+
+class JWTCodec:
+    """按配置的后端与密钥环签发、解码令牌"""
+
+    def __init__(self, backend: JWTBackend, keyring: KeyRing):
+        if keyring.algorithm not in backend.algorithms:
+            raise ValueError(f"JWT 后端 {backend.name} 不支持 {keyring.algorithm} 算法")
+        self.backend = backend
+        self.keyring = keyring
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        return self.backend.encode(payload, self.keyring.signing_key)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        return self.backend.decode(token, self.keyring)
+
+
+jwt_keyring = KeyRing(
+    algorithm=settings.JWT_ALGORITHM,
+    secret_key=settings.SECRET_KEY,
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+    accept_hmac=settings.JWT_ACCEPT_HMAC,
+)
+jwt_codec = JWTCodec(BACKENDS[settings.JWT_BACKEND](), jwt_keyring)
+
+
+async def jwks_endpoint(request: Request) -> Response:
+    """JWKS 端点，供其他服务获取公钥验证本服务签发的令牌（HMAC 密钥不公开）"""
+    return Response(
+        orjson.dumps(jwt_keyring.jwks()),
+        media_type="application/json",
+        # 新密钥应在启用签名前至少一个缓存周期发布（放入公钥或未启用的私钥）
+        headers={"Cache-Control": "public, max-age=300"},
+    )
+
+
+def generate_key(algorithm: str, keys_dir: Path, kid: str) -> Path:
+    """生成新的私钥文件 <keys_dir>/<kid>.pem（仅所有者可读）"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    path = keys_dir / f"{kid}.pem"
+    if path.exists():
+        raise FileExistsError(f"密钥已存在: {path}")
+    path.touch(mode=0o600)
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return path
+
+
+if __name__ == "__main__":
+    # 生成签名密钥: python -m app.core.signing --algorithm EdDSA
+    import argparse
+    from datetime import UTC, datetime
+
+    parser = argparse.ArgumentParser(description="生成 JWT 签名密钥")
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--kid", default=None, help="密钥 ID，默认为当前 UTC 时间")
+    parser.add_argument("--keys-dir", type=Path, default=settings.JWT_KEYS_DIR)
+    args = parser.parse_args()
+
+    kid = args.kid or datetime.now(UTC).strftime("%Y%m%d%H%M%S")
+    path = generate_key(args.algorithm, args.keys_dir, kid)
+    print(f"# 已生成 {path}")
+    print(f"JWT_ALGORITHM={args.algorithm}")
+    print(f"JWT_ACTIVE_KID={kid}")
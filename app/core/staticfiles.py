@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import threading
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from stat import S_ISREG
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.compression import Codec, available_codecs, parse_accept_encoding
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# 预压缩文件的扩展名，按服务端优先级排列
+PRECOMPRESSED_SUFFIXES = {"zstd": ".zst", "br": ".br", "gzip": ".gz"}
+# 值得预压缩的内容类型
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+FINGERPRINT_LENGTH = 12
+
+
+@dataclass(slots=True)
+class StaticVariant:
+    """资源的一种编码表示（原始文件或预压缩文件）"""
+
+    path: Path
+    stat: os.stat_result
+    etag: str
+    encoding: str | None = None
+    content: bytes | None = None  # 小文件的内存副本
+
+
+@dataclass(slots=True)
+class StaticAsset:
+    """静态资源元信息"""
+
+    name: str  # 相对于静态目录的路径，如 css/app.css
+    digest: str  # 内容哈希(sha256 十六进制)
+    content_type: str
+    last_modified: str
+    variants: dict[str | None, StaticVariant] = field(default_factory=dict)
+
+    @property
+    def fingerprinted_name(self) -> str:
+        """带内容指纹的文件名，如 css/app.3f2a9c1b7d4e.css"""
+        stem, dot, suffix = self.name.rpartition(".")
+        if not dot or "/" in suffix:
+            return f"{self.name}.{self.digest[:FINGERPRINT_LENGTH]}"
+        return f"{stem}.{self.digest[:FINGERPRINT_LENGTH]}.{suffix}"
+
+    @property
+    def etags(self) -> set[str]:
+        return {variant.etag for variant in self.variants.values()}
+
+
+def _is_compressible(content_type: str) -> bool:
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+def _is_precompressed_sibling(path: Path) -> bool:
+    return path.suffix in PRECOMPRESSED_SUFFIXES.values() and path.with_suffix("").is_file()
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def precompress_file(path: Path, codecs: list[Codec], minimum_size: int) -> int:
+    """为单个文件生成预压缩副本（缺失或早于源文件时），返回生成的副本数"""
+    content_type = mimetypes.guess_type(path.name)[0] or ""
+    source_stat = path.stat()
+    if not _is_compressible(content_type) or source_stat.st_size < minimum_size:
+        return 0
+    generated = 0
+    data = None
+    for codec in codecs:
+        target = path.with_name(path.name + PRECOMPRESSED_SUFFIXES[codec.name])
+        if target.is_file() and target.stat().st_mtime_ns >= source_stat.st_mtime_ns:
+            continue
+        data = data if data is not None else path.read_bytes()
+        compressed = codec.compress(data)
+        if len(compressed) >= len(data):
+            continue
+        tmp = target.with_name(f".{target.name}.tmp")
+        tmp.write_bytes(compressed)
+        tmp.replace(target)
+        generated += 1
+    return generated
+
+
+def precompress_directory(directory: Path, codecs: list[Codec], minimum_size: int) -> int:
+    """为目录下所有可压缩文件生成预压缩副本，返回生成的副本数"""
+    generated = 0
+    for path in directory.rglob("*"):
+        if path.is_file() and not path.name.startswith(".") and not _is_precompressed_sibling(path):
+            generated += precompress_file(path, codecs, minimum_size)
+    return generated
+
+
+class StaticAssets:
+    """
+    静态文件服务（ASGI 应用），替代 StaticFiles
+
+    - 启动时为目录建立内存元数据索引，请求时不再 stat 文件；条件请求直接由索引回答 304
+    - 索引中的资源同时可通过带内容指纹的文件名（如 css/app.3f2a9c1b7d4e.css）访问，返回 Cache-Control: immutable
+    - 优先发送构建/启动时生成的 .zst/.br/.gz 预压缩副本，不在请求时压缩
+    - 小文件缓存在内存中；大文件交给 FileResponse，服务器支持 http.response.pathsend 扩展时零拷贝发送
+    - 启动后新增的文件（如上传的头像）在首次请求时加入索引；索引在线程中更新，由锁串行化
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        precompress: bool = True,
+        memory_file_max_size: int = 256 * 1024,
+        memory_cache_bytes: int = 32 * 1024 * 1024,
+        minimum_size: int = 1024,
+    ):
+        self.directory = directory.resolve()
+        self.precompress = precompress
+        self.memory_file_max_size = memory_file_max_size
+        self.memory_cache_bytes = memory_cache_bytes
+        self.minimum_size = minimum_size
+        # 预压缩只做一次，使用最高压缩等级
+        self.codecs = available_codecs(zstd_level=19, brotli_level=11, gzip_level=9)
+        self._assets: dict[str, StaticAsset] = {}
+        self._fingerprinted: dict[str, StaticAsset] = {}
+        self._memory_used = 0
+        self._index_lock = threading.Lock()
+
+    async def startup(self) -> None:
+        """生成预压缩副本并建立索引（在线程中执行）"""
+        await asyncio.to_thread(self._build)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"] not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405)
+            await response(scope, receive, send)
+            return
+        name = self._relative_name(scope)
+        immutable = False
+        asset = self._fingerprinted.get(name)
+        if asset is not None:
+            immutable = True
+        else:
+            asset = self._assets.get(name)
+            if asset is None or settings.DEBUG:
+                asset = await self._lookup(name, asset)
+        if asset is None:
+            await PlainTextResponse("Not Found", status_code=404)(scope, receive, send)
+            return
+        response = self._respond(asset, Headers(scope=scope), immutable)
+        await response(scope, receive, send)
+
+    def _relative_name(self, scope: Scope) -> str:
+        """获取相对于挂载点的资源路径"""
+        root_path = scope.get("root_path", "")
+        path = scope["path"]
+        if path.startswith(root_path):
+            path = path[len(root_path) :]
+        return path.lstrip("/")
+
+    def _respond(self, asset: StaticAsset, request_headers: Headers, immutable: bool) -> Response:
+        variant = self._negotiate(asset, request_headers.get("accept-encoding", ""))
+        headers = {
+            "ETag": variant.etag,
+            "Last-Modified": asset.last_modified,
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        }
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if variant.encoding is not None:
+            headers["Content-Encoding"] = variant.encoding
+
+        if self._not_modified(asset, request_headers):
+            return Response(status_code=304, headers=headers)
+        if variant.content is not None:
+            return Response(variant.content, headers=headers, media_type=asset.content_type)
+        return FileResponse(
+            variant.path, headers=headers, media_type=asset.content_type, stat_result=variant.stat
+        )
+
+    def _negotiate(self, asset: StaticAsset, accept_encoding: str) -> StaticVariant:
+        if accept_encoding and len(asset.variants) > 1:
+            accepted = parse_accept_encoding(accept_encoding)
+            wildcard = accepted.get("*", 0.0)
+            for encoding in PRECOMPRESSED_SUFFIXES:
+                variant = asset.variants.get(encoding)
+                if variant is not None and accepted.get(encoding, wildcard) > 0:
+                    return variant
+        return asset.variants[None]
+
+    @staticmethod
+    def _not_modified(asset: StaticAsset, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return bool(tags & asset.etags)
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(asset.variants[None].stat.st_mtime) <= since
+        return False
+
+    async def _lookup(self, name: str, cached: StaticAsset | None) -> StaticAsset | None:
+        """索引未命中（或调试模式下）时检查磁盘并更新索引"""
+        path = self._safe_path(name)
+        if path is None:
+            return None
+        try:
+            stat = await asyncio.to_thread(path.stat)
+        except OSError:
+            return None
+        # 目录等非普通文件按不存在处理
+        if not S_ISREG(stat.st_mode):
+            return None
+        if cached is not None and cached.variants[None].stat.st_mtime_ns == stat.st_mtime_ns:
+            return cached
+        return await asyncio.to_thread(self._index_file, path)
+
+    def _safe_path(self, name: str) -> Path | None:
+        if not name or name.startswith(".") or "/." in name or "\\" in name:
+            return None
+        path = (self.directory / name).resolve()
+        if not path.is_relative_to(self.directory):
+            return None
+        return path
+
+    def _build(self) -> None:
+        if not self.directory.is_dir():
+            return
+        if self.precompress:
+            generated = precompress_directory(self.directory, self.codecs, self.minimum_size)
+            if generated:
+                logger.info(f"生成静态文件预压缩副本: {generated} 个")
+        count = 0
+        for path in sorted(self.directory.rglob("*")):
+            # 跳过隐藏文件与隐藏目录（如头像上传的临时目录）中的文件，与 _safe_path 的规则一致
+            if (
+                path.is_file()
+                and not any(part.startswith(".") for part in path.relative_to(self.directory).parts)
+                and not _is_precompressed_sibling(path)
+            ):
+                self._index_file(path)
+                count += 1
+        logger.info(f"静态文件索引完成: {count} 个文件")
+
+    def _index_file(self, path: Path) -> StaticAsset:
+        with self._index_lock:
+            return self._index_file_locked(path)
+
+    def _index_file_locked(self, path: Path) -> StaticAsset:
+        name = path.relative_to(self.directory).as_posix()
+        stat = path.stat()
+        old = self._assets.get(name)
+        if old is not None:
+            # 并发的索引未命中：等待锁期间已由其他请求索引
+            if old.variants[None].stat.st_mtime_ns == stat.st_mtime_ns:
+                return old
+            self._forget(old)
+        digest = _file_digest(path)
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        asset = StaticAsset(
+            name=name,
+            digest=digest,
+            content_type=content_type,
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+        )
+        asset.variants[None] = self._variant(path, stat, f'"{digest[:32]}"', None)
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                sibling_stat = sibling.stat()
+                if sibling_stat.st_mtime_ns >= stat.st_mtime_ns:
+                    etag = f'"{digest[:32]}-{encoding}"'
+                    asset.variants[encoding] = self._variant(sibling, sibling_stat, etag, encoding)
+        self._assets[name] = asset
+        self._fingerprinted[asset.fingerprinted_name] = asset
+        return asset
+
+    def _variant(
+        self, path: Path, stat: os.stat_result, etag: str, encoding: str | None
+    ) -> StaticVariant:
+        variant = StaticVariant(path=path, stat=stat, etag=etag, encoding=encoding)
+        size = stat.st_size
+        if (
+            size <= self.memory_file_max_size
+            and self._memory_used + size <= self.memory_cache_bytes
+        ):
+            variant.content = path.read_bytes()
+            self._memory_used += size
+        return variant
+
+    def _forget(self, asset: StaticAsset) -> None:
+        self._fingerprinted.pop(asset.fingerprinted_name, None)
+        for variant in asset.variants.values():
+            if variant.content is not None:
+                self._memory_used -= len(variant.content)
+
+
+static_assets = StaticAssets(
+    directory=settings.STATIC_DIR,
+    precompress=settings.STATIC_PRECOMPRESS,
+    memory_file_max_size=settings.STATIC_MEMORY_FILE_MAX_SIZE,
+    memory_cache_bytes=settings.STATIC_MEMORY_CACHE_BYTES,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+)
+
+
+if __name__ == "__main__":
+    # 构建时预压缩: python -m app.core.staticfiles
+    total = precompress_directory(
+        static_assets.directory, static_assets.codecs, static_assets.minimum_size
+    )
+    print(f"生成预压缩副本: {total} 个")
@@ -0,0 +1,121 @@
+import math
+import time
+from dataclasses import dataclass
+
+import redis.asyncio as aioredis
+
+from app.core.cache import LRUCache
+from app.core.coalesce import SingleFlight
+from app.core.config import get_settings
+from app.core.database import resources
+
+settings = get_settings()
+
+
+def issued_at_now() -> float:
+    """令牌签发时间(iat)，毫秒精度并向下取整"""
+    return math.floor(time.time() * 1000) / 1000
+
+
+@dataclass(frozen=True, slots=True)
+class UserTokenState:
+    """用户令牌状态"""
+
+    valid_after: float = 0.0  # 令牌生效起点，早于该时间签发的令牌视为已撤销
+    version: int = 0  # 用户版本，令牌中的 ver 声明低于该值时视为过时
+
+
+class UserTokenStateStore:
+    """
+    用户令牌状态存储，令牌校验时无需查询数据库
+
+    - user_token_state:{sub}  Hash(valid_after, version)，每次写入后保留至最长令牌有效期结束
+    - 各工作进程按 cache_ttl 缓存读取结果，写入在 cache_ttl 秒内传播到所有进程
+    - 撤销全部令牌只需一次写入，与用户的会话数量无关，且同时覆盖 Access Token
+    - 同一用户并发的缓存未命中合并为一次 Redis 读取
+    """
+
+    def __init__(
+        self, redis: aioredis.Redis | None, cache_size: int, cache_ttl: float, retention: int
+    ):
+        self._redis = redis
+        self.cache_ttl = cache_ttl
+        self.retention = retention
+        self._cache: LRUCache[str, UserTokenState] = LRUCache(cache_size)
+        self.flight: SingleFlight[str, UserTokenState] = SingleFlight("token_state")
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    @staticmethod
+    def key(sub: str | int) -> str:
+        return f"user_token_state:{sub}"
+
+    async def get(self, sub: str | int) -> UserTokenState:
+        """获取用户令牌状态，未设置的字段取默认值"""
+        sub = str(sub)
+        state = self._cache.get(sub)
+        if state is None:
+            state = await self.flight.do(sub, lambda: self._fetch(sub))
+        return state
+
+    async def _fetch(self, sub: str) -> UserTokenState:
+        valid_after, version = await self.redis.hmget(self.key(sub), "valid_after", "version")
+        state = UserTokenState(
+            valid_after=float(valid_after) if valid_after is not None else 0.0,
+            version=int(version) if version is not None else 0,
+        )
+        self._cache.set(sub, state, ttl=self.cache_ttl)
+        return state
+
+    async def revoke_all(self, sub: str | int) -> float:
+        """将用户的令牌生效起点推进到当前时间，撤销此前签发的全部令牌"""
+        # 与 issued_at_now() 相同的取整方式，撤销后立即签发（同一毫秒内）的令牌仍然有效；
+        # 代价是撤销前同一毫秒内签发的令牌不会被撤销
+        valid_after = issued_at_now()
+        await self._write(sub, valid_after=valid_after)
+        return valid_after
+
+    async def set_version(self, sub: str | int, version: int) -> None:
+        """更新用户版本，携带更低版本声明的 Access Token 将被拒绝"""
+        await self._write(sub, version=version)
+
+    async def set_versions(self, versions: dict[int, int]) -> None:
+        """批量更新多个用户的版本（一次往返）"""
+        await self._write_many({sub: {"version": version} for sub, version in versions.items()})
+
+    async def revoke_all_many(self, subs: list[int]) -> float:
+        """批量撤销多个用户的全部令牌（一次往返）"""
+        valid_after = issued_at_now()
+        await self._write_many({sub: {"valid_after": valid_after} for sub in subs})
+        return valid_after
+
+    def clear_cache(self) -> None:
+        """清空本进程的状态缓存"""
+        self._cache.clear()
+
+    async def _write(self, sub: str | int, **fields: float | int) -> None:
+        await self._write_many({sub: fields})
+
+    async def _write_many(self, updates: dict[str | int, dict[str, float | int]]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for sub, fields in updates.items():
+                pipe.hset(self.key(sub), mapping=fields)
+                pipe.expire(self.key(sub), self.retention)
+            await pipe.execute()
+        # 本进程立即生效，其他进程等待缓存过期
+        for sub in updates:
+            self._cache.pop(str(sub))
+            self.flight.forget(str(sub))
+
+
+token_state_store = UserTokenStateStore(
+    None,
+    cache_size=settings.TOKEN_CACHE_SIZE,
+    cache_ttl=settings.TOKEN_STATE_CACHE_TTL,
+    retention=max(
+        settings.ACCESS_TOKEN_EXPIRE_DELTA_SECONDS, settings.REFRESH_TOKEN_EXPIRE_DELTA_SECONDS
+    ),
+)
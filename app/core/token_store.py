@@ -0,0 +1,122 @@
+import time
+
+import redis.asyncio as aioredis
+from redis.commands.core import AsyncScript
+
+from app.core.database import resources
+
+# 公共片段：清理索引中已过期的 ID，并将索引 TTL 对齐到存活最久的成员
+# index_key: 索引键，now: 当前时间戳(秒)
+_PRUNE_INDEX = """
+local function prune_index(index_key, now)
+    redis.call('ZREMRANGEBYSCORE', index_key, '-inf', now)
+    local last = redis.call('ZRANGE', index_key, -1, -1, 'WITHSCORES')
+    if last[2] then
+        redis.call('EXPIREAT', index_key, last[2])
+    end
+end
+"""
+
+# 签发: KEYS = [令牌键, 索引键], ARGV = [jti, 过期时间戳, 当前时间戳]
+_ISSUE_SCRIPT = (
+    _PRUNE_INDEX
+    + """
+local ttl = tonumber(ARGV[2]) - tonumber(ARGV[3])
+if ttl <= 0 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ttl)
+redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+prune_index(KEYS[2], ARGV[3])
+return 1
+"""
+)
+
+# 验证: KEYS = [令牌键, 索引键], ARGV = [jti, 当前时间戳]
+_VERIFY_SCRIPT = (
+    _PRUNE_INDEX
+    + """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 1
+end
+redis.call('ZREM', KEYS[2], ARGV[1])
+prune_index(KEYS[2], ARGV[2])
+return 0
+"""
+)
+
+# 撤销单个: KEYS = [令牌键, 索引键], ARGV = [jti, 当前时间戳]
+_REVOKE_SCRIPT = (
+    _PRUNE_INDEX
+    + """
+local revoked = redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+prune_index(KEYS[2], ARGV[2])
+return revoked
+"""
+)
+
+
+class RefreshTokenStore:
+    """
+    Refresh Token 存储，每个操作都是一次 Lua 脚本调用（单次往返、原子执行）
+
+    - refresh_token:{sub}:{jti}  令牌键，随令牌过期
+    - refresh_tokens:{sub}       用户令牌索引(ZSET)，score 为过期时间戳；
+                                 每次写入时清理过期成员，并将 TTL 对齐到存活最久的成员
+    """
+
+    def __init__(self, redis: aioredis.Redis | None = None):
+        self._redis = redis
+        # 脚本不绑定客户端，调用时传入 self.redis
+        self._issue = AsyncScript(None, _ISSUE_SCRIPT.encode())
+        self._verify = AsyncScript(None, _VERIFY_SCRIPT.encode())
+        self._revoke = AsyncScript(None, _REVOKE_SCRIPT.encode())
+
+    @property
+    def redis(self) -> aioredis.Redis:
+        # 未显式传入时使用应用的 Redis 客户端（首次访问时创建）
+        return self._redis if self._redis is not None else resources.redis
+
+    async def load_scripts(self) -> None:
+        """预加载全部脚本，避免首次调用时的 NOSCRIPT 重试往返"""
+        for script in (self._issue, self._verify, self._revoke):
+            script.sha = await self.redis.script_load(script.script)
+
+    @staticmethod
+    def token_key(sub: str | int, jti: str) -> str:
+        return f"refresh_token:{sub}:{jti}"
+
+    @staticmethod
+    def index_key(sub: str | int) -> str:
+        return f"refresh_tokens:{sub}"
+
+    async def issue(self, sub: str | int, jti: str, expires_at: int) -> bool:
+        """登记新签发的 Refresh Token，expires_at 为过期时间戳(秒)"""
+        issued = await self._issue(
+            keys=[self.token_key(sub, jti), self.index_key(sub)],
+            args=[jti, expires_at, int(time.time())],
+            client=self.redis,
+        )
+        return bool(issued)
+
+    async def verify(self, sub: str | int, jti: str) -> bool:
+        """检查 Refresh Token 是否仍然有效，无效时顺带清理索引"""
+        valid = await self._verify(
+            keys=[self.token_key(sub, jti), self.index_key(sub)],
+            args=[jti, int(time.time())],
+            client=self.redis,
+        )
+        return bool(valid)
+
+    async def revoke(self, sub: str | int, jti: str) -> bool:
+        """撤销单个 Refresh Token，返回令牌是否存在"""
+        revoked = await self._revoke(
+            keys=[self.token_key(sub, jti), self.index_key(sub)],
+            args=[jti, int(time.time())],
+            client=self.redis,
+        )
+        return bool(revoked)
+
+
+refresh_token_store = RefreshTokenStore()
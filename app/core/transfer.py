@@ -0,0 +1,295 @@
+import csv
+import io
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any, Literal
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import Row, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import on_commit
+from app.core.exceptions import DataValidationException
+from app.core.replicas import replica_router
+from app.core.response_cache import response_cache
+from app.core.security import async_get_password_hashes, publish_token_versions
+from app.core.token_state import token_state_store
+from app.models.user import User
+from app.schemas.response import ErrorDetail
+from app.schemas.user import UserImportResult, UserImportRow
+
+type TransferFormat = Literal["ndjson", "csv"]
+type ConflictPolicy = Literal["skip", "update"]
+
+MEDIA_TYPES: dict[str, str] = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+# 导出的列，hashed_password 仅在显式要求时导出
+EXPORT_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.introduction,
+    User.avatar,
+    User.power,
+    User.created_at,
+    User.updated_at,
+)
+# 导入暂存表的列，与 UserImportRow 对应（password 哈希后写入 hashed_password）
+STAGING_COLUMNS = ("username", "email", "hashed_password", "introduction", "avatar", "power")
+# 校验失败时最多返回的错误行数
+MAX_IMPORT_ERRORS = 20
+
+_CREATE_STAGING_SQL = """
+CREATE TEMP TABLE users_import (
+    line integer NOT NULL,
+    username varchar(50) NOT NULL,
+    email varchar(255) NOT NULL,
+    hashed_password varchar(255) NOT NULL,
+    introduction varchar(255),
+    avatar varchar(255),
+    power text NOT NULL
+) ON COMMIT DROP
+"""
+# 同一批数据内（按用户名去重后）不同用户名使用同一邮箱的行，合并时会违反邮箱唯一约束，作为校验错误返回
+_DUPLICATE_EMAIL_SQL = """
+SELECT email, array_agg(line ORDER BY line) AS lines
+FROM (
+    SELECT DISTINCT ON (username) username, email, line FROM users_import
+    ORDER BY username, line DESC
+) AS source
+GROUP BY email
+HAVING count(*) > 1
+ORDER BY min(line)
+LIMIT :limit
+"""
+# 同一批数据内用户名重复时取最后一行；created_at/updated_at 由列的服务端默认值统一填充
+# changed 为权限或密码变更的已有用户（语句开始时的快照），合并时递增其 token_version，提交后同步到 Redis；
+# 密码变更的用户另外撤销全部令牌
+_MERGE_SQL = """
+WITH source AS (
+    SELECT DISTINCT ON (username) username, email, hashed_password, introduction, avatar,
+        power::powerenum AS power
+    FROM users_import
+    ORDER BY username, line DESC
+),
+changed AS (
+    SELECT u.id, u.hashed_password <> s.hashed_password AS password_changed
+    FROM users u JOIN source s USING (username)
+    WHERE u.power <> s.power OR u.hashed_password <> s.hashed_password
+),
+merged AS (
+    INSERT INTO users (username, email, hashed_password, introduction, avatar, power)
+    SELECT username, email, hashed_password, introduction, avatar, power FROM source
+    {filter}
+    ON CONFLICT {action}
+    RETURNING id, token_version, (xmax = 0) AS inserted
+)
+SELECT merged.id, merged.token_version, merged.inserted, changed.id IS NOT NULL AS changed,
+    coalesce(changed.password_changed, false) AS password_changed
+FROM merged LEFT JOIN changed USING (id)
+"""
+_MERGE_ACTIONS = {
+    "skip": ("", "DO NOTHING"),
+    # 邮箱已属于其他用户的行跳过，避免违反邮箱唯一约束
+    "update": (
+        "WHERE NOT EXISTS (SELECT 1 FROM users u"
+        " WHERE u.email = source.email AND u.username <> source.username)",
+        "(username) DO UPDATE SET email = EXCLUDED.email,"
+        " hashed_password = EXCLUDED.hashed_password, introduction = EXCLUDED.introduction,"
+        " avatar = EXCLUDED.avatar, power = EXCLUDED.power,"
+        " token_version = users.token_version + (users.power <> EXCLUDED.power"
+        " OR users.hashed_password <> EXCLUDED.hashed_password)::integer,"
+        " updated_at = floor(extract(epoch from now()))::integer",
+    ),
+}
+
+
+def _encode_ndjson(rows: list[Row]) -> bytes:
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def _encode_csv(rows: list[Row]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+async def export_users(
+    fmt: TransferFormat, include_password_hash: bool = False, batch_size: int = 1000
+) -> AsyncIterator[bytes]:
+    """
+    流式导出用户
+
+    使用服务端游标按 batch_size 分批读取列元组（不构造 ORM 对象、不进入身份映射），
+    每批编码为一个响应块，内存占用与总行数无关
+    """
+    columns = [*EXPORT_COLUMNS, User.hashed_password] if include_password_hash else EXPORT_COLUMNS
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+    if fmt == "csv":
+        yield _encode_csv([tuple(column.key for column in columns)])
+    # 独立的只读会话（优先使用只读副本）：响应体在依赖项清理之后才开始发送
+    async with replica_router.session() as session:
+        result = await session.stream(
+            select(*columns).order_by(User.id).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield encode(rows)
+
+
+def _decode_line(line: bytes, line_no: int) -> str:
+    try:
+        return line.decode()
+    except UnicodeDecodeError as e:
+        raise DataValidationException(
+            message="Invalid UTF-8",
+            details=[ErrorDetail(field=f"line {line_no}", message=str(e))],
+        ) from e
+
+
+async def _iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """把字节流切分为文本行（不含换行符），不是 UTF-8 编码时抛出 DataValidationException"""
+    pending = b""
+    line_no = 0
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield _decode_line(line.rstrip(b"\r"), line_no)
+    if pending.strip():
+        yield _decode_line(pending, line_no + 1)
+
+
+async def read_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, Any]]:
+    """逐行解析 NDJSON，返回 (行号, 对象)，空行跳过"""
+    line_no = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_no, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            raise DataValidationException(
+                message="Invalid NDJSON",
+                details=[ErrorDetail(field=f"line {line_no}", message=str(e))],
+            ) from e
+
+
+async def read_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, dict[str, str]]]:
+    """逐条解析带表头的 CSV，返回 (行号, {列名: 值})，支持引号内换行"""
+    header = None
+    record: list[str] = []
+    line_no = start = 0
+    async for line in _iter_lines(chunks):
+        line_no += 1
+        if not record:
+            start = line_no
+        record.append(line)
+        # 引号未闭合时，记录在下一行继续
+        if sum(part.count('"') for part in record) % 2:
+            continue
+        values = next(csv.reader(["\n".join(record)]), [])
+        record = []
+        if not values:
+            continue
+        if header is None:
+            header = values
+            continue
+        yield start, dict(zip(header, values, strict=False))
+
+
+async def import_users(
+    session: AsyncSession,
+    chunks: AsyncIterable[bytes],
+    fmt: TransferFormat,
+    on_conflict: ConflictPolicy = "skip",
+    batch_size: int = 5000,
+) -> UserImportResult:
+    """
+    流式导入用户
+
+    - 逐行校验，每 batch_size 行批量哈希明文密码（小分片提交到密码哈希执行器，不独占工作线程），
+      再通过 COPY ... FROM STDIN 写入事务内的临时暂存表
+    - 全部写入后用一条 INSERT ... SELECT ... ON CONFLICT 合并到 users 表，
+      权限或密码变更的用户递增 token_version，使其已签发的 Access Token 失效，密码变更的用户撤销全部令牌
+    - 任意一行校验失败（含不同用户名使用同一邮箱）则整个导入回滚，返回最多 MAX_IMPORT_ERRORS 条错误
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+    await session.execute(text(_CREATE_STAGING_SQL))
+
+    received = 0
+    batch: list[tuple[int, UserImportRow]] = []
+    errors: list[ErrorDetail] = []
+    reader = read_ndjson(chunks) if fmt == "ndjson" else read_csv(chunks)
+    async for line_no, data in reader:
+        try:
+            row = UserImportRow.model_validate(data)
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors.append(ErrorDetail(field=f"line {line_no}", message=error["msg"]))
+            if len(errors) >= MAX_IMPORT_ERRORS:
+                break
+            continue
+        if errors:
+            continue
+        batch.append((line_no, row))
+        if len(batch) >= batch_size:
+            await _copy_batch(driver, batch)
+            received += len(batch)
+            batch = []
+    if errors:
+        raise DataValidationException(message="Import data validation failed", details=errors)
+    if batch:
+        await _copy_batch(driver, batch)
+        received += len(batch)
+    duplicates = await session.execute(text(_DUPLICATE_EMAIL_SQL), {"limit": MAX_IMPORT_ERRORS})
+    errors = [
+        ErrorDetail(field=f"line {line}", message=f"Email already used on line {lines[0]}")
+        for email, lines in duplicates
+        for line in lines[1:]
+    ][:MAX_IMPORT_ERRORS]
+    if errors:
+        raise DataValidationException(message="Import data validation failed", details=errors)
+
+    row_filter, action = _MERGE_ACTIONS[on_conflict]
+    result = await session.execute(text(_MERGE_SQL.format(filter=row_filter, action=action)))
+    outcomes = result.all()
+    updated_ids = [row.id for row in outcomes if not row.inserted]
+    if outcomes:
+        # 提交后使用户列表与被更新用户的缓存响应失效
+        tags = ["users", *(f"user:{user_id}" for user_id in updated_ids)]
+        on_commit(session, lambda: response_cache.invalidate(*tags))
+    # 权限或密码变更的用户持有的 Access Token 声明已过时；密码变更的用户撤销全部令牌（含 Refresh Token）
+    changed = [row for row in outcomes if row.changed]
+    publish_token_versions(session, {row.id: row.token_version for row in changed})
+    revoked = [row.id for row in changed if row.password_changed]
+    if revoked:
+        on_commit(session, lambda: token_state_store.revoke_all_many(revoked))
+    return UserImportResult(
+        received=received,
+        inserted=len(outcomes) - len(updated_ids),
+        updated=len(updated_ids),
+        skipped=received - len(outcomes),
+    )
+
+
+async def _copy_batch(driver, batch: list[tuple[int, UserImportRow]]) -> None:
+    plain = [row.password for _, row in batch if row.hashed_password is None]
+    hashed = iter(await async_get_password_hashes(plain))
+    records = [
+        (
+            line_no,
+            row.username,
+            row.email,
+            row.hashed_password if row.hashed_password is not None else next(hashed),
+            row.introduction,
+            row.avatar,
+            row.power.name,
+        )
+        for line_no, row in batch
+    ]
+    await driver.copy_records_to_table(
+        "users_import", records=records, columns=("line", *STAGING_COLUMNS)
+    )
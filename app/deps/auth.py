@@ -0,0 +1,102 @@
+from typing import Annotated
+
+from fastapi import Depends
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.exceptions import (
+    PermissionDeniedException,
+    UnauthorizedException,
+    UserDisabledException,
+)
+from app.core.security import verify_access_token
+from app.deps.database import session_dep
+from app.models.enums import PowerEnum
+from app.models.user import User
+from app.repositories.user import UserRepository
+
+settings = get_settings()
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_PREFIX}/tokens", auto_error=False)
+
+
+class CurrentUser:
+    """
+    当前请求的用户身份，直接由 Access Token 声明构造，不查询数据库
+
+    仅需身份或权限判断的处理器直接使用 id/username/power；
+    需要完整 ORM 对象时调用 load()，首次调用才会查询数据库
+    """
+
+    __slots__ = ("id", "username", "power", "version", "_session", "_user")
+
+    def __init__(
+        self, id: int, username: str, power: PowerEnum, version: int, session: AsyncSession
+    ):
+        self.id = id
+        self.username = username
+        self.power = power
+        self.version = version
+        self._session = session
+        self._user: User | None = None
+
+    @classmethod
+    def from_claims(cls, payload: dict, session: AsyncSession) -> "CurrentUser":
+        try:
+            return cls(
+                id=int(payload["sub"]),
+                username=payload["name"],
+                power=PowerEnum(payload["pwr"]),
+                version=int(payload.get("ver", 0)),
+                session=session,
+            )
+        except (KeyError, ValueError) as e:
+            raise UnauthorizedException(message="Access Token invalid") from e
+
+    async def load(self) -> User:
+        """加载当前用户的 ORM 对象（同一请求内只查询一次）"""
+        if self._user is None:
+            user = await UserRepository(self._session).get(self.id)
+            if user is None:
+                raise UnauthorizedException(message="User not found")
+            self._user = user
+        return self._user
+
+
+async def get_current_user(
+    session: session_dep,
+    token: Annotated[str | None, Depends(oauth2_scheme)],
+) -> CurrentUser:
+    """
+    解析当前用户的依赖项
+
+    依次校验令牌签名（带缓存）、用户令牌状态（撤销时间与版本），再由声明构造用户身份；
+    会话仅在调用 CurrentUser.load() 时才会获取数据库连接
+    """
+    if not token:
+        raise UnauthorizedException()
+    payload = await verify_access_token(token)
+    current_user = CurrentUser.from_claims(payload, session)
+    if current_user.power == PowerEnum.BANNED:
+        raise UserDisabledException()
+    return current_user
+
+
+def require_power(power: PowerEnum):
+    """要求当前用户权限等级不低于 power 的依赖项工厂"""
+
+    async def dependency(current_user: Annotated[CurrentUser, Depends(get_current_user)]):
+        if current_user.power < power:
+            raise PermissionDeniedException(message="Insufficient permissions")
+        return current_user
+
+    return dependency
+
+
+# 当前用户依赖项
+# 使用示例: async def get_me(current_user: current_user_dep)
+current_user_dep = Annotated[CurrentUser, Depends(get_current_user)]
+# 管理员（含超级管理员）依赖项
+admin_user_dep = Annotated[CurrentUser, Depends(require_power(PowerEnum.ADMIN))]
+# 超级管理员依赖项
+superadmin_user_dep = Annotated[CurrentUser, Depends(require_power(PowerEnum.SUPER_ADMIN))]
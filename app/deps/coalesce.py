@@ -0,0 +1,31 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy import Row
+
+from app.core.coalesce import DataLoader, SingleFlight, get_singleflight, user_loader
+
+
+def singleflight(name: str):
+    """
+    SingleFlight 依赖项工厂，同名的依赖项在本进程内共享同一个实例
+
+    使用示例:
+        flight: Annotated[SingleFlight, Depends(singleflight("user_stats"))]
+        stats = await flight.do(user_id, lambda: compute_stats(user_id))
+    """
+    flight = get_singleflight(name)
+
+    def dependency() -> SingleFlight:
+        return flight
+
+    return dependency
+
+
+def get_user_loader() -> DataLoader[int, Row]:
+    return user_loader
+
+
+# 按 ID 加载用户只读行的依赖项，并发请求的查询合并为一次批量查询
+# 使用示例: async def get_user(user_id: int, users: user_loader_dep)
+user_loader_dep = Annotated[DataLoader[int, Row], Depends(get_user_loader)]
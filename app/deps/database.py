@@ -1,29 +1,88 @@
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from fastapi.security.utils import get_authorization_scheme_param
 from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import async_session_factory
-from app.core.exceptions import BizException
+from app.core.config import get_settings
+from app.core.database import has_writes, resources, run_after_commit
+from app.core.exceptions import APIException, InternalServerException
+from app.core.overload import service_unavailable
+from app.core.replicas import read_your_writes, replica_router
+from app.core.security import verify_access_token
 
+settings = get_settings()
 
-async def get_session() -> AsyncGenerator[AsyncSession]:
+
+async def request_subject(request: Request) -> str | None:
+    """从 Authorization 请求头解析当前用户 ID，未登录或令牌无效时返回 None（令牌验证结果有缓存）"""
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = await verify_access_token(token)
+    except APIException:
+        return None
+    return payload.get("sub")
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession]:
     """
     安全获取数据库会话的依赖项，自动处理事务和异常
+
+    事务提交成功后执行通过 on_commit 注册的回调；连接池耗尽（获取连接超时）时返回 503；
+    配置了只读副本时，已登录用户提交写入后的一段时间内其只读会话使用主库
     """
-    async with async_session_factory() as session:
+    async with resources.session_factory() as session:
         try:
             async with session.begin():
                 yield session
+        except PoolTimeoutError as e:
+            logger.warning(f"数据库连接池耗尽: {str(e)}")
+
+            raise service_unavailable(settings.OVERLOAD_RETRY_AFTER_SECONDS) from e
         except SQLAlchemyError as e:
             logger.error(f"数据库操作失败: {str(e)}")
 
-            raise BizException(code=500, msg="Internal server error") from e
+            raise InternalServerException() from e
+        await run_after_commit(session)
+        if replica_router.replicas and has_writes(session):
+            subject = await request_subject(request)
+            if subject is not None:
+                await read_your_writes.mark(subject)
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    """
+    只读会话的依赖项，开启只读事务，结束时回滚
+
+    配置了只读副本时路由到副本（不可用时回退到主库）；
+    当前用户刚提交过写入时使用主库，保证读到自己的写入
+    """
+    use_primary = False
+    if replica_router.replicas:
+        subject = await request_subject(request)
+        use_primary = subject is not None and await read_your_writes.is_recent(subject)
+    try:
+        async with replica_router.session(use_primary=use_primary) as session:
+            yield session
+    except PoolTimeoutError as e:
+        logger.warning(f"数据库连接池耗尽: {str(e)}")
+
+        raise service_unavailable(settings.OVERLOAD_RETRY_AFTER_SECONDS) from e
+    except SQLAlchemyError as e:
+        logger.error(f"数据库操作失败: {str(e)}")
+
+        raise InternalServerException() from e
 
 
 # session 依赖项
 # 使用示例: async def get_todos(session: session_dep)
 session_dep = Annotated[AsyncSession, Depends(get_session)]
+# 只读 session 依赖项，仅用于不写入数据库的处理器
+# 使用示例: async def list_todos(session: read_session_dep)
+read_session_dep = Annotated[AsyncSession, Depends(get_read_session)]
@@ -0,0 +1,39 @@
+from typing import Literal
+
+from fastapi import Request
+
+from app.core.ratelimit import RateLimit, client_ip, rate_limiter, too_many_requests
+from app.deps.auth import current_user_dep
+
+
+def rate_limit(rule: str, scope: Literal["ip", "user", "route"] = "ip"):
+    """
+    路由级限流依赖项工厂
+
+    Args:
+        rule: 限流规则，如 "5/minute"
+        scope: 计数维度，ip 按客户端 IP、user 按当前用户（要求已登录）、route 按路由全局计数；
+            均以路由路径模板区分不同路由
+
+    使用示例: @router.post("/tokens", dependencies=[Depends(rate_limit("5/minute"))])
+    """
+    limit = RateLimit.parse(rule)
+
+    async def check(request: Request, identity: str) -> None:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", request.url.path)
+        result = await rate_limiter.hit(f"{scope}:{identity}:{route_path}", limit)
+        if not result.allowed:
+            raise too_many_requests(result.retry_after)
+
+    if scope == "user":
+
+        async def user_dependency(request: Request, current_user: current_user_dep) -> None:
+            await check(request, str(current_user.id))
+
+        return user_dependency
+
+    async def dependency(request: Request) -> None:
+        await check(request, "*" if scope == "route" else client_ip(request.scope))
+
+    return dependency
@@ -0,0 +1,11 @@
+# 后台任务处理函数，导入本模块即向 job_queue 注册（应用与独立的 worker.py 进程都会导入）
+
+from app.core.jobs import job_queue
+from app.core.security import revoke_user_tokens
+
+
+@job_queue.handler("revoke_users_tokens")
+async def revoke_users_tokens(user_ids: list[int]) -> None:
+    """批量注销用户的全部令牌"""
+    for user_id in user_ids:
+        await revoke_user_tokens(user_id)
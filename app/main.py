@@ -1,11 +1,19 @@
+from typing import Any
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 
+from app import jobs  # noqa: F401  注册后台任务处理函数
 from app.api.routes import router as api_router
 from app.core.config import get_settings
+from app.core.database import resources
 from app.core.handlers import register_handlers
 from app.core.lifecycle import lifespan
+from app.core.metrics import metrics_endpoint
 from app.core.middlewares import register_middlewares
+from app.core.overload import health_endpoint
+from app.core.response_cache import cache_response
+from app.core.signing import jwks_endpoint
+from app.core.staticfiles import static_assets
 from app.schemas.response import SuccessResponse
 
 
@@ -17,13 +25,20 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
         debug=settings.DEBUG,
     )
+    # 数据库与 Redis 资源由应用工厂创建，生命周期结束时释放（再次启动时重新创建）
+    resources.init()
     register_middlewares(app)
     register_handlers(app)
     app.include_router(api_router, prefix=settings.API_PREFIX)
-    app.mount("/static", StaticFiles(directory=settings.STATIC_DIR), name="static")
+    app.mount("/static", static_assets, name="static")
+    app.add_route("/.well-known/jwks.json", jwks_endpoint, include_in_schema=False)
+    app.add_route("/health", health_endpoint, include_in_schema=False)
+    if settings.METRICS_ENABLED:
+        app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
     @app.get("/", tags=["root"])
-    async def index():
+    @cache_response(ttl=300, vary="shared")
+    async def index() -> SuccessResponse[dict[str, Any]]:
         app_info = {
             "name": settings.APP_NAME,
             "environment": settings.APP_ENV,
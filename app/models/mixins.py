@@ -1,11 +1,15 @@
 from time import time
 
+from sqlalchemy import text
 from sqlalchemy.orm import Mapped, mapped_column
 
+# 数据库端的当前秒级时间戳，供批量 SQL（如 COPY 导入后的合并）直接使用列默认值
+_EPOCH_NOW = text("floor(extract(epoch from now()))::integer")
+
 
 class TimestampMixin:
     # 秒级时间戳
-    created_at: Mapped[int] = mapped_column(default=lambda: int(time()))
+    created_at: Mapped[int] = mapped_column(default=lambda: int(time()), server_default=_EPOCH_NOW)
     updated_at: Mapped[int] = mapped_column(
-        default=lambda: int(time()), onupdate=lambda: int(time())
+        default=lambda: int(time()), onupdate=lambda: int(time()), server_default=_EPOCH_NOW
     )
@@ -1,4 +1,4 @@
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -9,6 +9,8 @@ class User(Base):
     """用户"""
 
     __tablename__ = "users"
+    # 键集分页按 (created_at, id) 排序
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
@@ -17,3 +19,5 @@ class User(Base):
     avatar: Mapped[str] = mapped_column(String(255), nullable=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     power: Mapped[PowerEnum] = mapped_column(default=PowerEnum.USER)
+    # 用户版本，权限变更或封禁时递增，使携带旧声明的 Access Token 失效
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0")
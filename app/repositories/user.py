@@ -0,0 +1,105 @@
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import ARRAY, ColumnElement, Integer, Row, Select, any_, bindparam, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+# 轻量查询返回的列（与 ORM 实体字段相同），结果为不进入身份映射的 Row，可按属性名访问
+USER_COLUMNS = tuple(User.__table__.columns)
+# 更新插入冲突时不覆盖的列
+_UPSERT_IMMUTABLE = frozenset({"id", "created_at"})
+
+
+def _lookup(criterion: ColumnElement[bool]) -> tuple[Select, Select]:
+    """构造 (ORM 实体查询, 列元组查询)"""
+    return select(User).where(criterion), select(*USER_COLUMNS).where(criterion)
+
+
+# 查询语句在模块加载时构造一次，参数全部为绑定参数：
+# 每次调用的语句结构相同，命中 SQLAlchemy 编译缓存，生成的 SQL 文本也相同，命中 asyncpg 预编译语句缓存
+_BY_ID = _lookup(User.id == bindparam("value"))
+_BY_USERNAME = _lookup(User.username == bindparam("value"))
+_BY_EMAIL = _lookup(User.email == bindparam("value"))
+# id = ANY(:ids) 只有一个数组参数，不同数量的 ID 共用同一条语句（IN 会按数量展开为不同的 SQL）
+_BY_IDS = _lookup(User.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+_BULK_INSERT = insert(User).returning(User.id, sort_by_parameter_order=True)
+
+
+class UserRepository:
+    """
+    用户数据访问
+
+    读取方法默认返回 ORM 实体（进入会话身份映射，可修改后随事务提交），
+    rows=True 时返回只读的 Row，省去实体构造与身份映射开销，适合只读场景
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def _one(self, statements: tuple[Select, Select], value: Any, rows: bool):
+        if rows:
+            return (await self.session.execute(statements[1], {"value": value})).one_or_none()
+        return await self.session.scalar(statements[0], {"value": value})
+
+    async def get(self, user_id: int, *, rows: bool = False) -> User | Row | None:
+        """按 ID 获取用户，ORM 实体优先从身份映射中查找"""
+        if rows:
+            return await self._one(_BY_ID, user_id, rows)
+        return await self.session.get(User, user_id)
+
+    async def get_by_username(self, username: str, *, rows: bool = False) -> User | Row | None:
+        """按用户名获取用户"""
+        return await self._one(_BY_USERNAME, username, rows)
+
+    async def get_by_email(self, email: str, *, rows: bool = False) -> User | Row | None:
+        """按邮箱获取用户"""
+        return await self._one(_BY_EMAIL, email, rows)
+
+    async def get_many(self, ids: Iterable[int], *, rows: bool = False) -> dict[int, User | Row]:
+        """
+        批量获取用户，一次查询（WHERE id = ANY(:ids)）
+
+        返回 {ID: 用户}，不存在的 ID 不出现在结果中，调用方按需要的顺序取用
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        if rows:
+            result = await self.session.execute(_BY_IDS[1], {"ids": ids})
+        else:
+            result = await self.session.scalars(_BY_IDS[0], {"ids": ids})
+        return {user.id: user for user in result}
+
+    async def upsert(self, values: dict[str, Any], index: str = "username") -> User:
+        """
+        插入用户，index 列（username 或 email）冲突时更新已有用户，返回最新的 ORM 实体
+
+        values 需包含全部必填字段；created_at 保持不变，updated_at 取本次写入的时间
+        """
+        stmt = pg_insert(User).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[index],
+            set_={
+                column.name: stmt.excluded[column.name]
+                for column in USER_COLUMNS
+                if column.name not in _UPSERT_IMMUTABLE
+                and column.name != index
+                and (column.name in values or column.name == "updated_at")
+            },
+        ).returning(User)
+        # 已在身份映射中的实体使用返回的最新值覆盖
+        return await self.session.scalar(stmt, execution_options={"populate_existing": True})
+
+    async def bulk_insert(self, rows: Sequence[dict[str, Any]]) -> list[int]:
+        """
+        批量插入用户，返回与 rows 顺序对应的新用户 ID
+
+        不构造 ORM 实体，由 SQLAlchemy 合并为多行 INSERT ... VALUES 分批执行；
+        冲突会使整个事务失败，需要跳过或更新已有用户时使用 upsert 或 COPY 导入（app.core.transfer）
+        """
+        if not rows:
+            return []
+        return list(await self.session.scalars(_BULK_INSERT, list(rows)))
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class JobAccepted(BaseModel):
+    """已提交的后台任务"""
+
+    job_id: str
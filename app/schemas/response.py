@@ -21,6 +21,23 @@ class PaginatedData[DataType](BaseModel):
     pagination: PaginationInfo
 
 
+class CursorPaginationInfo(BaseModel):
+    """游标分页元信息"""
+
+    size: int  # 每页数量
+    next_cursor: str | None = None  # 下一页游标，没有下一页时为 None
+    has_more: bool  # 是否还有下一页
+    total_items: int | None = None  # 总条目数，未请求时为 None
+    total_is_estimate: bool = False  # 总条目数是否为近似值（来自数据库统计信息）
+
+
+class CursorPaginatedData[DataType](BaseModel):
+    """游标分页数据容器"""
+
+    items: list[DataType]
+    pagination: CursorPaginationInfo
+
+
 class ErrorDetail(BaseModel):
     """错误详情"""
 
@@ -55,6 +72,17 @@ class PaginatedResponse[DataType](BaseModel):
     error: None = None
 
 
+class CursorPaginatedResponse[DataType](BaseModel):
+    """
+    专用于游标分页的成功响应模型
+    不使用 OFFSET 与精确 COUNT，总条目数可选且允许为近似值
+    """
+
+    success: bool = True
+    data: CursorPaginatedData[DataType]
+    error: None = None
+
+
 class ErrorResponse(BaseModel):
     """错误响应"""
 
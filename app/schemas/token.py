@@ -8,3 +8,11 @@ class AccessToken(BaseModel):
 
 class TokenData(BaseModel):
     sub: int
+
+
+class TokenPair(AccessToken):
+    refresh_token: str
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
@@ -1,17 +1,37 @@
-from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import Annotated
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    ConfigDict,
+    Field,
+    WithJsonSchema,
+    field_validator,
+    model_validator,
+)
+from pydantic.networks import validate_email
+from pydantic_core import PydanticUseDefault
 
 from app.models.enums import PowerEnum
 
+# 与 Email 的校验与规范化一致，但 email-validator 在首次校验时才导入
+# （Email 在定义模型时即导入 email-validator，使所有导入 schema 的模块都承担其开销）
+Email = Annotated[
+    str,
+    AfterValidator(lambda value: validate_email(value)[1]),
+    WithJsonSchema({"type": "string", "format": "email"}),
+]
+
 
 class UserCreate(BaseModel):
     username: str
-    email: EmailStr
+    email: Email
     password: str
 
 
 class UserUpdate(BaseModel):
     username: str | None = None
-    email: EmailStr | None = None
+    email: Email | None = None
     introduction: str | None = None
 
 
@@ -23,8 +43,58 @@ class UserPasswordUpdate(BaseModel):
 class User(BaseModel):
     id: int
     username: str
-    email: EmailStr
+    email: Email
     introduction: str | None = None
     avatar: str | None = None
     power: PowerEnum
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserImportRow(BaseModel):
+    """批量导入的单行用户数据，password 与 hashed_password 至少提供一个"""
+
+    username: str
+    email: Email
+    password: str | None = None
+    hashed_password: str | None = None
+    introduction: str | None = None
+    avatar: str | None = None
+    power: PowerEnum = PowerEnum.USER
+
+    @field_validator(
+        "password", "hashed_password", "introduction", "avatar", "power", mode="before"
+    )
+    @classmethod
+    def empty_as_default(cls, value):
+        # CSV 中的空字段视为未提供
+        if value == "":
+            raise PydanticUseDefault()
+        return value
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if self.password is None and self.hashed_password is None:
+            raise ValueError("password or hashed_password is required")
+        return self
+
+
+class UserImportResult(BaseModel):
+    """批量导入结果"""
+
+    received: int  # 收到的有效行数
+    inserted: int  # 新增用户数
+    updated: int  # 更新用户数（on_conflict=update 时）
+    skipped: int  # 因用户名或邮箱冲突而跳过的行数
+
+
+class UserTokensRevoke(BaseModel):
+    """批量注销令牌"""
+
+    user_ids: list[int] = Field(min_length=1, max_length=10000)
+
+
+class UserAvatar(BaseModel):
+    """上传后的头像"""
+
+    url: str  # 默认尺寸，同时写入用户的 avatar 字段
+    sizes: dict[int, str]  # 边长(像素) -> URL
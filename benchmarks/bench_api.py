@@ -0,0 +1,536 @@
+"""
+API 基准测试套件
+
+驱动 create_app() 构建的应用，逐个运行场景，报告吞吐、p50/p99 延迟与单请求峰值内存分配，
+并与基线文件比较，超出容差时以非零状态码退出：
+- --mode asgi:    进程内通过 ASGI 客户端调用（含生命周期），可统计内存分配
+- --mode uvicorn: 启动真实的 uvicorn 工作进程，通过 HTTP 调用
+
+依赖的外部服务均使用本地替身，不影响已有数据：
+- Redis: 默认在本进程内启动 fakeredis 的 TCP 服务（需安装 fakeredis[lua]），也可通过 --redis-url 指定
+- PostgreSQL: 在配置（或 --database-url 指定）的服务器上创建临时数据库并写入测试用户，结束后删除；
+  无法连接时跳过依赖数据库的场景
+
+场景: 根路由、错误处理（404/405/401/422）、令牌签发/校验/刷新/注销、用户列表首页与游标翻页
+
+基线文件按模式保存各场景的结果，默认比较 rps、p50_ms、peak_alloc_kb（p99 波动较大，仅展示），
+应在固定的机器上生成并提交: uv run python -m benchmarks.bench_api --update-baseline
+基线文件中没有当前模式的基线时（如首次运行），本次结果记录为基线，之后的运行与之比较
+
+运行: uv run python -m benchmarks.bench_api --mode asgi --requests 2000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urlparse
+
+import orjson
+
+from benchmarks._common import print_table, setup_env, start_fake_redis, summarize
+
+setup_env()
+
+BASELINE_FILE = Path(__file__).with_name("baseline_api.json")
+ADMIN_NAME = "bench_admin"
+ADMIN_PASSWORD = "benchmark"
+# 延迟、内存等指标超过基线 (1 + 容差) 倍视为回退，这里列出的指标低于基线 (1 - 容差) 倍视为回退
+HIGHER_IS_BETTER = {"rps"}
+
+
+@dataclass
+class Fixtures:
+    """场景共用的测试数据"""
+
+    admin_token: str = ""
+    cursor: str = ""
+    # 场景名 -> 预先签发的 Refresh Token，每个请求消耗一个
+    refresh_tokens: dict[str, list[str]] = field(default_factory=dict)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    status: int
+    needs_db: bool = False
+    max_requests: int | None = None  # 单次请求成本很高的场景（如密码哈希）限制请求数
+    consumes_refresh_token: bool = False
+    # 由 (fixtures, 请求序号) 生成额外的请求参数（headers / json / data / params）
+    build: Callable[[Fixtures, int], dict[str, Any]] = lambda fixtures, i: {}
+
+
+def _bearer(fixtures: Fixtures, i: int) -> dict[str, Any]:
+    return {"headers": {"Authorization": f"Bearer {fixtures.admin_token}"}}
+
+
+def _refresh_body(name: str) -> Callable[[Fixtures, int], dict[str, Any]]:
+    return lambda fixtures, i: {"json": {"refresh_token": fixtures.refresh_tokens[name][i]}}
+
+
+SCENARIOS = [
+    Scenario("root", "GET", "/", 200),
+    Scenario("not_found", "GET", "/api/not-found", 404),
+    Scenario("method_not_allowed", "DELETE", "/", 405),
+    Scenario("unauthorized", "GET", "/api/internal/pools", 401),
+    Scenario("validation_error", "POST", "/api/tokens", 422),
+    Scenario("token_verify", "GET", "/api/internal/pools", 200, build=_bearer),
+    Scenario(
+        "token_revoke",
+        "POST",
+        "/api/tokens/revoke",
+        200,
+        consumes_refresh_token=True,
+        build=_refresh_body("token_revoke"),
+    ),
+    Scenario(
+        "token_issue",
+        "POST",
+        "/api/tokens",
+        200,
+        needs_db=True,
+        max_requests=50,
+        build=lambda fixtures, i: {"data": {"username": ADMIN_NAME, "password": ADMIN_PASSWORD}},
+    ),
+    Scenario(
+        "token_refresh",
+        "POST",
+        "/api/tokens/refresh",
+        200,
+        needs_db=True,
+        consumes_refresh_token=True,
+        build=_refresh_body("token_refresh"),
+    ),
+    Scenario("users_page", "GET", "/api/users?size=20", 200, needs_db=True, build=_bearer),
+    Scenario(
+        "users_page_cursor",
+        "GET",
+        "/api/users",
+        200,
+        needs_db=True,
+        build=lambda fixtures, i: {
+            **_bearer(fixtures, i),
+            "params": {"size": 20, "cursor": fixtures.cursor},
+        },
+    ),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def configure_redis(args) -> Any:
+    """设置 Redis 相关环境变量，返回需要在结束时关闭的 fakeredis 服务（使用外部 Redis 时为 None）"""
+    if args.redis_url:
+        url = urlparse(args.redis_url)
+        os.environ.update(
+            REDIS_HOST=url.hostname or "127.0.0.1",
+            REDIS_PORT=str(url.port or 6379),
+            REDIS_PASSWORD=unquote(url.password or ""),
+            REDIS_DB=url.path.lstrip("/") or "0",
+        )
+        return None
+    server, port = start_fake_redis()
+    os.environ.update(REDIS_HOST="127.0.0.1", REDIS_PORT=str(port), REDIS_DB="0")
+    return server
+
+
+def postgres_params(args) -> dict[str, Any]:
+    """管理连接参数（用于创建与删除临时数据库）"""
+    if args.database_url:
+        url = urlparse(args.database_url.replace("+asyncpg", ""))
+        return {
+            "host": url.hostname or "127.0.0.1",
+            "port": url.port or 5432,
+            "user": unquote(url.username or "postgres"),
+            "password": unquote(url.password or ""),
+            "database": url.path.lstrip("/") or "postgres",
+        }
+    from app.core.config import get_settings
+
+    settings = get_settings()
+    return {
+        "host": settings.POSTGRES_HOST,
+        "port": settings.POSTGRES_PORT,
+        "user": settings.POSTGRES_USER,
+        "password": settings.POSTGRES_PASSWORD,
+        "database": settings.POSTGRES_DB,
+    }
+
+
+async def create_database(params: dict[str, Any], name: str) -> bool:
+    """创建临时数据库并设置连接环境变量，无法连接时返回 False"""
+    import asyncpg
+
+    try:
+        conn = await asyncpg.connect(**params, timeout=5)
+    except (OSError, asyncpg.PostgresError) as e:
+        print(f"[!] 无法连接 PostgreSQL，跳过依赖数据库的场景: {e!r}")
+        return False
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}"')
+        await conn.execute(f'CREATE DATABASE "{name}"')
+    finally:
+        await conn.close()
+    os.environ.update(
+        POSTGRES_HOST=params["host"],
+        POSTGRES_PORT=str(params["port"]),
+        POSTGRES_USER=params["user"],
+        POSTGRES_PASSWORD=params["password"],
+        POSTGRES_DB=name,
+    )
+    return True
+
+
+async def drop_database(params: dict[str, Any], name: str) -> None:
+    import asyncpg
+
+    conn = await asyncpg.connect(**params, timeout=5)
+    try:
+        await conn.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        await conn.close()
+
+
+async def seed_database(users: int) -> None:
+    """建表并写入超级管理员（id=1）与 users 个普通用户"""
+    from sqlalchemy import text
+
+    from app.core.database import resources
+    from app.core.security import get_password_hash
+    from app.models.base import Base
+
+    async with resources.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, username, email, hashed_password, power, token_version)"
+                " VALUES (1, :name, :email, :password, 'SUPER_ADMIN'::powerenum, 0)"
+            ),
+            {
+                "name": ADMIN_NAME,
+                "email": f"{ADMIN_NAME}@example.com",
+                "password": get_password_hash(ADMIN_PASSWORD),
+            },
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, username, email, hashed_password, power, token_version,"
+                " created_at, updated_at)"
+                " SELECT g, 'user' || g, 'user' || g || '@example.com', 'x', 'USER'::powerenum, 0,"
+                " 1700000000 + g, 1700000000 + g"
+                " FROM generate_series(2, :last) AS g"
+            ),
+            {"last": users + 1},
+        )
+        await conn.execute(text("SELECT setval('users_id_seq', :last)"), {"last": users + 1})
+    await resources.close()
+
+
+async def prepare_fixtures(scenarios: list[Scenario], counts: dict[str, int]) -> Fixtures:
+    """签发场景所需的令牌（写入共享的 Redis，uvicorn 工作进程同样可以校验）"""
+    from datetime import timedelta
+
+    from app.core.database import resources
+    from app.core.security import create_refresh_token, create_user_access_token
+    from app.core.token_store import refresh_token_store
+    from app.models.enums import PowerEnum
+    from app.models.user import User
+
+    admin = User(id=1, username=ADMIN_NAME, power=PowerEnum.SUPER_ADMIN, token_version=0)
+    fixtures = Fixtures(admin_token=create_user_access_token(admin, timedelta(hours=1)))
+    await refresh_token_store.load_scripts()
+    for scenario in scenarios:
+        if scenario.consumes_refresh_token:
+            fixtures.refresh_tokens[scenario.name] = [
+                await create_refresh_token("1", timedelta(hours=1))
+                for _ in range(counts[scenario.name])
+            ]
+    await resources.close()
+    return fixtures
+
+
+async def run_scenario(
+    client, scenario: Scenario, fixtures: Fixtures, requests: int, warmup: int, concurrency: int
+) -> dict[str, Any]:
+    async def send(i: int) -> None:
+        response = await client.request(
+            scenario.method, scenario.path, **scenario.build(fixtures, i)
+        )
+        if response.status_code != scenario.status:
+            raise RuntimeError(
+                f"{scenario.name}: 期望状态码 {scenario.status}，"
+                f"实际为 {response.status_code}: {response.text[:200]}"
+            )
+
+    for i in range(warmup):
+        await send(i)
+
+    samples: list[float] = []
+    counter = itertools.count(warmup)
+
+    async def worker() -> None:
+        while (i := next(counter)) < warmup + requests:
+            started = time.perf_counter()
+            await send(i)
+            samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = summarize(samples)
+    return {
+        "scenario": scenario.name,
+        "rps": requests / elapsed,
+        "p50_ms": stats["p50_ms"],
+        "p99_ms": stats["p99_ms"],
+        "peak_alloc_kb": None,
+    }
+
+
+async def measure_allocations(
+    client, scenario: Scenario, fixtures: Fixtures, offset: int, requests: int
+) -> float:
+    """逐个发送请求，返回单请求峰值内存分配的中位数（KB），仅进程内模式可用"""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(offset, offset + requests):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await client.request(scenario.method, scenario.path, **scenario.build(fixtures, i))
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return statistics.median(peaks) / 1024
+
+
+def request_counts(scenarios: list[Scenario], args) -> dict[str, int]:
+    """各场景的正式请求数"""
+    return {
+        scenario.name: min(args.requests, scenario.max_requests or args.requests)
+        for scenario in scenarios
+    }
+
+
+async def run_asgi(scenarios, fixtures, counts, args) -> list[dict[str, Any]]:
+    import httpx
+
+    from app.main import create_app
+
+    app = create_app()
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await load_cursor(client, scenarios, fixtures)
+            for scenario in scenarios:
+                result = await run_scenario(
+                    client, scenario, fixtures, counts[scenario.name], args.warmup, args.concurrency
+                )
+                offset = args.warmup + counts[scenario.name]
+                result["peak_alloc_kb"] = await measure_allocations(
+                    client, scenario, fixtures, offset, args.alloc_requests
+                )
+                results.append(result)
+    return results
+
+
+async def run_uvicorn(scenarios, fixtures, counts, args) -> list[dict[str, Any]]:
+    import httpx
+
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    results = []
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            await wait_ready(client, process)
+            await load_cursor(client, scenarios, fixtures)
+            for scenario in scenarios:
+                results.append(
+                    await run_scenario(
+                        client,
+                        scenario,
+                        fixtures,
+                        counts[scenario.name],
+                        args.warmup,
+                        args.concurrency,
+                    )
+                )
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+async def wait_ready(client, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn 已退出，状态码 {process.returncode}")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("等待 uvicorn 启动超时")
+
+
+async def load_cursor(client, scenarios: list[Scenario], fixtures: Fixtures) -> None:
+    """取第 5 页的游标，用于游标翻页场景"""
+    if not any(scenario.name == "users_page_cursor" for scenario in scenarios):
+        return
+    params: dict[str, Any] = {"size": 20}
+    for _ in range(5):
+        response = await client.get("/api/users", params=params, **_bearer(fixtures, 0))
+        params["cursor"] = response.json()["data"]["pagination"]["next_cursor"]
+    fixtures.cursor = params["cursor"]
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: dict[str, dict], metrics: list[str], tolerance: float
+) -> list[str]:
+    """与基线比较，返回回退说明"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result["scenario"])
+        if base is None:
+            continue
+        for metric in metrics:
+            current, previous = result.get(metric), base.get(metric)
+            if current is None or not previous:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = current < previous * (1 - tolerance)
+            else:
+                regressed = current > previous * (1 + tolerance)
+            if regressed:
+                change = (current - previous) / previous * 100
+                regressions.append(
+                    f"{result['scenario']}.{metric}: {previous:.2f} -> {current:.2f} ({change:+.0f}%)"
+                )
+    return regressions
+
+
+async def main(args) -> int:
+    fake_redis = configure_redis(args)
+    # 关闭登录限流、全局限流与过载保护，避免场景被 429/503 截断
+    os.environ.update(
+        APP_ENV="testing",
+        DEBUG="false",
+        RATE_LIMIT_LOGIN="",
+        RATE_LIMIT_DEFAULT="",
+        OVERLOAD_PROTECTION_ENABLED="false",
+    )
+    params = postgres_params(args)
+    database = f"bench_api_{os.getpid()}"
+    has_db = await create_database(params, database)
+    if not has_db:
+        # 没有数据库时跳过连接池预热，避免启动时等待连接超时
+        os.environ["POOL_WARMUP"] = "false"
+
+    from app.core.config import get_settings
+
+    # 读取管理连接参数时已缓存配置，环境变量更新后重新加载
+    get_settings.cache_clear()
+
+    selected = args.scenarios or [scenario.name for scenario in SCENARIOS]
+    scenarios = [
+        scenario
+        for scenario in SCENARIOS
+        if scenario.name in selected and (has_db or not scenario.needs_db)
+    ]
+    counts = request_counts(scenarios, args)
+    try:
+        if has_db:
+            await seed_database(args.users)
+        total = {name: args.warmup + count + args.alloc_requests for name, count in counts.items()}
+        fixtures = await prepare_fixtures(scenarios, total)
+        run = run_asgi if args.mode == "asgi" else run_uvicorn
+        results = await run(scenarios, fixtures, counts, args)
+    finally:
+        if has_db and not args.keep:
+            await drop_database(params, database)
+        if fake_redis is not None:
+            fake_redis.shutdown()
+
+    print_table(
+        f"api ({args.mode}, concurrency {args.concurrency}, {args.requests} requests)",
+        [{k: "-" if v is None else v for k, v in result.items()} for result in results],
+    )
+
+    baseline_file = Path(args.baseline)
+    baselines = orjson.loads(baseline_file.read_bytes()) if baseline_file.exists() else {}
+    if args.update_baseline or args.mode not in baselines:
+        if args.update_baseline:
+            message = f"基线已更新: {baseline_file}"
+        else:
+            message = f"{baseline_file} 中没有 {args.mode} 模式的基线，已记录本次结果作为基线"
+        baselines[args.mode] = {result.pop("scenario"): result for result in results}
+        baseline_file.write_bytes(orjson.dumps(baselines, option=orjson.OPT_INDENT_2))
+        print(f"\n{message}")
+        return 0
+    regressions = compare(results, baselines[args.mode], args.metrics, args.tolerance)
+    for regression in regressions:
+        print(f"[!] 性能回退 {regression}")
+    if not regressions:
+        print(f"\n与基线相比没有超过 {args.tolerance:.0%} 容差的回退")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--scenarios", nargs="*", help="只运行指定场景，默认全部")
+    parser.add_argument("--requests", type=int, default=2000, help="每个场景的请求数")
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--alloc-requests", type=int, default=50, help="统计内存分配的请求数")
+    parser.add_argument("--users", type=int, default=10000, help="写入的测试用户数")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--database-url", default=None, help="PostgreSQL 管理连接")
+    parser.add_argument("--keep", action="store_true", help="结束后保留临时数据库")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE))
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对回退幅度")
+    parser.add_argument(
+        "--metrics",
+        nargs="*",
+        default=["rps", "p50_ms", "peak_alloc_kb"],
+        help="与基线比较的指标",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="以本次结果更新基线")
+    sys.exit(asyncio.run(main(parser.parse_args())))
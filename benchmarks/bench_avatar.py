@@ -0,0 +1,157 @@
+"""
+头像上传基准测试
+
+对比两种上传处理方式在并发上传时的吞吐量，以及 `/ping` 接口的 p50/p99 延迟：
+- naive: UploadFile 接收完整文件后读入内存，在事件循环中用 Pillow 生成缩略图
+- stream: AvatarStore 流式接收并计算哈希，缩略图在图片进程池中生成
+
+每次上传的内容各不相同（JPEG 末尾附加序号），不命中去重；需安装 Pillow（uv sync --extra images）
+运行: uv run python -m benchmarks.bench_avatar --concurrency 8 --duration 5
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+import time
+
+from benchmarks._common import print_table, setup_env, summarize
+
+setup_env()
+# 缩略图写入临时目录
+os.environ["STATIC_DIR"] = tempfile.mkdtemp(prefix="bench_avatar_")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request, UploadFile  # noqa: E402
+
+from app.core.avatars import avatar_store  # noqa: E402
+from app.core.executors import image_executor  # noqa: E402
+from app.core.handlers import register_handlers  # noqa: E402
+from app.core.images import make_thumbnails  # noqa: E402
+
+PING_INTERVAL = 0.005
+
+
+def build_image(width: int, height: int) -> bytes:
+    from PIL import Image
+
+    image = Image.effect_noise((width, height), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    register_handlers(app)
+    naive_dir = avatar_store.directory.parent / "naive"
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/avatar/naive")
+    async def upload_naive(file: UploadFile):
+        content = await file.read()
+        source = naive_dir / f"{time.perf_counter_ns()}.jpg"
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(content)
+        make_thumbnails(str(source), str(source.with_suffix("")), avatar_store.sizes, 10**9)
+        return {"ok": True}
+
+    @app.post("/avatar/stream")
+    async def upload_stream(request: Request):
+        digest = await avatar_store.save(request.stream())
+        return {"url": avatar_store.urls(digest)[avatar_store.sizes[0]]}
+
+    return app
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, mode: str | None, image: bytes, concurrency: int, duration: float
+) -> dict:
+    """在 duration 秒内保持 concurrency 个并发上传，同时串行探测 /ping"""
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+    statuses: dict[int, int] = {}
+    counter = 0
+
+    async def upload_loop():
+        nonlocal counter
+        while time.perf_counter() < deadline:
+            counter += 1
+            # 附加的字节不影响解码，但使每次上传的内容哈希不同
+            content = image + counter.to_bytes(8, "big")
+            if mode == "naive":
+                response = await client.post(
+                    "/avatar/naive", files={"file": ("avatar.jpg", content, "image/jpeg")}
+                )
+            else:
+                response = await client.post(
+                    "/avatar/stream", content=content, headers={"Content-Type": "image/jpeg"}
+                )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def ping_loop() -> list[float]:
+        # 按固定节奏探测，延迟从计划发出时间开始计算，事件循环被阻塞的时间也会计入
+        samples = []
+        scheduled_at = started_at
+        while not samples or scheduled_at < deadline:
+            await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+            await client.get("/ping")
+            samples.append(time.perf_counter() - scheduled_at)
+            scheduled_at = max(scheduled_at + PING_INTERVAL, time.perf_counter())
+        return samples
+
+    ping_task = asyncio.create_task(ping_loop())
+    tasks = [asyncio.create_task(upload_loop()) for _ in range(concurrency if mode else 0)]
+    samples = await ping_task
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started_at
+    return {
+        "mode": mode or "idle",
+        **summarize(samples),
+        "uploads_per_sec": statuses.get(200, 0) / elapsed,
+        "rejected": sum(count for status, count in statuses.items() if status != 200),
+    }
+
+
+async def main(args) -> None:
+    image = build_image(args.width, args.height)
+    app = build_app()
+    image_executor.start()
+    # 预热进程池（子进程首次导入 Pillow）
+    await client_warmup(app, image)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        rows = [
+            await run_scenario(client, mode, image, args.concurrency, args.duration)
+            for mode in (None, "naive", "stream")
+        ]
+    await image_executor.shutdown()
+    print_table(
+        f"avatar upload ({args.width}x{args.height} JPEG, {len(image) // 1024} KB, "
+        f"concurrency={args.concurrency})",
+        rows,
+    )
+
+
+async def client_warmup(app: FastAPI, image: bytes) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await asyncio.gather(
+            *(
+                client.post("/avatar/stream", content=image + i.to_bytes(8, "big"))
+                for i in range(image_executor.max_workers)
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--width", type=int, default=2400)
+    parser.add_argument("--height", type=int, default=1800)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,103 @@
+"""
+响应压缩基准测试
+
+针对典型的 SuccessResponse / PaginatedResponse 负载，比较各编码与等级下
+每个响应的 CPU 耗时与传输字节数；gzip-9 为替换前 GZipMiddleware 的默认等级
+
+运行: uv run python -m benchmarks.bench_compression
+"""
+
+import argparse
+import time
+import zlib
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+from app.core.compression import Codec, available_codecs  # noqa: E402
+from app.schemas.response import (  # noqa: E402
+    PaginatedData,
+    PaginatedResponse,
+    PaginationInfo,
+    SuccessResponse,
+)
+from app.schemas.user import User  # noqa: E402
+
+
+def make_user(i: int) -> User:
+    return User(
+        id=i,
+        username=f"user{i:06d}",
+        email=f"user{i:06d}@example.com",
+        introduction=f"Hello, I am user number {i}, nice to meet you.",
+        avatar=f"/static/avatars/{i:064x}.webp",
+        power=0,
+    )
+
+
+def payloads() -> dict[str, bytes]:
+    app_info = {
+        "name": "FastAPI Template",
+        "environment": "production",
+        "debug": False,
+        "public_url": "https://api.example.com",
+        "api_prefix": "/api",
+    }
+    result = {
+        "root-info": SuccessResponse[dict](data=app_info).model_dump_json().encode(),
+        "user": SuccessResponse[User](data=make_user(1)).model_dump_json().encode(),
+    }
+    for size in (20, 100, 1000):
+        page = PaginatedResponse[User](
+            data=PaginatedData[User](
+                items=[make_user(i) for i in range(size)],
+                pagination=PaginationInfo(
+                    page=1, size=size, total_items=10**6, total_pages=10**6 // size
+                ),
+            )
+        )
+        result[f"page-{size}"] = page.model_dump_json().encode()
+    return result
+
+
+def codecs() -> list[Codec]:
+    candidates = available_codecs(zstd_level=3, brotli_level=4, gzip_level=5)
+    candidates.append(
+        Codec("gzip-9", 9, lambda data, level: zlib.compress(data, level, wbits=31), None)
+    )
+    candidates.append(
+        Codec("gzip-1", 1, lambda data, level: zlib.compress(data, level, wbits=31), None)
+    )
+    return candidates
+
+
+def main(min_seconds: float) -> None:
+    rows = []
+    for name, body in payloads().items():
+        for codec in codecs():
+            iterations = 0
+            started = time.process_time()
+            while True:
+                compressed = codec.compress(body)
+                iterations += 1
+                elapsed = time.process_time() - started
+                if elapsed >= min_seconds:
+                    break
+            rows.append(
+                {
+                    "payload": name,
+                    "codec": f"{codec.name}:{codec.level}",
+                    "raw_bytes": len(body),
+                    "wire_bytes": len(compressed),
+                    "ratio": len(body) / len(compressed),
+                    "cpu_us": elapsed / iterations * 1e6,
+                }
+            )
+    print_table("compression per response", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="每个组合的最少 CPU 时间")
+    main(parser.parse_args().min_seconds)
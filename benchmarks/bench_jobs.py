@@ -0,0 +1,180 @@
+"""
+后台任务队列（Redis Streams）吞吐量与延迟基准测试
+
+- 入队: 逐个 enqueue vs enqueue_many（每批 --batch 个）的吞吐量（个/秒）
+- 消费: 预先入队 --jobs 个空任务，不同并发数下消费完的吞吐量
+- 延迟: 以 --rate 个/秒的速率持续入队，从入队到开始执行的 p50/p99 延迟（毫秒）
+- 重试: 全部失败一次的任务，消费完（含退避等待）的总耗时
+
+默认在本进程内启动 fakeredis 的 TCP 服务（需安装 fakeredis[lua]），绝对数值应以本地 Redis 为准:
+运行: uv run python -m benchmarks.bench_jobs --redis-url redis://:password@127.0.0.1:6379/15
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks._common import print_table, setup_env, start_fake_redis, summarize
+
+setup_env()
+
+import redis.asyncio as aioredis  # noqa: E402
+
+from app.core.jobs import JobQueue  # noqa: E402
+
+
+def create_queue(redis: aioredis.Redis, concurrency: int, args) -> JobQueue:
+    # 每个场景使用独立的任务流
+    return JobQueue(
+        f"bench_jobs:{uuid.uuid4().hex[:8]}",
+        concurrency=concurrency,
+        batch_size=args.batch,
+        block_seconds=0.05,
+        max_attempts=3,
+        backoff=0.05,
+        backoff_max=0.05,
+        visibility_timeout=30,
+        dead_letter_max_length=1000,
+        redis=redis,
+    )
+
+
+async def cleanup(queue: JobQueue) -> None:
+    await queue.redis.delete(queue.stream, queue.delayed_key, queue.dead_key)
+
+
+async def bench_enqueue(redis: aioredis.Redis, args) -> list[dict]:
+    results = []
+    queue = create_queue(redis, 1, args)
+    started = time.perf_counter()
+    for i in range(args.jobs):
+        await queue.enqueue("noop", i=i)
+    elapsed = time.perf_counter() - started
+    results.append({"mode": "enqueue", "jobs_per_sec": args.jobs / elapsed})
+    await cleanup(queue)
+
+    queue = create_queue(redis, 1, args)
+    started = time.perf_counter()
+    for offset in range(0, args.jobs, args.batch):
+        count = min(args.batch, args.jobs - offset)
+        await queue.enqueue_many("noop", ({"i": offset + i} for i in range(count)))
+    elapsed = time.perf_counter() - started
+    results.append({"mode": f"enqueue_many({args.batch})", "jobs_per_sec": args.jobs / elapsed})
+    await cleanup(queue)
+    return results
+
+
+async def drain(queue: JobQueue, total: int, timeout: float = 300.0) -> float:
+    """启动消费者直到处理完 total 个任务（成功或转入死信），返回耗时（秒）"""
+    started = time.perf_counter()
+    await queue.start()
+    deadline = time.monotonic() + timeout
+    while queue.stats.completed + queue.stats.dead < total and time.monotonic() < deadline:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - started
+    await queue.shutdown()
+    await cleanup(queue)
+    return elapsed
+
+
+async def bench_consume(redis: aioredis.Redis, args) -> list[dict]:
+    results = []
+    for concurrency in args.concurrency:
+        queue = create_queue(redis, concurrency, args)
+
+        @queue.handler("noop")
+        async def noop(i: int) -> None:
+            if args.work_ms:
+                await asyncio.sleep(args.work_ms / 1000)
+
+        await queue.enqueue_many("noop", ({"i": i} for i in range(args.jobs)))
+        elapsed = await drain(queue, args.jobs)
+        results.append(
+            {
+                "concurrency": concurrency,
+                "jobs_per_sec": args.jobs / elapsed,
+                "completed": queue.stats.completed,
+            }
+        )
+    return results
+
+
+async def bench_latency(redis: aioredis.Redis, args) -> dict:
+    queue = create_queue(redis, max(args.concurrency), args)
+    latencies: list[float] = []
+
+    @queue.handler("timed")
+    async def timed(enqueued_at: float) -> None:
+        latencies.append(time.time() - enqueued_at)
+
+    await queue.start()
+    total = int(args.rate * args.duration)
+    interval = 1 / args.rate
+    started = time.perf_counter()
+    for i in range(total):
+        await queue.enqueue("timed", enqueued_at=time.time())
+        delay = started + (i + 1) * interval - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    deadline = time.monotonic() + 30
+    while len(latencies) < total and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    await queue.shutdown()
+    await cleanup(queue)
+    return {"rate": args.rate, **summarize(latencies)}
+
+
+async def bench_retry(redis: aioredis.Redis, args) -> dict:
+    queue = create_queue(redis, max(args.concurrency), args)
+    failed: set[int] = set()
+
+    @queue.handler("flaky")
+    async def flaky(i: int) -> None:
+        if i not in failed:
+            failed.add(i)
+            raise RuntimeError("first attempt fails")
+
+    jobs = min(args.jobs, 1000)
+    await queue.enqueue_many("flaky", ({"i": i} for i in range(jobs)))
+    elapsed = await drain(queue, jobs)
+    return {
+        "jobs": jobs,
+        "seconds": elapsed,
+        "retried": queue.stats.retried,
+        "completed": queue.stats.completed,
+    }
+
+
+async def main(args) -> None:
+    server = None
+    if args.redis_url:
+        redis = aioredis.Redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        server, port = start_fake_redis()
+        redis = aioredis.Redis(port=port, decode_responses=True)
+    try:
+        print_table(f"enqueue ({args.jobs} jobs)", await bench_enqueue(redis, args))
+        print_table(
+            f"consume ({args.jobs} jobs, {args.work_ms}ms each)", await bench_consume(redis, args)
+        )
+        print_table(
+            f"enqueue -> start latency ({args.duration}s)", [await bench_latency(redis, args)]
+        )
+        print_table("retry once with backoff", [await bench_retry(redis, args)])
+    finally:
+        await redis.aclose()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=100, help="enqueue_many 与读取的批大小")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--work-ms", type=float, default=0.0, help="每个任务的模拟耗时（毫秒）")
+    parser.add_argument("--rate", type=float, default=500.0, help="延迟测试的入队速率（个/秒）")
+    parser.add_argument("--duration", type=float, default=3.0, help="延迟测试时长（秒）")
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+JWT 签发与验证吞吐量基准测试
+
+对比各编解码后端（native / jose / pyjwt）在不同算法（HS256 / ES256 / EdDSA）下
+签发与验证 Access Token 的吞吐量（次/秒）与单次耗时（微秒），后端不支持的算法或未安装的后端跳过
+
+密钥在临时目录中生成，不读取 JWT_KEYS_DIR
+运行: uv run python -m benchmarks.bench_jwt --iterations 20000
+"""
+
+import argparse
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+from app.core.signing import (  # noqa: E402
+    BACKENDS,
+    JWTCodec,
+    KeyRing,
+    generate_key,
+)
+
+ALGORITHMS = ("HS256", "ES256", "EdDSA")
+
+
+def build_payload() -> dict:
+    now = int(time.time())
+    return {
+        "sub": "42",
+        "name": "benchmark",
+        "pwr": 0,
+        "ver": 1,
+        "iat": now,
+        "exp": now + 3600,
+        "type": "access",
+    }
+
+
+def measure(fn, iterations: int) -> tuple[float, float]:
+    """返回 (次/秒, 微秒/次)"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+    return iterations / elapsed, elapsed / iterations * 1_000_000
+
+
+def main(args) -> None:
+    keys_dir = Path(tempfile.mkdtemp(prefix="bench_jwt_"))
+    for algorithm in ("ES256", "EdDSA"):
+        generate_key(algorithm, keys_dir / algorithm, "bench")
+
+    results = []
+    for backend_name in args.backends:
+        backend = BACKENDS[backend_name]()
+        for algorithm in ALGORITHMS:
+            keyring = KeyRing(algorithm, "benchmark-secret-key", keys_dir / algorithm)
+            try:
+                codec = JWTCodec(backend, keyring)
+                token = codec.encode(build_payload())
+            except ValueError:
+                continue  # 后端不支持该算法
+            except ImportError:
+                print(f"跳过 {backend_name}: 未安装")
+                break
+            payload = build_payload()
+            # 预热
+            for _ in range(100):
+                codec.decode(codec.encode(payload))
+            sign_ops, sign_us = measure(partial(codec.encode, payload), args.iterations)
+            verify_ops, verify_us = measure(partial(codec.decode, token), args.iterations)
+            results.append(
+                {
+                    "backend": backend_name,
+                    "algorithm": algorithm,
+                    "sign_ops": sign_ops,
+                    "sign_us": sign_us,
+                    "verify_ops": verify_ops,
+                    "verify_us": verify_us,
+                    "token_bytes": len(token),
+                }
+            )
+    print_table(f"JWT sign / verify ({args.iterations} iterations)", results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--backends", nargs="+", choices=tuple(BACKENDS), default=tuple(BACKENDS))
+    main(parser.parse_args())
@@ -0,0 +1,160 @@
+"""
+过载保护基准测试
+
+以固定速率（开环，不等待响应）发送请求 --duration 秒，速率超出处理能力，对比关闭与开启过载保护
+（AdmissionMiddleware + LoadMonitor）时:
+- query: 模拟数据库查询，等待 --pool-size 个连接中的一个（计入主库连接池的等待统计）后持有 --query-ms 毫秒，
+         处理能力为 pool-size / query-ms，按 --query-rate 发送
+- cpu:   在事件循环内同步阻塞 --block-ms 毫秒，模拟 CPU 密集的处理器，处理能力为 1 / block-ms，按 --cpu-rate 发送
+统计成功与 503 的请求数、成功请求的耗时，以及同时持续探测的 /health 的耗时
+客户端与应用在同一个事件循环内，cpu 场景下 /health 的耗时同样受阻塞影响
+
+无需数据库与 Redis:
+运行: uv run python -m benchmarks.bench_overload
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import print_table, setup_env, summarize
+
+setup_env()
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.database import resources  # noqa: E402
+from app.core.overload import (  # noqa: E402
+    AdmissionMiddleware,
+    AdmissionStats,
+    admission_controller,
+    health_endpoint,
+    load_monitor,
+)
+
+
+def build_app(args, protected: bool) -> FastAPI:
+    app = FastAPI()
+    pool = asyncio.Semaphore(args.pool_size)
+    wait_stats = resources.engine.pool.wait_stats
+
+    @app.get("/query")
+    async def query() -> dict:
+        started = wait_stats.begin()
+        try:
+            await pool.acquire()
+        finally:
+            wait_stats.record(started, timed_out=False)
+        try:
+            await asyncio.sleep(args.query_ms / 1000)
+        finally:
+            pool.release()
+        return {"ok": True}
+
+    @app.get("/cpu")
+    async def cpu() -> dict:
+        await asyncio.sleep(0)
+        time.sleep(args.block_ms / 1000)
+        return {"ok": True}
+
+    app.add_route("/health", health_endpoint)
+    if protected:
+        app.add_middleware(AdmissionMiddleware, critical_paths=("/health",))
+    return app
+
+
+async def run_scenario(args, route: str, rate: float, protected: bool) -> dict:
+    admission_controller.stats = AdmissionStats()
+    load_monitor.loop_lag = 0.0
+    if protected:
+        await load_monitor.start()
+        # 等待首次采样，避免上一场景残留的连接池等待
+        await asyncio.sleep(args.sample_interval * 2)
+    transport = httpx.ASGITransport(app=build_app(args, protected))
+    latencies: list[float] = []
+    health_latencies: list[float] = []
+    shed = 0
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def request():
+            nonlocal shed
+            started = time.perf_counter()
+            response = await client.get(route)
+            if response.status_code == 503:
+                shed += 1
+                assert response.headers["retry-after"]
+            else:
+                assert response.status_code == 200, response.status_code
+                latencies.append(time.perf_counter() - started)
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                response = await client.get("/health")
+                assert response.status_code == 200, response.status_code
+                health_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        tasks = []
+        started = time.perf_counter()
+        total = int(rate * args.duration)
+        # 按计划时间补发到期的请求，事件循环被阻塞后不会少发
+        while len(tasks) < total:
+            due = min(total, int((time.perf_counter() - started) * rate) + 1)
+            tasks.extend(asyncio.create_task(request()) for _ in range(due - len(tasks)))
+            await asyncio.sleep(1 / rate)
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    if protected:
+        await load_monitor.shutdown()
+    stats = summarize(latencies)
+    return {
+        "scenario": f"{route[1:]} {'on' if protected else 'off'}",
+        "ok": len(latencies),
+        "shed_503": shed,
+        "ok_p50_ms": stats["p50_ms"],
+        "ok_p99_ms": stats["p99_ms"],
+        "health_p99_ms": summarize(health_latencies)["p99_ms"],
+        "elapsed_s": elapsed,
+    }
+
+
+async def main(args) -> None:
+    admission_controller.max_concurrency = args.max_concurrency
+    admission_controller.queue_size = args.queue_size
+    admission_controller.queue_timeout = args.queue_timeout
+    load_monitor.interval = args.sample_interval
+    try:
+        rows = []
+        for route, rate in (("/query", args.query_rate), ("/cpu", args.cpu_rate)):
+            for protected in (False, True):
+                rows.append(await run_scenario(args, route, rate, protected))
+    finally:
+        await resources.close()
+    print_table(
+        f"{args.duration}s at query={args.query_rate}/s, cpu={args.cpu_rate}/s "
+        f"(pool={args.pool_size}x{args.query_ms}ms, block={args.block_ms}ms, "
+        f"max_concurrency={args.max_concurrency}, queue={args.queue_size}/{args.queue_timeout}s)",
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=3.0, help="每个场景的发送时长（秒）")
+    parser.add_argument("--query-rate", type=float, default=1000, help="query 路由每秒请求数")
+    parser.add_argument("--cpu-rate", type=float, default=400, help="cpu 路由每秒请求数")
+    parser.add_argument("--pool-size", type=int, default=10, help="模拟的连接池大小")
+    parser.add_argument("--query-ms", type=float, default=20.0, help="模拟查询耗时（毫秒）")
+    parser.add_argument("--block-ms", type=float, default=5.0, help="cpu 路由阻塞事件循环的毫秒数")
+    parser.add_argument("--max-concurrency", type=int, default=20)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--queue-timeout", type=float, default=0.2)
+    parser.add_argument("--sample-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
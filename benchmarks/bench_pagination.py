@@ -0,0 +1,131 @@
+"""
+分页深翻页基准测试
+
+在独立 schema 中生成大量用户（默认 100 万），对比不同深度下的单页耗时：
+- offset:   ORDER BY created_at, id OFFSET n LIMIT size，外加 COUNT(*) 精确总数（原分页方式）
+- keyset:   paginate_keyset 游标分页，不计总数
+- keyset+estimate: 游标分页，总数取自 pg_class.reltuples
+
+需要 PostgreSQL，默认使用 .env 中的数据库配置，也可通过 --database-url 指定
+运行: uv run python -m benchmarks.bench_pagination --rows 1000000
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import print_table, setup_env, summarize
+
+setup_env()
+
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.core.pagination import (  # noqa: E402
+    count_exact,
+    cursor_scope,
+    encode_cursor,
+    paginate_keyset,
+)
+from app.models.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+SCHEMA = "bench_pagination"
+ORDER_BY = (User.created_at, User.id)
+
+
+async def populate(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+        # 每秒约 10 个用户注册，created_at 存在重复值，考验 (created_at, id) 的稳定排序
+        await conn.execute(
+            text(
+                "INSERT INTO users (id, username, email, hashed_password, power, token_version,"
+                " created_at, updated_at)"
+                " SELECT g, 'user' || g, 'user' || g || '@example.com', 'x', 'USER', 0,"
+                " 1700000000 + g / 10, 1700000000 + g / 10"
+                " FROM generate_series(1, :rows) AS g"
+            ),
+            {"rows": rows},
+        )
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE users"))
+
+
+async def timed(session_factory, fn, repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            await fn(session)
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def main(args) -> None:
+    url = args.database_url or get_settings().SQLALCHEMY_DATABASE_URL
+    engine = create_async_engine(url, connect_args={"server_settings": {"search_path": SCHEMA}})
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    if not args.reuse:
+        print(f"生成 {args.rows} 个用户...")
+        await populate(engine, args.rows)
+
+    rows = []
+    for page in args.pages:
+        offset = page * args.size
+        if offset >= args.rows:
+            continue
+        # 定位到该页起点的前一行，构造与 paginate_keyset 相同的游标
+        cursor = None
+        if offset > 0:
+            async with session_factory() as session:
+                anchor = (
+                    await session.execute(
+                        select(*ORDER_BY).order_by(*ORDER_BY).offset(offset - 1).limit(1)
+                    )
+                ).one()
+            cursor = encode_cursor(tuple(anchor), cursor_scope(ORDER_BY))
+
+        async def offset_page(session, offset=offset):
+            stmt = select(User).order_by(*ORDER_BY)
+            await session.scalars(stmt.offset(offset).limit(args.size))
+            await count_exact(session, select(User))
+
+        async def keyset_page(session, cursor=cursor, total="none"):
+            await paginate_keyset(
+                session, select(User), ORDER_BY, args.size, cursor=cursor, total=total
+            )
+
+        async def keyset_estimate_page(session, cursor=cursor):
+            await keyset_page(session, cursor, total="estimate")
+
+        for mode, fn in (
+            ("offset+count", offset_page),
+            ("keyset", keyset_page),
+            ("keyset+estimate", keyset_estimate_page),
+        ):
+            rows.append(
+                {"page": page, "mode": mode, **await timed(session_factory, fn, args.repeat)}
+            )
+
+    print_table(f"deep pagination ({args.rows} rows, size {args.size})", rows)
+    if not args.keep:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[0, 100, 1000, 10000, 49000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--reuse", action="store_true", help="复用上次保留的数据，不重新生成")
+    parser.add_argument("--keep", action="store_true", help="结束后保留测试 schema")
+    asyncio.run(main(parser.parse_args()))
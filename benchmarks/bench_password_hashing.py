@@ -0,0 +1,124 @@
+"""
+登录风暴下廉价接口的延迟基准测试
+
+对比两种密码校验方式下，`/ping` 接口的 p50/p99 延迟：
+- sync: 在事件循环中直接调用 bcrypt（现状）
+- pool: 通过有界密码哈希执行器调用 bcrypt
+
+运行: uv run python -m benchmarks.bench_password_hashing
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import print_table, setup_env, summarize
+
+setup_env()
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.executors import password_executor  # noqa: E402
+from app.core.handlers import register_handlers  # noqa: E402
+from app.core.security import (  # noqa: E402
+    async_verify_password,
+    get_password_hash,
+    verify_password,
+)
+
+PASSWORD = "benchmark-password"
+PING_INTERVAL = 0.005
+
+
+def build_app(hashed_password: str) -> FastAPI:
+    app = FastAPI()
+    register_handlers(app)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/login/sync")
+    async def login_sync():
+        return {"ok": verify_password(PASSWORD, hashed_password).valid}
+
+    @app.post("/login/pool")
+    async def login_pool():
+        return {"ok": (await async_verify_password(PASSWORD, hashed_password)).valid}
+
+    return app
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, mode: str | None, concurrency: int, duration: float
+) -> dict:
+    """在 duration 秒内保持 concurrency 个并发登录请求，同时串行探测 /ping"""
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+    statuses: dict[int, int] = {}
+
+    async def login_loop():
+        while time.perf_counter() < deadline:
+            response = await client.post(f"/login/{mode}")
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async def ping_loop() -> list[float]:
+        # 按固定节奏探测，延迟从计划发出时间开始计算，事件循环被阻塞的时间也会计入
+        samples = []
+        scheduled_at = started_at
+        while not samples or scheduled_at < deadline:
+            await asyncio.sleep(max(0.0, scheduled_at - time.perf_counter()))
+            await client.get("/ping")
+            samples.append(time.perf_counter() - scheduled_at)
+            scheduled_at = max(scheduled_at + PING_INTERVAL, time.perf_counter())
+        return samples
+
+    ping_task = asyncio.create_task(ping_loop())
+    tasks = [asyncio.create_task(login_loop()) for _ in range(concurrency if mode else 0)]
+    samples = await ping_task
+    await asyncio.gather(*tasks)
+    return {
+        "mode": mode or "idle",
+        **summarize(samples),
+        "logins_ok": statuses.get(200, 0),
+        "logins_429": statuses.get(429, 0),
+    }
+
+
+async def main(concurrency: int, duration: float) -> None:
+    hashed_password = get_password_hash(PASSWORD)
+    app = build_app(hashed_password)
+    password_executor.start()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        rows = [
+            await run_scenario(client, mode, concurrency, duration)
+            for mode in (None, "sync", "pool")
+        ]
+    await password_executor.shutdown()
+
+    print_table(f"/ping latency during login storm (concurrency={concurrency})", rows)
+    stats = password_executor.stats
+    completed = max(stats.completed, 1)
+    print_table(
+        "password executor",
+        [
+            {
+                "completed": stats.completed,
+                "rejected": stats.rejected,
+                "wait_mean_ms": stats.wait_seconds_total / completed * 1000,
+                "wait_max_ms": stats.wait_seconds_max * 1000,
+                "hash_mean_ms": stats.run_seconds_total / completed * 1000,
+                "hash_max_ms": stats.run_seconds_max * 1000,
+            }
+        ],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.duration))
@@ -0,0 +1,115 @@
+"""
+分布式限流器基准测试
+
+1. 单次限流检查的开销：逐次访问 Redis 与使用本地令牌储备的对比
+2. 多工作进程并发下的准确性：多个独立限流器实例（各自拥有本地储备）共享同一个 Redis，
+   统计实际放行数与理论上限（桶容量 + 速率 x 时长）的比值
+
+默认使用 fakeredis（需安装 fakeredis[lua]），也可通过 --redis-url 指定本地 Redis
+运行: uv run python -m benchmarks.bench_rate_limiter
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+import redis.asyncio as aioredis  # noqa: E402
+
+from app.core.ratelimit import RateLimit, RateLimiter  # noqa: E402
+
+
+def client_factory(redis_url: str | None):
+    if redis_url:
+        return lambda: aioredis.from_url(redis_url)
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeRedis
+
+    server = FakeServer()
+    return lambda: FakeRedis(server=server)
+
+
+async def bench_overhead(new_client, iterations: int) -> list[dict]:
+    limit = RateLimit(limit=1_000_000_000, period=1)
+    rows = []
+    for name, batch in (("redis-every-call", 1), ("local-batch-10", 10), ("local-batch-100", 100)):
+        limiter = RateLimiter(new_client(), local_batch=batch, lease_seconds=1.0)
+        await limiter.load_scripts()
+        key = f"bench:{uuid.uuid4()}"
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await limiter.hit(key, limit)
+        elapsed = time.perf_counter() - started
+        rows.append(
+            {
+                "mode": name,
+                "us_per_check": elapsed / iterations * 1e6,
+                **limiter.snapshot(),
+            }
+        )
+    return rows
+
+
+async def hammer(limiter: RateLimiter, key: str, limit: RateLimit, deadline: float) -> int:
+    """模拟单个工作进程持续请求，返回放行次数"""
+    admitted = 0
+    while time.perf_counter() < deadline:
+        if (await limiter.hit(key, limit)).allowed:
+            admitted += 1
+        await asyncio.sleep(0.001)
+    return admitted
+
+
+async def bench_accuracy(new_client, workers: int, rule: str, duration: float) -> list[dict]:
+    limit = RateLimit.parse(rule)
+    rows = []
+    for batch in (1, 10):
+        limiters = [
+            RateLimiter(new_client(), local_batch=batch, lease_seconds=1.0) for _ in range(workers)
+        ]
+        key = f"bench:{uuid.uuid4()}"
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(hammer(limiter, key, limit, deadline) for limiter in limiters)
+        )
+        admitted = sum(results)
+        elapsed = time.perf_counter() - started
+        ceiling = limit.limit + limit.limit / limit.period * elapsed
+        rows.append(
+            {
+                "local_batch": batch,
+                "workers": workers,
+                "admitted": admitted,
+                "ceiling": round(ceiling),
+                "ratio": admitted / ceiling,
+                "redis_calls": sum(limiter.redis_calls for limiter in limiters),
+            }
+        )
+    return rows
+
+
+async def main(args) -> None:
+    new_client = client_factory(args.redis_url)
+    print_table(
+        f"per-check overhead ({args.iterations} checks, {args.redis_url or 'fakeredis'})",
+        await bench_overhead(new_client, args.iterations),
+    )
+    print_table(
+        f"accuracy ({args.rule}, {args.duration}s)",
+        await bench_accuracy(new_client, args.workers, args.rule, args.duration),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rule", default="200/second")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
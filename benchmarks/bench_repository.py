@@ -0,0 +1,162 @@
+"""
+用户仓储查询开销基准测试
+
+在独立 schema 中对比单次查询的耗时（单位: 微秒/次，以及单次查询的 Python 峰值内存分配）：
+- naive (no cache): 每次新建 select()，且关闭 SQLAlchemy 编译缓存与 asyncpg 预编译语句缓存
+- naive: 每次新建 select()，使用应用的缓存配置
+- repository orm / repository rows: UserRepository 预构造的语句，返回 ORM 实体 / 轻量 Row
+- 批量: 逐个查询 --batch 个用户 vs get_many 一次 ANY(:ids) 查询
+
+需要 PostgreSQL，默认使用 .env 中的数据库配置，也可通过 --database-url 指定
+运行: uv run python -m benchmarks.bench_repository --users 10000 --lookups 5000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import tracemalloc
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.config import get_settings  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.repositories.user import UserRepository  # noqa: E402
+
+SCHEMA = "bench_repository"
+
+
+def create_engine(url: str, cache_size: int):
+    return create_async_engine(
+        url,
+        query_cache_size=cache_size,
+        connect_args={
+            "server_settings": {"search_path": SCHEMA},
+            "prepared_statement_cache_size": cache_size,
+        },
+    )
+
+
+async def seed(engine, users: int) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine)
+    async with session_factory() as session, session.begin():
+        await UserRepository(session).bulk_insert(
+            [
+                {"username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x"}
+                for i in range(users)
+            ]
+        )
+
+
+async def naive_lookup(session, username: str) -> None:
+    await session.scalar(select(User).where(User.username == username))
+
+
+async def repository_lookup(session, username: str) -> None:
+    await UserRepository(session).get_by_username(username)
+
+
+async def repository_row_lookup(session, username: str) -> None:
+    await UserRepository(session).get_by_username(username, rows=True)
+
+
+async def measure(session_factory, lookup, names: list[str]) -> tuple[float, float]:
+    """返回 (微秒/次, 单次查询峰值内存分配的中位数 KB)，每 100 次查询清空一次身份映射"""
+    async with session_factory() as session:
+        # 预热连接与缓存
+        for name in names[:100]:
+            await lookup(session, name)
+        session.expunge_all()
+
+        started = time.perf_counter()
+        for i, name in enumerate(names):
+            await lookup(session, name)
+            if i % 100 == 99:
+                session.expunge_all()
+        elapsed = time.perf_counter() - started
+        session.expunge_all()
+
+        peaks = []
+        tracemalloc.start()
+        try:
+            for name in names[:200]:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+                await lookup(session, name)
+                peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            tracemalloc.stop()
+    return elapsed / len(names) * 1_000_000, statistics.median(peaks) / 1024
+
+
+async def measure_batch(session_factory, batch: int, rounds: int, users: int) -> list[dict]:
+    """逐个按 ID 查询 vs get_many"""
+    batches = [random.sample(range(1, users + 1), batch) for _ in range(rounds)]
+    results = []
+    for name, lookup in (
+        ("one by one", lambda repository, ids: [repository.get(i, rows=True) for i in ids]),
+        ("get_many", lambda repository, ids: [repository.get_many(ids, rows=True)]),
+    ):
+        async with session_factory() as session:
+            repository = UserRepository(session)
+            started = time.perf_counter()
+            for ids in batches:
+                for coro in lookup(repository, ids):
+                    await coro
+            elapsed = time.perf_counter() - started
+        results.append(
+            {"mode": f"batch {name}", "per_batch_us": elapsed / rounds * 1_000_000, "batch": batch}
+        )
+    return results
+
+
+async def main(args) -> None:
+    url = args.database_url or get_settings().SQLALCHEMY_DATABASE_URL
+    cached = create_engine(url, get_settings().POSTGRES_STATEMENT_CACHE_SIZE)
+    uncached = create_engine(url, 0)
+    await seed(cached, args.users)
+    names = [f"user{random.randrange(args.users)}" for _ in range(args.lookups)]
+
+    results = []
+    for mode, engine, lookup in (
+        ("naive (no cache)", uncached, naive_lookup),
+        ("naive", cached, naive_lookup),
+        ("repository orm", cached, repository_lookup),
+        ("repository rows", cached, repository_row_lookup),
+    ):
+        us, alloc_kb = await measure(async_sessionmaker(engine), lookup, names)
+        results.append({"mode": mode, "us_per_lookup": us, "alloc_kb_per_lookup": alloc_kb})
+    print_table(f"user lookup by username ({args.lookups} lookups)", results)
+
+    print_table(
+        f"batch lookup by id ({args.rounds} rounds)",
+        await measure_batch(async_sessionmaker(cached), args.batch, args.rounds, args.users),
+    )
+
+    if not args.keep:
+        async with cached.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await cached.dispose()
+    await uncached.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--lookups", type=int, default=5_000)
+    parser.add_argument("--batch", type=int, default=50, help="批量查询的用户数")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--keep", action="store_true", help="结束后保留测试 schema")
+    asyncio.run(main(parser.parse_args()))
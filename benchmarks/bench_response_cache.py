@@ -0,0 +1,123 @@
+"""
+接口响应缓存基准测试
+
+同一个模拟查询的 GET 路由（等待 --query-ms 毫秒后返回 --items 个用户），对比:
+- uncached: 每次执行处理器并序列化
+- local:    进程内缓存命中
+- redis:    进程内缓存禁用，每次从 Redis 读取
+- 304:      携带 If-None-Match 的验证请求，不返回响应体
+以及冷启动时 --concurrency 个并发请求实际执行处理器的次数（防击穿）
+
+默认在本进程内启动 fakeredis 的 TCP 服务（需安装 fakeredis[lua]），绝对数值应以本地 Redis 为准:
+运行: uv run python -m benchmarks.bench_response_cache --redis-url redis://:password@127.0.0.1:6379/15
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks._common import print_table, setup_env, start_fake_redis, summarize
+
+setup_env()
+
+import httpx  # noqa: E402
+import redis.asyncio as aioredis  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.cache import LRUCache  # noqa: E402
+from app.core.response_cache import cache_response, response_cache  # noqa: E402
+from app.models.enums import PowerEnum  # noqa: E402
+from app.schemas.response import SuccessResponse  # noqa: E402
+from app.schemas.user import User  # noqa: E402
+
+
+def build_app(args, executions: list[int]) -> FastAPI:
+    app = FastAPI()
+    users = [
+        User(id=i, username=f"user{i}", email=f"user{i}@example.com", power=PowerEnum.USER)
+        for i in range(args.items)
+    ]
+
+    async def query() -> SuccessResponse[list[User]]:
+        executions[0] += 1
+        await asyncio.sleep(args.query_ms / 1000)
+        return SuccessResponse(data=users)
+
+    @app.get("/uncached")
+    async def uncached() -> SuccessResponse[list[User]]:
+        return await query()
+
+    @app.get("/cached")
+    @cache_response(ttl=3600, tags=["users"], vary="shared")
+    async def cached() -> SuccessResponse[list[User]]:
+        return await query()
+
+    return app
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, name: str, path: str, headers: dict, args
+) -> dict:
+    latencies: list[float] = []
+    remaining = args.requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code in (200, 304), response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"scenario": name, "rps": len(latencies) / elapsed, **summarize(latencies)}
+
+
+async def main(args) -> None:
+    server = None
+    if args.redis_url:
+        redis = aioredis.Redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        server, port = start_fake_redis()
+        redis = aioredis.Redis(port=port, decode_responses=True)
+    response_cache._redis = redis
+    executions = [0]
+    app = build_app(args, executions)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # 冷启动: 所有请求同时到达，只有一个执行处理器
+            await response_cache.invalidate("users")
+            await asyncio.gather(*(client.get("/cached") for _ in range(args.concurrency)))
+            cold = {"concurrent_requests": args.concurrency, "executions": executions[0]}
+            etag = (await client.get("/cached")).headers["etag"]
+
+            rows = [await run_scenario(client, "uncached", "/uncached", {}, args)]
+            rows.append(await run_scenario(client, "local", "/cached", {}, args))
+            local = response_cache._local
+            response_cache._local = LRUCache(0)
+            rows.append(await run_scenario(client, "redis", "/cached", {}, args))
+            response_cache._local = local
+            rows.append(await run_scenario(client, "304", "/cached", {"If-None-Match": etag}, args))
+            await response_cache.invalidate("users")
+    finally:
+        await redis.aclose()
+        if server is not None:
+            server.shutdown()
+    print_table(
+        f"GET {args.items} users ({args.query_ms}ms query, concurrency={args.concurrency})", rows
+    )
+    print_table("cold key stampede", [cold])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--items", type=int, default=50, help="响应中的用户数")
+    parser.add_argument("--query-ms", type=float, default=2.0, help="模拟查询耗时（毫秒）")
+    parser.add_argument("--redis-url", default=None)
+    asyncio.run(main(parser.parse_args()))
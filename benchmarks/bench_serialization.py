@@ -0,0 +1,125 @@
+"""
+响应序列化基准测试
+
+对比响应信封的两种序列化路径，统计单次耗时与单次序列化的峰值内存分配：
+- before: model_dump() / jsonable_encoder() 先生成中间字典，再由 JSONResponse / ORJSONResponse 编码
+- after:  EnvelopeResponse 由 Pydantic 核心一次性序列化为字节，固定消息错误使用预渲染响应体
+
+运行: uv run python -m benchmarks.bench_serialization
+"""
+
+import argparse
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from datetime import datetime
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from app.core.errors import ErrorTypeEnum  # noqa: E402
+from app.core.responses import EnvelopeResponse, prerender_exceptions, render_error  # noqa: E402
+from app.models.enums import PowerEnum  # noqa: E402
+from app.schemas.response import (  # noqa: E402
+    Error,
+    ErrorResponse,
+    PaginatedData,
+    PaginatedResponse,
+    PaginationInfo,
+    SuccessResponse,
+)
+from app.schemas.user import User  # noqa: E402
+
+warnings.filterwarnings("ignore", message="ORJSONResponse is deprecated")
+
+
+def make_users(count: int) -> list[User]:
+    return [
+        User(
+            id=i,
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            introduction="hello " * 10,
+            avatar=f"/static/avatars/{i}.png",
+            power=PowerEnum.USER,
+        )
+        for i in range(count)
+    ]
+
+
+def cases(items: int) -> list[tuple[str, Callable, Callable]]:
+    users = make_users(items)
+    success = SuccessResponse(data={"users": users, "generated_at": datetime.now()})
+    paginated = PaginatedResponse(
+        data=PaginatedData(
+            items=users,
+            pagination=PaginationInfo(page=1, size=items, total_items=items * 10, total_pages=10),
+        )
+    )
+    return [
+        (
+            "success",
+            lambda: JSONResponse(jsonable_encoder(success)),
+            lambda: EnvelopeResponse(success),
+        ),
+        (
+            "paginated",
+            lambda: JSONResponse(jsonable_encoder(paginated)),
+            lambda: EnvelopeResponse(paginated),
+        ),
+        (
+            "error",
+            lambda: ORJSONResponse(
+                ErrorResponse(
+                    error=Error(type=ErrorTypeEnum.UNAUTHORIZED, message="Unauthorized")
+                ).model_dump(),
+                status_code=401,
+            ),
+            lambda: EnvelopeResponse(
+                render_error(ErrorTypeEnum.UNAUTHORIZED, "Unauthorized"), status_code=401
+            ),
+        ),
+    ]
+
+
+def measure(fn, iterations: int) -> dict[str, float]:
+    body = fn().body
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {
+        "us_per_response": elapsed / iterations * 1e6,
+        "peak_alloc_kb": peak / 1024,
+        "bytes": len(body),
+    }
+
+
+def main(args) -> None:
+    prerender_exceptions()
+    rows = []
+    for name, before, after in cases(args.items):
+        for mode, fn in (("before", before), ("after", after)):
+            rows.append({"case": name, "mode": mode, **measure(fn, args.iterations)})
+    print_table(f"serialization ({args.items} items, {args.iterations} iterations)", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=2000)
+    main(parser.parse_args())
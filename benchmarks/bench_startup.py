@@ -0,0 +1,168 @@
+"""
+启动耗时基准测试
+
+在全新的子进程中多次测量（取中位数），超出阈值时以非零状态码退出，可用于 CI 防止启动耗时回退：
+- import: python -X importtime -c "import app.main" 中 app.main 的累计导入耗时
+- first response: 从启动解释器到应用处理完第一个请求（GET /，不执行生命周期，
+  因为生命周期需要连接数据库与 Redis）的墙钟时间
+同时列出自身导入耗时最长的模块，并检查应延迟导入的模块（jose、jwt、bcrypt、argon2）没有在导入应用时被加载
+
+运行: uv run python -m benchmarks.bench_startup --runs 5 --max-import-ms 1500 --max-first-response-ms 2000
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks._common import DEFAULT_ENV, print_table
+
+# 首次使用时才导入的模块，导入应用时不应出现
+DEFERRED_MODULES = ("jose", "jwt", "bcrypt", "argon2")
+
+# 子进程：导入应用并直接以 ASGI 调用处理一个请求（不依赖 httpx 等额外模块）
+FIRST_RESPONSE_SCRIPT = """
+import asyncio
+from app.main import app
+
+async def main():
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/", "raw_path": b"/", "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    print(status[0], flush=True)
+
+asyncio.run(main())
+"""
+
+
+def child_env() -> dict[str, str]:
+    env = {**DEFAULT_ENV, **os.environ}
+    # 避免 .pyc 缺失导致的首次编译耗时混入测量结果
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """解析 -X importtime 输出，返回 [(模块名, 自身耗时 us, 累计耗时 us)]"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure_import() -> list[tuple[str, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=child_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_first_response() -> float:
+    """返回从启动子进程到收到第一个响应的秒数"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", FIRST_RESPONSE_SCRIPT],
+        env=child_env(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    status = process.stdout.readline().strip()
+    elapsed = time.perf_counter() - started
+    process.wait()
+    if status != "200":
+        raise RuntimeError(f"GET / 返回了 {status or '空响应'}")
+    return elapsed
+
+
+def main(args) -> int:
+    # 预热一次，生成 .pyc 并填充文件系统缓存
+    measure_import()
+
+    import_ms, first_response_ms = [], []
+    self_times: dict[str, list[int]] = {}
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        modules = measure_import()
+        import_ms.append(next(c for name, _, c in modules if name == "app.main") / 1000)
+        for name, self_us, _ in modules:
+            self_times.setdefault(name, []).append(self_us)
+            loaded.add(name)
+        first_response_ms.append(measure_first_response() * 1000)
+
+    slowest = sorted(
+        ((name, statistics.median(samples) / 1000) for name, samples in self_times.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    print_table(
+        f"slowest modules (self time, median of {args.runs} runs)",
+        [{"module": name, "self_ms": ms} for name, ms in slowest],
+    )
+
+    results = [
+        ("import app.main", statistics.median(import_ms), args.max_import_ms),
+        ("first response", statistics.median(first_response_ms), args.max_first_response_ms),
+    ]
+    print_table(
+        "startup",
+        [
+            {
+                "stage": stage,
+                "median_ms": value,
+                "min_ms": min(samples),
+                "threshold_ms": threshold if threshold is not None else "-",
+            }
+            for (stage, value, threshold), samples in zip(
+                results, (import_ms, first_response_ms), strict=True
+            )
+        ],
+    )
+
+    failures = [
+        f"{stage}: {value:.0f}ms > {threshold:.0f}ms"
+        for stage, value, threshold in results
+        if threshold is not None and value > threshold
+    ]
+    eager = [
+        name
+        for name in DEFERRED_MODULES
+        if any(module == name or module.startswith(f"{name}.") for module in loaded)
+    ]
+    if eager:
+        failures.append(f"导入应用时加载了应延迟导入的模块: {', '.join(eager)}")
+    for failure in failures:
+        print(f"[!] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="列出自身导入耗时最长的模块数")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="导入耗时阈值")
+    parser.add_argument(
+        "--max-first-response-ms", type=float, default=None, help="首个响应耗时阈值"
+    )
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,143 @@
+"""
+Refresh Token 存储基准测试
+
+对比旧实现（逐条 setex/sadd/exists/delete）与 RefreshTokenStore（Lua 脚本）
+在单个用户拥有大量会话时的 Redis 往返次数与耗时；
+撤销全部令牌由 UserTokenStateStore 推进令牌生效起点完成，与会话数量无关。
+
+默认使用 fakeredis（需安装 fakeredis[lua]），也可通过 --redis-url 指定本地 Redis
+运行: uv run python -m benchmarks.bench_token_store --sessions 1000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+import redis.asyncio as aioredis  # noqa: E402
+
+from app.core.token_state import UserTokenStateStore  # noqa: E402
+from app.core.token_store import RefreshTokenStore  # noqa: E402
+
+
+class CountingRedis(aioredis.Redis):
+    """统计命令往返次数的 Redis 客户端"""
+
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        CountingRedis.round_trips += 1
+        return await super().execute_command(*args, **options)
+
+    def pipeline(self, *args, **kwargs):
+        # 流水线一次往返发送全部命令
+        CountingRedis.round_trips += 1
+        return super().pipeline(*args, **kwargs)
+
+
+def create_client(redis_url: str | None) -> aioredis.Redis:
+    if redis_url:
+        return CountingRedis.from_url(redis_url, decode_responses=True)
+    from fakeredis import FakeServer
+    from fakeredis.aioredis import FakeConnection
+
+    pool = aioredis.ConnectionPool(
+        connection_class=FakeConnection, server=FakeServer(), decode_responses=True
+    )
+    return CountingRedis(connection_pool=pool)
+
+
+class LegacyStore:
+    """旧实现，与改造前 app/core/security.py 中的逻辑一致"""
+
+    def __init__(self, redis: aioredis.Redis):
+        self.redis = redis
+
+    async def issue(self, sub: str, jti: str, ttl: int) -> None:
+        await self.redis.set(f"refresh_token:{sub}:{jti}", "token", ex=ttl)
+        await self.redis.sadd(f"user_tokens:{sub}", jti)
+
+    async def verify(self, sub: str, jti: str) -> bool:
+        return bool(await self.redis.exists(f"refresh_token:{sub}:{jti}"))
+
+    async def revoke_all(self, sub: str) -> int:
+        token_ids = await self.redis.smembers(f"user_tokens:{sub}")
+        revoked = 0
+        for token_id in token_ids:
+            key = f"refresh_token:{sub}:{token_id}"
+            if await self.redis.exists(key):
+                await self.redis.delete(key)
+                revoked += 1
+        await self.redis.delete(f"user_tokens:{sub}")
+        return revoked
+
+
+async def measure(name: str, operation, coro_factory) -> dict:
+    CountingRedis.round_trips = 0
+    started = time.perf_counter()
+    result = await coro_factory()
+    elapsed = time.perf_counter() - started
+    return {
+        "impl": name,
+        "operation": operation,
+        "round_trips": CountingRedis.round_trips,
+        "elapsed_ms": elapsed * 1000,
+        "result": result,
+    }
+
+
+async def main(sessions: int, redis_url: str | None) -> None:
+    redis = create_client(redis_url)
+    legacy = LegacyStore(redis)
+    store = RefreshTokenStore(redis)
+    await store.load_scripts()
+    state_store = UserTokenStateStore(redis, cache_size=1000, cache_ttl=1.0, retention=3600)
+    ttl = 3600
+    rows = []
+
+    for name, sub in (
+        ("legacy", f"bench-legacy-{uuid.uuid4()}"),
+        ("store", f"bench-{uuid.uuid4()}"),
+    ):
+        jtis = [str(uuid.uuid4()) for _ in range(sessions)]
+
+        async def issue_all(sub=sub, jtis=jtis, name=name):
+            expires_at = int(time.time()) + ttl
+            for jti in jtis:
+                if name == "legacy":
+                    await legacy.issue(sub, jti, ttl)
+                else:
+                    await store.issue(sub, jti, expires_at)
+            return len(jtis)
+
+        async def verify_one(sub=sub, jtis=jtis, name=name):
+            impl = legacy if name == "legacy" else store
+            return await impl.verify(sub, jtis[0])
+
+        async def revoke_all(sub=sub, jtis=jtis, name=name):
+            if name == "legacy":
+                return await legacy.revoke_all(sub)
+            # 推进令牌生效起点，此前签发的令牌全部失效
+            await state_store.revoke_all(sub)
+            return len(jtis)
+
+        rows.append(await measure(name, f"issue x{sessions}", issue_all))
+        rows.append(await measure(name, "verify", verify_one))
+        rows.append(await measure(name, "revoke_all", revoke_all))
+
+    await redis.aclose()
+    print_table(f"refresh token store ({sessions} sessions, {redis_url or 'fakeredis'})", rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument(
+        "--redis-url", default=None, help="例如 redis://:password@127.0.0.1:6379/15"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.redis_url))
@@ -0,0 +1,180 @@
+"""
+用户批量导入导出吞吐基准测试
+
+在独立 schema 中对比（单位: 行/秒，以及 Python 峰值内存）：
+- 导出: ORM 一次性加载全部 User 再序列化 vs export_users 服务端游标流式导出（NDJSON / CSV）
+- 导入: ORM add_all 批量插入 vs import_users（COPY 暂存表 + 合并），
+  另测一组需要哈希明文密码的导入（受密码哈希执行器吞吐限制，默认行数较少）
+
+需要 PostgreSQL，默认使用 .env 中的数据库配置，也可通过 --database-url 指定
+运行: uv run python -m benchmarks.bench_transfer --rows 200000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks._common import print_table, setup_env
+
+setup_env()
+
+import orjson  # noqa: E402
+from sqlalchemy import select, text  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+import app.core.transfer as transfer  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.executors import password_executor  # noqa: E402
+from app.core.replicas import ReplicaRouter  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.models.base import Base  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.user import User as UserSchema  # noqa: E402
+
+SCHEMA = "bench_transfer"
+HASHED_PASSWORD = get_password_hash("benchmark")
+
+
+async def reset_schema(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def truncate(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE users RESTART IDENTITY"))
+
+
+def ndjson_source(rows: int, plain: bool, chunk_rows: int = 1000):
+    """生成模拟上传的 NDJSON 请求体，每块 chunk_rows 行"""
+
+    async def chunks():
+        lines = []
+        for i in range(rows):
+            row = {"username": f"user{i}", "email": f"user{i}@example.com"}
+            if plain:
+                row["password"] = f"password{i}"
+            else:
+                row["hashed_password"] = HASHED_PASSWORD
+            lines.append(orjson.dumps(row))
+            if len(lines) == chunk_rows:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    return chunks()
+
+
+async def measure(coro_fn) -> tuple[float, float]:
+    """返回 (耗时秒, Python 峰值内存 MB)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        await coro_fn()
+    finally:
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def row(name: str, rows: int, elapsed: float, peak_mb: float) -> dict:
+    return {"mode": name, "rows": rows, "rows_per_s": rows / elapsed, "peak_mb": peak_mb}
+
+
+async def orm_import(session_factory, rows: int, batch_size: int = 5000) -> None:
+    async with session_factory() as session, session.begin():
+        for start in range(0, rows, batch_size):
+            session.add_all(
+                User(
+                    username=f"user{i}",
+                    email=f"user{i}@example.com",
+                    hashed_password=HASHED_PASSWORD,
+                )
+                for i in range(start, min(rows, start + batch_size))
+            )
+            await session.flush()
+            session.expunge_all()
+
+
+async def copy_import(session_factory, rows: int, plain: bool) -> None:
+    async with session_factory() as session, session.begin():
+        await transfer.import_users(session, ndjson_source(rows, plain), "ndjson")
+
+
+async def orm_export(session_factory) -> None:
+    async with session_factory() as session:
+        users = (await session.scalars(select(User).order_by(User.id))).all()
+        orjson.dumps([UserSchema.model_validate(user).model_dump() for user in users])
+
+
+async def stream_export(fmt: str) -> None:
+    async for _ in transfer.export_users(fmt):
+        pass
+
+
+async def main(args) -> None:
+    url = args.database_url or get_settings().SQLALCHEMY_DATABASE_URL
+    engine = create_async_engine(url, connect_args={"server_settings": {"search_path": SCHEMA}})
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    # 导出函数使用应用的只读会话路由，这里替换为指向测试 schema 的路由
+    transfer.replica_router = ReplicaRouter(engine, [], "round_robin", retry_seconds=0)
+    password_executor.start()
+    await reset_schema(engine)
+
+    results = []
+    await truncate(engine)
+    results.append(
+        row(
+            "import orm add_all",
+            args.rows,
+            *await measure(lambda: orm_import(session_factory, args.rows)),
+        )
+    )
+    await truncate(engine)
+    results.append(
+        row(
+            "import copy (hashed)",
+            args.rows,
+            *await measure(lambda: copy_import(session_factory, args.rows, plain=False)),
+        )
+    )
+    results.append(
+        row("export orm list", args.rows, *await measure(lambda: orm_export(session_factory)))
+    )
+    for fmt in ("ndjson", "csv"):
+        results.append(
+            row(
+                f"export stream {fmt}",
+                args.rows,
+                *await measure(lambda fmt=fmt: stream_export(fmt)),
+            )
+        )
+    await truncate(engine)
+    results.append(
+        row(
+            "import copy (plain)",
+            args.plain_rows,
+            *await measure(lambda: copy_import(session_factory, args.plain_rows, plain=True)),
+        )
+    )
+
+    print_table(f"user transfer ({args.rows} rows)", results)
+    await password_executor.shutdown()
+    if not args.keep:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--plain-rows", type=int, default=200, help="需要哈希明文密码的导入行数")
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--keep", action="store_true", help="结束后保留测试 schema")
+    asyncio.run(main(parser.parse_args()))
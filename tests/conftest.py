@@ -0,0 +1,36 @@
+import os
+
+import pytest
+
+# 测试使用的默认环境变量，仅在未设置时生效，需在导入 app 之前设置
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("SUPERADMIN_NAME", "admin")
+os.environ.setdefault("SUPERADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("SUPERADMIN_PASSWORD", "admin")
+os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+os.environ.setdefault("REDIS_PASSWORD", "redis")
+os.environ.setdefault("APP_ENV", "testing")
+
+
+@pytest.fixture
+def fake_redis():
+    """进程内的 fakeredis 异步客户端"""
+    from fakeredis import FakeAsyncRedis
+
+    return FakeAsyncRedis(decode_responses=True)
+
+
+@pytest.fixture
+def fake_redis_server():
+    """后台线程中的 fakeredis TCP 服务的异步客户端，用于阻塞读取（XREADGROUP BLOCK）等需要真实网络往返的场景"""
+    import threading
+
+    import redis.asyncio as aioredis
+    from fakeredis import TcpFakeServer
+
+    server = TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield aioredis.Redis(port=server.server_address[1], decode_responses=True)
+    server.shutdown()
+    server.server_close()
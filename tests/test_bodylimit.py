@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from starlette.testclient import TestClient
+
+from app.core.bodylimit import BodyLimitMiddleware, body_limit, body_limit_stats
+from app.core.handlers import register_handlers
+
+LIMIT = 1024
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    register_handlers(app)
+    app.add_middleware(BodyLimitMiddleware, max_bytes=LIMIT)
+    received: list[int] = []
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            received.append(size)
+        return {"size": size}
+
+    @app.post("/large")
+    @body_limit(4 * LIMIT)
+    async def large(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/ignore")
+    async def ignore():
+        return {"size": None}
+
+    with TestClient(app) as client:
+        client.received = received
+        yield client
+
+
+def chunks(size: int, count: int):
+    for _ in range(count):
+        yield b"x" * size
+
+
+def send_chunked(app, path: str, body_chunks: list[bytes]) -> tuple[int, dict[bytes, bytes], int]:
+    """直接调用 ASGI 应用发送分块传输的请求体，返回状态码、响应头与服务端读取的消息数"""
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"transfer-encoding", b"chunked")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1}
+        for i, chunk in enumerate(body_chunks)
+    ]
+    sent: list[dict] = []
+    consumed = 0
+
+    async def receive():
+        nonlocal consumed
+        if consumed < len(messages):
+            consumed += 1
+            return messages[consumed - 1]
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return start["status"], dict(start["headers"]), consumed
+
+
+def test_body_within_limit(client):
+    assert client.post("/echo", content=b"x" * LIMIT).json() == {"size": LIMIT}
+    assert client.post("/large", content=b"x" * 2 * LIMIT).json() == {"size": 2 * LIMIT}
+
+
+def test_declared_content_length_is_rejected_before_reading(client):
+    before = body_limit_stats.snapshot()
+    response = client.post("/echo", content=b"x" * (LIMIT + 1))
+    assert response.status_code == 413
+    assert response.headers["connection"] == "close"
+    assert f"{LIMIT} bytes" in response.text
+    assert client.received == []
+    assert body_limit_stats.rejected_declared == before["rejected_declared"] + 1
+    assert body_limit_stats.rejected_streamed == before["rejected_streamed"]
+
+
+def test_chunked_body_is_rejected_while_streaming(client):
+    before = body_limit_stats.snapshot()
+    status, headers, consumed = send_chunked(client.app, "/echo", [b"x" * 256] * 16)
+    assert status == 413
+    assert headers[b"connection"] == b"close"
+    # 超出上限的那一块即中止，不再读取剩余的请求体，端点读到的数据不超过上限
+    assert consumed == LIMIT // 256 + 1
+    assert client.received == [256, 512, 768, 1024]
+    assert body_limit_stats.rejected_streamed == before["rejected_streamed"] + 1
+    assert body_limit_stats.rejected_declared == before["rejected_declared"]
+
+
+def test_route_limit_overrides_default(client):
+    assert client.post("/large", content=chunks(LIMIT, 4)).json() == {"size": 4 * LIMIT}
+    assert send_chunked(client.app, "/large", [b"x" * LIMIT] * 4)[0] == 200
+    assert send_chunked(client.app, "/large", [b"x" * LIMIT] * 5)[0] == 413
+    assert client.post("/large", content=b"x" * (4 * LIMIT + 1)).status_code == 413
+
+
+def test_endpoint_without_body_is_unaffected(client):
+    assert client.post("/ignore", content=b"x" * (LIMIT + 1)).json() == {"size": None}
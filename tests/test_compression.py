@@ -0,0 +1,54 @@
+import gzip
+
+from starlette.applications import Starlette
+from starlette.responses import FileResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, available_codecs
+
+BODY = b"hello compression " * 200
+
+
+def make_client(tmp_path) -> TestClient:
+    path = tmp_path / "app.js"
+    path.write_bytes(BODY)
+
+    async def asset(request):
+        return FileResponse(path, media_type="application/javascript")
+
+    async def partial(request):
+        return Response(BODY[:100], status_code=206, media_type="text/plain")
+
+    app = Starlette(routes=[Route("/app.js", asset), Route("/partial", partial)])
+    codecs = [codec for codec in available_codecs(3, 4, 6) if codec.name == "gzip"]
+    app.add_middleware(CompressionMiddleware, codecs=codecs, minimum_size=100)
+    return TestClient(app, headers={"Accept-Encoding": "gzip"})
+
+
+def test_full_response_is_compressed_without_accept_ranges(tmp_path):
+    response = make_client(tmp_path).get("/app.js")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-ranges" not in response.headers
+    assert response.content == BODY
+
+
+def test_range_response_is_not_compressed(tmp_path):
+    response = make_client(tmp_path).get("/app.js", headers={"Range": "bytes=10-1999"})
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes 10-1999/{len(BODY)}"
+    assert response.content == BODY[10:2000]
+
+
+def test_partial_status_is_not_compressed(tmp_path):
+    response = make_client(tmp_path).get("/partial")
+    assert "content-encoding" not in response.headers
+    assert response.content == BODY[:100]
+
+
+def test_gzip_round_trip():
+    codec = next(codec for codec in available_codecs(3, 4, 6) if codec.name == "gzip")
+    stream = codec.stream()
+    data = stream.compress(BODY[:500]) + stream.compress(BODY[500:]) + stream.finish()
+    assert gzip.decompress(data) == BODY
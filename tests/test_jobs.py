@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import orjson
+
+from app.core.jobs import Job, JobQueue
+
+
+def make_queue(redis, **overrides) -> JobQueue:
+    options = {
+        "concurrency": 4,
+        "batch_size": 8,
+        "block_seconds": 0.02,
+        "max_attempts": 3,
+        "backoff": 0.01,
+        "backoff_max": 0.01,
+        "visibility_timeout": 30,
+        "dead_letter_max_length": 100,
+    }
+    return JobQueue("test_jobs", redis=redis, **{**options, **overrides})
+
+
+async def wait_until(predicate, timeout: float = 3.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_failed_job_is_retried(fake_redis_server):
+    queue = make_queue(fake_redis_server)
+    calls: list[int] = []
+
+    @queue.handler("flaky")
+    async def flaky(n: int) -> None:
+        calls.append(n)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    async def scenario():
+        await queue.start()
+        await queue.enqueue("flaky", n=1)
+        await wait_until(lambda: queue.stats.completed == 1)
+        await queue.shutdown()
+        return await fake_redis_server.xlen(queue.stream)
+
+    assert asyncio.run(scenario()) == 0
+    assert calls == [1, 1]
+    assert queue.stats.retried == 1
+
+
+def test_exhausted_job_is_dead_lettered(fake_redis_server):
+    queue = make_queue(fake_redis_server, max_attempts=2)
+
+    @queue.handler("broken")
+    async def broken() -> None:
+        raise ValueError("bad payload")
+
+    async def scenario():
+        await queue.start()
+        await queue.enqueue("broken")
+        await queue.enqueue("unknown")
+        await wait_until(lambda: queue.stats.dead == 2)
+        await queue.shutdown()
+        return await fake_redis_server.xrange(queue.dead_key)
+
+    dead = {job.name: job for job in (Job.loads(f["job"]) for _, f in asyncio.run(scenario()))}
+    assert dead["broken"].attempts == 2
+    assert dead["broken"].error == "ValueError: bad payload"
+    assert dead["unknown"].error == "no handler registered for 'unknown'"
+    assert queue.stats.retried == 1
+
+
+def test_handler_timeout_is_shorter_than_visibility_timeout():
+    assert make_queue(None, visibility_timeout=60).handler_timeout == 55
+    assert make_queue(None, visibility_timeout=4).handler_timeout == 2
+
+
+def test_abandoned_jobs_are_reclaimed(fake_redis_server):
+    queue = make_queue(fake_redis_server, visibility_timeout=0.2)
+    calls: list[int] = []
+
+    @queue.handler("task")
+    async def task(n: int) -> None:
+        calls.append(n)
+
+    async def scenario():
+        await queue._create_group()
+        job = Job(id="1", name="task", payload={"n": 1}, enqueued_at=time.time())
+        await fake_redis_server.xadd(queue.stream, {"job": job.dumps()})
+        # 未确认的条目，其中一条无法解析，模拟崩溃的消费者
+        await fake_redis_server.xadd(queue.stream, {"job": "not json"})
+        await fake_redis_server.xreadgroup(queue.group, "crashed", {queue.stream: ">"})
+        await queue.start()
+        await wait_until(lambda: queue.stats.completed == 1)
+        # 维护任务在解析失败后仍在运行：延迟任务照常到期执行
+        await queue.enqueue("task", delay=0.05, n=2)
+        await wait_until(lambda: queue.stats.completed == 2)
+        await queue.shutdown()
+        return await fake_redis_server.xlen(queue.stream)
+
+    assert asyncio.run(scenario()) == 0
+    assert calls == [1, 2]
+    assert queue.stats.reclaimed == 2
+    assert queue.stats.retried == 1
+
+
+def test_job_round_trip():
+    job = Job(id="1", name="task", payload={"n": 1}, attempts=2, error="boom")
+    assert Job.loads(orjson.dumps(orjson.loads(job.dumps()))) == job
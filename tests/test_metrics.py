@@ -0,0 +1,29 @@
+import asyncio
+import os
+
+import orjson
+
+from app.core.metrics import MetricsRegistry, MultiprocessExporter, merge_snapshots
+
+
+def test_snapshot_does_not_share_series():
+    registry = MetricsRegistry()
+    latency = registry.family("latency_seconds", "histogram", "latency", ("route",))
+    latency.observe(("/a",), 0.002)
+    snapshot = registry.snapshot()
+    latency.observe(("/a",), 0.002)
+    latency.observe(("/b",), 0.002)
+    [family] = snapshot["families"]
+    assert family["values"] == [[["/a"], [0, 1] + [0] * 12 + [0.002]]]
+
+
+def test_collect_merges_other_workers(tmp_path):
+    registry = MetricsRegistry()
+    registry.family("requests_total", "counter", "requests").inc(value=2)
+    exporter = MultiprocessExporter(registry, tmp_path, interval=60)
+    other = {**registry.snapshot(), "pid": os.getppid()}
+    (tmp_path / f"{os.getppid()}.json").write_bytes(orjson.dumps(other))
+    (tmp_path / "broken.json").write_bytes(b"{")
+
+    merged = merge_snapshots(asyncio.run(exporter.collect()))
+    assert merged["requests_total"]["values"] == {(): 4.0}
@@ -0,0 +1,26 @@
+from app.core import overload
+from app.core.metrics import PoolWaitStats
+from app.core.overload import LoadMonitor
+
+
+def make_monitor(monkeypatch) -> LoadMonitor:
+    monkeypatch.setattr(overload, "pool_wait_stats", lambda: [PoolWaitStats()])
+    return LoadMonitor(
+        interval=0.1, lag_threshold=0.2, pool_wait_threshold=1.0, sustained_samples=3
+    )
+
+
+def test_single_stall_does_not_shed(monkeypatch):
+    monitor = make_monitor(monkeypatch)
+    for lag in (0.0, 1.5, 0.0, 0.0):
+        monitor.sample(lag)
+        assert not monitor.overloaded
+
+
+def test_sustained_lag_sheds_until_recovered(monkeypatch):
+    monitor = make_monitor(monkeypatch)
+    states = []
+    for lag in (0.3, 0.3, 0.3, 0.3, 0.0):
+        monitor.sample(lag)
+        states.append(monitor.overloaded)
+    assert states == [False, False, True, True, False]
@@ -0,0 +1,74 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, select, tuple_
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.core.exceptions import DataValidationException
+from app.core.pagination import (
+    _b64encode,
+    _cursor_bound,
+    _sign,
+    cursor_scope,
+    decode_cursor,
+    encode_cursor,
+)
+
+events = Table(
+    "events",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("created_at", DateTime(timezone=True)),
+)
+SCOPE = cursor_scope((events.c.created_at, events.c.id))
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor((1700000000, 42), SCOPE)
+    assert decode_cursor(cursor, SCOPE) == [1700000000, 42]
+
+
+def test_tampered_cursor_is_rejected():
+    cursor = encode_cursor((1700000000, 42), SCOPE)
+    _, signature = cursor.split(".")
+    forged = f"{_b64encode(b'[1700000000,41]')}.{signature}"
+    with pytest.raises(DataValidationException):
+        decode_cursor(forged, SCOPE)
+
+
+def test_cursor_from_another_scope_is_rejected():
+    cursor = encode_cursor((1700000000, 42), SCOPE)
+    with pytest.raises(DataValidationException):
+        decode_cursor(cursor, cursor_scope((events.c.created_at, events.c.id), descending=True))
+    with pytest.raises(DataValidationException):
+        decode_cursor(cursor, cursor_scope((events.c.id,)))
+
+
+@pytest.mark.parametrize("payload", [b"{", b'{"a": 1}'])
+def test_signed_payload_must_be_a_json_list(payload):
+    cursor = f"{_b64encode(payload)}.{_b64encode(_sign(payload, SCOPE))}"
+    with pytest.raises(DataValidationException):
+        decode_cursor(cursor, SCOPE)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "a.b.c", "!!!.???"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(DataValidationException):
+        decode_cursor(cursor, SCOPE)
+
+
+def test_bound_uses_column_types():
+    created_at = datetime(2024, 1, 1, tzinfo=UTC)
+    cursor = encode_cursor((created_at, 42), SCOPE)
+    order_by = (events.c.created_at, events.c.id)
+    stmt = select(events).where(
+        tuple_(*order_by) > _cursor_bound(order_by, decode_cursor(cursor, SCOPE))
+    )
+    compiled = stmt.compile(dialect=asyncpg.dialect())
+    assert "$1::TIMESTAMP WITH TIME ZONE, $2::INTEGER" in str(compiled)
+    assert list(compiled.params.values()) == [created_at, 42]
+
+
+def test_bound_length_must_match():
+    with pytest.raises(DataValidationException):
+        _cursor_bound((events.c.id,), [1, 2])
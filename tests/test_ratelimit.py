@@ -0,0 +1,51 @@
+import asyncio
+
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+
+from app.core.ratelimit import RateLimit, RateLimiter
+
+
+def test_parse_rule():
+    assert RateLimit.parse("5/minute") == RateLimit(limit=5, period=60)
+    assert RateLimit.parse("5/30s") == RateLimit(limit=5, period=30)
+
+
+def test_bucket_rejects_then_refills(fake_redis):
+    limiter = RateLimiter(fake_redis, local_batch=1, lease_seconds=1.0)
+    limit = RateLimit.parse("5/second")
+
+    async def scenario():
+        results = [await limiter.hit("ip:1", limit) for _ in range(6)]
+        # 按 5/秒 补充，约 200 毫秒补充一个令牌
+        await asyncio.sleep(results[-1].retry_after + 0.05)
+        results.append(await limiter.hit("ip:1", limit))
+        return results
+
+    results = asyncio.run(scenario())
+    assert [result.allowed for result in results] == [True] * 5 + [False, True]
+    assert 0 < results[5].retry_after <= 0.2
+    assert limiter.rejected == 1
+
+
+def test_rejection_is_cached_locally(fake_redis):
+    limiter = RateLimiter(fake_redis, local_batch=1, lease_seconds=1.0)
+    limit = RateLimit.parse("1/minute")
+
+    async def scenario():
+        return [await limiter.hit("ip:1", limit) for _ in range(3)]
+
+    assert [result.allowed for result in asyncio.run(scenario())] == [True, False, False]
+    assert limiter.redis_calls == 2
+
+
+def test_redis_unavailable_allows_requests():
+    redis = aioredis.Redis(port=1, retry=Retry(NoBackoff(), 0))
+    limiter = RateLimiter(redis, local_batch=1, lease_seconds=1.0)
+
+    async def scenario():
+        return [await limiter.hit("ip:1", RateLimit.parse("1/minute")) for _ in range(2)]
+
+    assert all(result.allowed for result in asyncio.run(scenario()))
+    assert limiter.redis_errors == 2
@@ -0,0 +1,49 @@
+import asyncio
+
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+
+from app.core.response_cache import ResponseCache
+
+
+def make_cache(redis) -> ResponseCache:
+    return ResponseCache(
+        redis, prefix="test_cache", local_size=100, local_ttl=30, stale_seconds=30, lock_seconds=5
+    )
+
+
+def counting_compute(calls: list[int]):
+    async def compute() -> bytes:
+        calls.append(1)
+        return b'{"data":1}'
+
+    return compute
+
+
+def test_hit_after_miss(fake_redis):
+    cache = make_cache(fake_redis)
+    calls: list[int] = []
+    first, source = asyncio.run(cache.get("k", ("users",), 60, counting_compute(calls)))
+    assert source == "MISS"
+    cached, source = asyncio.run(cache.get("k", ("users",), 60, counting_compute(calls)))
+    assert (cached.body, source) == (first.body, "HIT")
+    assert len(calls) == 1
+
+
+def test_redis_unavailable_runs_handler():
+    # 没有服务监听的端口，连接立即被拒绝
+    redis = aioredis.Redis(port=1, decode_responses=True, retry=Retry(NoBackoff(), 0))
+    cache = make_cache(redis)
+    calls: list[int] = []
+
+    async def scenario():
+        results = [await cache.get("k", (), 60, counting_compute(calls)) for _ in range(2)]
+        await cache.invalidate("users")
+        return results
+
+    results = asyncio.run(scenario())
+    assert [source for _, source in results] == ["BYPASS", "BYPASS"]
+    assert results[0][0].body == b'{"data":1}'
+    assert len(calls) == 2
+    assert cache.stats.redis_errors == 3
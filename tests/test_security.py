@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import security
+from app.core.database import run_after_commit
+from app.core.exceptions import UnauthorizedException
+from app.core.executors import BoundedExecutor
+from app.core.security import (
+    access_token_cache,
+    bump_user_token_version,
+    create_refresh_token,
+    create_user_access_token,
+    revoke_refresh_token,
+    verify_access_token,
+    verify_refresh_token,
+)
+from app.core.token_state import token_state_store
+from app.core.token_store import refresh_token_store
+from app.models.enums import PowerEnum
+from app.models.user import User
+
+
+@pytest.fixture
+def token_state(fake_redis, monkeypatch):
+    monkeypatch.setattr(token_state_store, "_redis", fake_redis)
+    token_state_store.clear_cache()
+    access_token_cache.clear()
+    yield token_state_store
+    token_state_store.clear_cache()
+    access_token_cache.clear()
+
+
+def test_power_change_rejects_old_access_token(token_state):
+    user = User(id=1, username="alice", power=PowerEnum.ADMIN, token_version=0)
+    token = create_user_access_token(user)
+    assert asyncio.run(verify_access_token(token))["pwr"] == PowerEnum.ADMIN
+
+    session = SimpleNamespace(info={})
+    user.power = PowerEnum.BANNED
+    bump_user_token_version(session, user)
+    asyncio.run(run_after_commit(session))
+
+    with pytest.raises(UnauthorizedException) as exc_info:
+        asyncio.run(verify_access_token(token))
+    assert exc_info.value.message == "Access Token outdated"
+    # 以新版本签发的令牌不受影响
+    assert asyncio.run(verify_access_token(create_user_access_token(user)))["ver"] == 1
+
+
+def test_batch_hashing_leaves_a_worker_for_logins(monkeypatch):
+    executor = BoundedExecutor(name="test-hash", max_workers=3, max_pending=100)
+    chunk_sizes: list[int] = []
+    running = peak = 0
+    lock = threading.Lock()
+
+    def fake_hashes(passwords: list[str]) -> list[str]:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            chunk_sizes.append(len(passwords))
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return [f"hashed:{password}" for password in passwords]
+
+    monkeypatch.setattr(security, "password_executor", executor)
+    monkeypatch.setattr(security, "get_password_hashes", fake_hashes)
+    passwords = [str(i) for i in range(100)]
+    try:
+        hashes = asyncio.run(security.async_get_password_hashes(passwords))
+    finally:
+        asyncio.run(executor.shutdown())
+    assert hashes == [f"hashed:{password}" for password in passwords]
+    assert max(chunk_sizes) <= security.PASSWORD_HASH_CHUNK_SIZE
+    assert peak <= executor.max_workers - 1
+
+
+def test_refresh_token_can_only_be_revoked_once(token_state, fake_redis, monkeypatch):
+    monkeypatch.setattr(refresh_token_store, "_redis", fake_redis)
+
+    async def scenario() -> list[bool]:
+        token = await create_refresh_token("1")
+        payload = await verify_refresh_token(token)
+        # 两个并发的刷新请求都通过了验证，只有一个能完成撤销
+        return await asyncio.gather(
+            revoke_refresh_token(1, payload["jti"]), revoke_refresh_token(1, payload["jti"])
+        )
+
+    assert sorted(asyncio.run(scenario())) == [False, True]
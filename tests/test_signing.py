@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import time
+
+import orjson
+import pytest
+
+from app.core.signing import (
+    BACKENDS,
+    JWTCodec,
+    KeyRing,
+    TokenDecodeError,
+    TokenExpiredError,
+    _b64encode,
+    generate_key,
+)
+
+BACKEND_NAMES = list(BACKENDS)
+SECRET = "test-secret-key-with-at-least-32-bytes"
+
+
+@pytest.fixture
+def es256_keyring(tmp_path) -> KeyRing:
+    """ES256 密钥环（jose 不支持 EdDSA，三个后端共用 ES256），同时接受迁移期间的 HS256 令牌"""
+    generate_key("ES256", tmp_path, "k1")
+    return KeyRing("ES256", SECRET, tmp_path, accept_hmac=True)
+
+
+@pytest.fixture
+def hs256_keyring(tmp_path) -> KeyRing:
+    return KeyRing("HS256", SECRET, tmp_path)
+
+
+def forge(header: dict, payload: dict, secret: bytes = b"") -> str:
+    signing_input = _b64encode(orjson.dumps(header)) + b"." + _b64encode(orjson.dumps(payload))
+    signature = hmac.digest(secret, signing_input, hashlib.sha256) if secret else b""
+    return (signing_input + b"." + _b64encode(signature)).decode()
+
+
+@pytest.mark.parametrize("decoder", BACKEND_NAMES)
+@pytest.mark.parametrize("encoder", BACKEND_NAMES)
+@pytest.mark.parametrize("keyring", ["es256_keyring", "hs256_keyring"])
+def test_tokens_are_interchangeable_between_backends(request, keyring, encoder, decoder):
+    keyring = request.getfixturevalue(keyring)
+    payload = {"sub": "1", "exp": int(time.time()) + 60}
+    token = JWTCodec(BACKENDS[encoder](), keyring).encode(payload)
+    assert JWTCodec(BACKENDS[decoder](), keyring).decode(token) == payload
+
+
+@pytest.mark.parametrize("backend", BACKEND_NAMES)
+@pytest.mark.parametrize("keyring", ["es256_keyring", "hs256_keyring"])
+def test_expired_token(request, keyring, backend):
+    codec = JWTCodec(BACKENDS[backend](), request.getfixturevalue(keyring))
+    token = codec.encode({"sub": "1", "exp": int(time.time()) - 1})
+    with pytest.raises(TokenExpiredError):
+        codec.decode(token)
+
+
+@pytest.mark.parametrize("backend", BACKEND_NAMES)
+def test_public_key_as_hmac_secret_is_rejected(es256_keyring, backend):
+    # 算法混淆: 以公钥 PEM 作为 HMAC 共享密钥签名，并声明为 ES256 密钥的 kid
+    public_pem = es256_keyring.signing_key.pem(private=False).encode()
+    token = forge({"alg": "HS256", "typ": "JWT", "kid": "k1"}, {"sub": "1"}, public_pem)
+    with pytest.raises(TokenDecodeError) as exc_info:
+        JWTCodec(BACKENDS[backend](), es256_keyring).decode(token)
+    assert not isinstance(exc_info.value, TokenExpiredError)
+
+
+@pytest.mark.parametrize("backend", BACKEND_NAMES)
+@pytest.mark.parametrize(
+    "header",
+    [
+        {"alg": "none", "typ": "JWT"},
+        {"alg": "none", "typ": "JWT", "kid": "k1"},
+        {"alg": "ES256", "typ": "JWT"},
+        {"alg": "ES256", "typ": "JWT", "kid": "unknown"},
+        {"alg": "EdDSA", "typ": "JWT", "kid": "k1"},
+    ],
+)
+def test_unknown_kid_or_algorithm_is_rejected(es256_keyring, backend, header):
+    token = forge(header, {"sub": "1"})
+    with pytest.raises(TokenDecodeError):
+        JWTCodec(BACKENDS[backend](), es256_keyring).decode(token)
+
+
+@pytest.mark.parametrize("backend", BACKEND_NAMES)
+def test_hmac_key_without_kid_requires_accept_hmac(tmp_path, backend):
+    generate_key("ES256", tmp_path, "k1")
+    legacy = forge({"alg": "HS256", "typ": "JWT"}, {"sub": "1"}, SECRET.encode())
+    assert JWTCodec(
+        BACKENDS[backend](), KeyRing("ES256", SECRET, tmp_path, accept_hmac=True)
+    ).decode(legacy) == {"sub": "1"}
+    with pytest.raises(TokenDecodeError):
+        JWTCodec(BACKENDS[backend](), KeyRing("ES256", SECRET, tmp_path)).decode(legacy)
+
+
+@pytest.mark.parametrize("backend", BACKEND_NAMES)
+def test_tampered_payload_is_rejected(es256_keyring, backend):
+    codec = JWTCodec(BACKENDS[backend](), es256_keyring)
+    header, _, signature = codec.encode({"sub": "1"}).split(".")
+    forged = f"{header}.{_b64encode(orjson.dumps({'sub': '2'})).decode()}.{signature}"
+    with pytest.raises(TokenDecodeError):
+        codec.decode(forged)
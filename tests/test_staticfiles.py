@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core import staticfiles
+from app.core.staticfiles import StaticAssets
+
+
+def make_client(directory) -> TestClient:
+    assets = StaticAssets(directory, precompress=False)
+    return TestClient(Starlette(routes=[Mount("/static", assets)]))
+
+
+def test_directory_is_not_found(tmp_path):
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / "avatars" / "a.txt").write_text("hello")
+    client = make_client(tmp_path)
+    assert client.get("/static/avatars").status_code == 404
+    assert client.get("/static/avatars/").status_code == 404
+    assert client.get("/static/avatars/a.txt").text == "hello"
+
+
+def test_concurrent_misses_index_once(tmp_path, monkeypatch):
+    file_digest = staticfiles._file_digest
+
+    def slow_digest(path):
+        # 放大索引耗时，使并发的未命中在线程中重叠
+        time.sleep(0.01)
+        return file_digest(path)
+
+    monkeypatch.setattr(staticfiles, "_file_digest", slow_digest)
+    assets = StaticAssets(tmp_path, precompress=False)
+    app = Starlette(routes=[Mount("/static", assets)])
+    for i in range(4):
+        (tmp_path / f"{i}.txt").write_bytes(b"x" * 1000)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            paths = [f"/static/{i % 4}.txt" for i in range(40)]
+            return await asyncio.gather(*(client.get(path) for path in paths))
+
+    responses = asyncio.run(scenario())
+    assert all(response.status_code == 200 for response in responses)
+    assert assets._memory_used == 4 * 1000
+    assert len(assets._fingerprinted) == 4
@@ -0,0 +1,36 @@
+import asyncio
+
+from app.core import token_state
+from app.core.token_state import UserTokenStateStore, issued_at_now
+
+
+def make_store(redis) -> UserTokenStateStore:
+    return UserTokenStateStore(redis, cache_size=100, cache_ttl=0, retention=3600)
+
+
+def test_token_issued_right_after_revoke_all_is_valid(fake_redis, monkeypatch):
+    store = make_store(fake_redis)
+    # 撤销与重新签发落在同一毫秒内
+    monkeypatch.setattr(token_state.time, "time", lambda: 1_700_000_000.1234)
+    valid_after = asyncio.run(store.revoke_all(1))
+    monkeypatch.setattr(token_state.time, "time", lambda: 1_700_000_000.1238)
+    assert not issued_at_now() < valid_after
+
+
+def test_token_issued_before_revoke_all_is_revoked(fake_redis, monkeypatch):
+    store = make_store(fake_redis)
+    monkeypatch.setattr(token_state.time, "time", lambda: 1_700_000_000.1224)
+    iat = issued_at_now()
+    monkeypatch.setattr(token_state.time, "time", lambda: 1_700_000_000.1234)
+    asyncio.run(store.revoke_all(1))
+    state = asyncio.run(store.get(1))
+    assert iat < state.valid_after
+
+
+def test_batch_writes_update_every_user(fake_redis):
+    store = make_store(fake_redis)
+    asyncio.run(store.set_versions({1: 3, 2: 5}))
+    valid_after = asyncio.run(store.revoke_all_many([2, 3]))
+    assert asyncio.run(store.get(1)) == token_state.UserTokenState(version=3)
+    assert asyncio.run(store.get(2)) == token_state.UserTokenState(valid_after, 5)
+    assert asyncio.run(store.get(3)) == token_state.UserTokenState(valid_after, 0)
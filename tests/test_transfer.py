@@ -0,0 +1,41 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import DataValidationException
+from app.core.transfer import read_csv, read_ndjson
+
+
+async def chunked(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+def collect(reader) -> list:
+    async def run():
+        return [item async for item in reader]
+
+    return asyncio.run(run())
+
+
+def test_ndjson_lines_split_across_chunks():
+    rows = collect(read_ndjson(chunked(b'{"a": 1}\n\n{"a"', b": 2}\r\n", b'{"a": 3}')))
+    assert rows == [(1, {"a": 1}), (3, {"a": 2}), (4, {"a": 3})]
+
+
+def test_csv_quoted_newline():
+    rows = collect(read_csv(chunked(b'username,introduction\nalice,"line 1\nline 2"\nbob,x\n')))
+    assert rows == [
+        (2, {"username": "alice", "introduction": "line 1\nline 2"}),
+        (4, {"username": "bob", "introduction": "x"}),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("reader", "first_line"), [(read_ndjson, b'{"a": 1}\n'), (read_csv, b"username\n")]
+)
+def test_invalid_utf8_is_a_validation_error(reader, first_line):
+    with pytest.raises(DataValidationException) as exc_info:
+        collect(reader(chunked(first_line, b'"caf\xe9"\n')))
+    assert exc_info.value.message == "Invalid UTF-8"
+    assert exc_info.value.details[0].field == "line 2"
@@ -0,0 +1,33 @@
+import asyncio
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+async def main() -> None:
+    from loguru import logger
+
+    from app import jobs  # noqa: F401  注册后台任务处理函数
+    from app.core.database import resources
+    from app.core.jobs import job_queue
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await job_queue.load_scripts()
+    await job_queue.start()
+    try:
+        await stop.wait()
+    finally:
+        logger.info("关闭任务消费者...")
+        await job_queue.shutdown()
+        await resources.close()
+
+
+if __name__ == "__main__":
+    # 独立的任务消费进程，可启动多个；此时可设置 JOBS_CONSUMER_ENABLED=false，应用进程只提交任务
+    asyncio.run(main())